@@ -0,0 +1,649 @@
+"""Asyncio client for the Hive API."""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .pyhiveapi import (HIVE_API_POOL_SIZE_DEFAULT,
+                        HIVE_API_KEEPALIVE_SECONDS_DEFAULT,
+                        HIVE_NODE_REFRESH_UNSUPPORTED_STATUS,
+                        HIVE_REFRESH_JITTER_SECONDS_DEFAULT,
+                        HIVE_RECONCILE_SECONDS_DEFAULT,
+                        HIVE_SESSION_REJECTED_STATUS,
+                        HiveAPIRateLimit, HiveAPIRetry, HiveAPIUnavailable,
+                        Pyhiveapi)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HiveAsyncTransport:
+    """Initiate Hive API Async Transport Class."""
+
+    def __init__(self, pool_size=HIVE_API_POOL_SIZE_DEFAULT,
+                 keepalive_seconds=HIVE_API_KEEPALIVE_SECONDS_DEFAULT,
+                 retry=None, rate_limit=None):
+        """Set up a pooled, keep-alive HTTP transport."""
+        if retry is None:
+            retry = HiveAPIRetry()
+        if rate_limit is None:
+            rate_limit = HiveAPIRateLimit()
+        self.pool_size = pool_size
+        self.keepalive_seconds = keepalive_seconds
+        self.retry = retry
+        self.rate_limit = rate_limit
+        self.session = None
+
+    def get_session(self):
+        """Get the pooled session, creating it on first use."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size,
+                                             keepalive_timeout=self.keepalive_seconds)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def request(self, request_type, request_url, data, headers, timeout):
+        """Send a request over a pooled connection and read the body, retrying failures."""
+        send_headers = {}
+        for header_key, header_value in headers.items():
+            if header_value is not None:
+                send_headers[header_key] = header_value
+
+        host = urlsplit(request_url).netloc
+        attempt = 0
+
+        while True:
+            if not self.retry.request_allowed(host):
+                raise HiveAPIUnavailable("Hive API is unavailable: " + host)
+
+            rate_limit_delay = self.rate_limit.delay(request_type)
+            if rate_limit_delay > 0:
+                await asyncio.sleep(rate_limit_delay)
+
+            try:
+                async with self.get_session().request(request_type,
+                                                      request_url,
+                                                      data=data,
+                                                      headers=send_headers,
+                                                      timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    body = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.retry.record_result(host, None, None)
+                retry_delay = self.retry.retry_delay(attempt, None, None)
+                if retry_delay is None:
+                    raise
+            else:
+                retry_after_seconds = self.retry.retry_after_seconds(response.headers.get("Retry-After"))
+                self.retry.record_result(host, response.status, retry_after_seconds)
+                retry_delay = self.retry.retry_delay(attempt, response.status, retry_after_seconds)
+                if retry_delay is None:
+                    return response, body
+
+            await asyncio.sleep(retry_delay)
+            attempt += 1
+
+    async def close(self):
+        """Close all pooled connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class AsyncPyhiveapi(Pyhiveapi):
+    """Hive API client with awaitable network calls."""
+
+    def __init__(self, pool_size=HIVE_API_POOL_SIZE_DEFAULT,
+                 keepalive_seconds=HIVE_API_KEEPALIVE_SECONDS_DEFAULT,
+                 optimistic_writes=False,
+                 reconcile_seconds=HIVE_RECONCILE_SECONDS_DEFAULT,
+                 adaptive_polling=False,
+                 session_cache_file=None,
+                 node_snapshot_file=None,
+                 retry=None,
+                 rate_limit=None,
+                 write_debounce_seconds=0):
+        """Initialise the base variable values."""
+        Pyhiveapi.__init__(self, pool_size, keepalive_seconds,
+                           optimistic_writes, reconcile_seconds,
+                           adaptive_polling,
+                           session_cache_file=session_cache_file,
+                           node_snapshot_file=node_snapshot_file,
+                           retry=retry,
+                           rate_limit=rate_limit,
+                           write_debounce_seconds=write_debounce_seconds)
+        self.transport = HiveAsyncTransport(pool_size, keepalive_seconds, retry, rate_limit)
+        self.refresher_task = None
+        self.refresher_wake = None
+        self.warm_start_task = None
+        self.nodes_flights = {}
+        self.logon_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Close the pooled connections to the Hive API."""
+        await self.stop_refresher()
+        if self.warm_start_task is not None:
+            self.warm_start_task.cancel()
+            try:
+                await self.warm_start_task
+            except asyncio.CancelledError:
+                pass
+            self.warm_start_task = None
+        await self.transport.close()
+        Pyhiveapi.close(self)
+
+    async def hive_api_json_call(self, request_type, request_url, json_string_content, absolute_request_url):
+        """Call the JSON Hive API and return any returned data."""
+        api_headers = {self.hive_api.headers.content_type_key:
+                       self.hive_api.headers.content_type_value,
+                       self.hive_api.headers.accept_key:
+                       self.hive_api.headers.accept_value,
+                       self.hive_api.headers.session_id_key:
+                       self.hive_api.headers.session_id_value}
+
+        requests_timeout = 10
+        json_return = {}
+
+        if absolute_request_url:
+            full_request_url = request_url
+        else:
+            full_request_url = self.hive_api.urls.base + request_url
+
+        api_validators = None
+        if request_type == "GET":
+            api_validators = Pyhiveapi.p_conditional_headers(self, full_request_url, api_headers)
+
+        try:
+            json_response, body = await self.transport.request(request_type,
+                                                               full_request_url,
+                                                               json_string_content,
+                                                               api_headers,
+                                                               requests_timeout)
+        except (aiohttp.ClientError, asyncio.TimeoutError, IOError, RuntimeError):
+            json_return['original'] = "No response to JSON Hive API request"
+            json_return['parsed'] = "No response to JSON Hive API request"
+            return json_return
+
+        try:
+            json_return['original'] = json_response
+            if request_type == "GET":
+                json_body = Pyhiveapi.p_parse_json_body(self, full_request_url, api_validators,
+                                                        json_response.status, json_response.headers, body)
+                json_return['parsed'], json_return['unchanged'], json_return['body_hash'] = json_body
+            else:
+                json_return['parsed'] = json.loads(body.decode("utf-8"))
+        except ValueError:
+            json_return['original'] = "Error parsing JSON data"
+            json_return['parsed'] = "Error parsing JSON data"
+
+        if not absolute_request_url and self.p_session_rejected(json_response):
+            Pyhiveapi.p_clear_session(self, api_headers[self.hive_api.headers.session_id_key])
+
+        return json_return
+
+    @staticmethod
+    def p_session_rejected(api_resp):
+        """Check if a Hive API request was refused because of the Session ID."""
+        return getattr(api_resp, "status", None) in HIVE_SESSION_REJECTED_STATUS
+
+    @staticmethod
+    def p_nodes_response_ok(api_resp_d):
+        """Check if a devices or products response holds a current list of nodes."""
+        return (getattr(api_resp_d['original'], "status", None) in (200, 304) and
+                (isinstance(api_resp_d['parsed'], list) or api_resp_d.get('unchanged', False)))
+
+    async def p_refetch_node_bodies(self, api_calls, api_resps):
+        """Get the unchanged node lists again with their bodies if they are not in the parsed state."""
+        refetch_indexes = Pyhiveapi.p_node_bodies_needed(self, api_resps)
+        refetch_resps = await asyncio.gather(
+            *[self.hive_api_json_call(*Pyhiveapi.p_unconditional_call(self, *api_calls[resp_index]))
+              for resp_index in refetch_indexes])
+
+        api_resps = list(api_resps)
+        for resp_index, api_resp_d in zip(refetch_indexes, refetch_resps):
+            api_resps[resp_index] = api_resp_d
+        return api_resps
+
+    @staticmethod
+    def p_response_ok(api_resp):
+        """Check if a Hive API response was successful."""
+        return getattr(api_resp, "status", None) == 200
+
+    async def hive_api_logon(self):
+        """Log in to the Hive API and get the Session ID."""
+        api_resp_d = await self.hive_api_json_call("POST", self.hive_api.urls.global_login,
+                                                   Pyhiveapi.p_logon_content(self), True)
+        login_details_found = Pyhiveapi.p_store_logon(self, api_resp_d['parsed'])
+
+        if not login_details_found:
+            self.hsc.session_id = None
+        else:
+            Pyhiveapi.p_save_session_cache(self)
+
+    async def check_hive_api_logon(self):
+        """Check if currently logged in with a valid Session ID."""
+        if Pyhiveapi.p_logon_needed(self):
+            async with self.logon_lock:
+                if Pyhiveapi.p_logon_needed(self) and Pyhiveapi.p_logon_allowed(self):
+                    await self.hive_api_logon()
+                    Pyhiveapi.p_record_logon(self)
+
+        if self.hsc.file == True:
+            self.hsc.session_id = "Test"
+
+    async def update_data(self, node_id):
+        """Get latest data for Hive nodes - rate limiting."""
+        nodes_updated = False
+        if self.refresher_task is not None and not self.refresher_task.done():
+            return nodes_updated
+
+        if datetime.now() >= Pyhiveapi.p_refresh_due(self):
+            nodes_updated = await self.hive_api_get_nodes(node_id)
+        return nodes_updated
+
+    def start_refresher(self, jitter_seconds=HIVE_REFRESH_JITTER_SECONDS_DEFAULT):
+        """Keep the Hive nodes up to date from a background task."""
+        self.hsc.refresh_jitter_seconds = jitter_seconds
+        if self.refresher_task is None or self.refresher_task.done():
+            self.refresher_wake = asyncio.Event()
+            self.refresher_task = asyncio.ensure_future(self.p_refresh_loop())
+
+    async def p_refresh_loop(self):
+        """Refresh the Hive nodes each time they are due until cancelled."""
+        while True:
+            try:
+                await asyncio.wait_for(self.refresher_wake.wait(),
+                                       Pyhiveapi.p_next_refresh_delay(self))
+                self.refresher_wake.clear()
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                await self.hive_api_get_nodes("NoID")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Keep refreshing; the next update will try again.
+                _LOGGER.exception("Error refreshing Hive nodes")
+
+    async def stop_refresher(self):
+        """Stop the background refresh task."""
+        if self.refresher_task is not None:
+            self.refresher_task.cancel()
+            try:
+                await self.refresher_task
+            except asyncio.CancelledError:
+                pass
+            self.refresher_task = None
+
+    async def hive_api_get_nodes_nl(self):
+        """Get latest data for Hive nodes - not rate limiting."""
+        await self.hive_api_get_nodes("NoID")
+
+    async def hive_api_get_nodes(self, node_id, include_weather=False):
+        """Get latest data for Hive nodes, sharing a fetch already in progress."""
+        nodes_flight = self.nodes_flights.get(include_weather)
+        if nodes_flight is None:
+            nodes_flight = asyncio.ensure_future(self.p_fetch_nodes(node_id, include_weather))
+            self.nodes_flights[include_weather] = nodes_flight
+            nodes_flight.add_done_callback(
+                lambda done_flight: self.nodes_flights.pop(include_weather, None))
+
+        # Shielded so a cancelled caller does not cancel the fetch for the others.
+        return await asyncio.shield(nodes_flight)
+
+    async def p_fetch_nodes(self, node_id, include_weather):
+        """Get latest data for Hive nodes."""
+        get_nodes_successful = True
+
+        await self.check_hive_api_logon()
+
+        if self.hsc.session_id is not None:
+            api_calls = [("GET", self.hive_api.urls.devices, "", False),
+                         ("GET", self.hive_api.urls.products, "", False)]
+
+            weather_due = include_weather and Pyhiveapi.p_weather_due(self)
+            if weather_due:
+                api_calls.append(("GET", Pyhiveapi.p_weather_url(self), "", True))
+
+            api_resps = await asyncio.gather(*[self.hive_api_json_call(*api_call) for api_call in api_calls])
+
+            if self.hsc.session_id is None:
+                get_nodes_successful = False
+            else:
+                api_resps[:2] = await self.p_refetch_node_bodies(api_calls[:2], api_resps[:2])
+
+                if (AsyncPyhiveapi.p_nodes_response_ok(api_resps[0]) and
+                        AsyncPyhiveapi.p_nodes_response_ok(api_resps[1])):
+                    get_nodes_successful = Pyhiveapi.p_store_node_responses(self, api_resps[0], api_resps[1])
+                else:
+                    get_nodes_successful = False
+
+                if weather_due:
+                    Pyhiveapi.p_store_weather_response(self, api_resps[2])
+        else:
+            get_nodes_successful = False
+
+        if get_nodes_successful:
+            self.hsc.last_update = datetime.now()
+            self.hsc.reconcile_due = None
+            if self.hsc.unchanged_refreshes == 0:
+                Pyhiveapi.p_save_node_snapshot(self)
+
+        return get_nodes_successful
+
+    @staticmethod
+    def p_node_refresh_unsupported(api_resp):
+        """Check if a single node request was rejected by the Hive API."""
+        return getattr(api_resp, "status", None) in HIVE_NODE_REFRESH_UNSUPPORTED_STATUS
+
+    async def hive_api_get_node(self, node_id):
+        """Get latest data for a single Hive node, or all nodes if not possible."""
+        node_url = None
+        if self.hsc.node_refresh_supported:
+            node_url = Pyhiveapi.p_node_url(self, node_id)
+
+        if node_url is not None:
+            await self.check_hive_api_logon()
+
+            if self.hsc.session_id is not None:
+                api_resp_d = await self.hive_api_json_call("GET", node_url, "", False)
+                if api_resp_d.get('unchanged', False):
+                    api_resp_d = await self.hive_api_json_call(
+                        *Pyhiveapi.p_unconditional_call(self, "GET", node_url, "", False))
+                api_resp = api_resp_d['original']
+
+                if AsyncPyhiveapi.p_response_ok(api_resp):
+                    if Pyhiveapi.p_store_node(self, node_id, api_resp_d['parsed']):
+                        return True
+                elif AsyncPyhiveapi.p_node_refresh_unsupported(api_resp):
+                    self.hsc.node_refresh_supported = False
+
+        return await self.hive_api_get_nodes(node_id)
+
+    async def hive_api_get_weather(self):
+        """Get latest weather data from Hive."""
+        get_weather_successful = True
+
+        if Pyhiveapi.p_weather_due(self):
+            await self.check_hive_api_logon()
+
+            if self.hsc.session_id is not None:
+                api_resp_d = await self.hive_api_json_call("GET", Pyhiveapi.p_weather_url(self), "", True)
+                get_weather_successful = Pyhiveapi.p_store_weather_response(self, api_resp_d)
+            else:
+                get_weather_successful = False
+
+        return get_weather_successful
+
+    async def p_hive_api_write(self, node_id, api_call):
+        """Send a node update to the Hive API and refresh on success."""
+        write_success = False
+
+        if api_call is not None:
+            api_resp_d = await self.hive_api_json_call("POST", api_call[0], api_call[1], False)
+
+            if AsyncPyhiveapi.p_response_ok(api_resp_d['original']):
+                if not (self.hsc.optimistic_writes and
+                        Pyhiveapi.p_patch_node(self, node_id, api_call)):
+                    await self.p_confirm_write(node_id)
+                Pyhiveapi.p_record_write(self)
+                if self.refresher_wake is not None:
+                    self.refresher_wake.set()
+                write_success = True
+
+        return write_success
+
+    async def p_confirm_write(self, node_id):
+        """Refresh a written node, batching writes made within the debounce window."""
+        if self.hsc.write_debounce_seconds <= 0:
+            return await self.hive_api_get_node(node_id)
+
+        confirm_flight = Pyhiveapi.p_debounce_write(
+            self, node_id, lambda: asyncio.ensure_future(self.p_run_confirm()))[0]
+
+        # Shielded so a cancelled writer does not cancel the refresh for the others.
+        return await asyncio.shield(confirm_flight)
+
+    async def p_run_confirm(self):
+        """Wait for the writes to stop and refresh the nodes written."""
+        while True:
+            wait_seconds, confirm_nodes = Pyhiveapi.p_debounce_due(self)
+            if confirm_nodes is not None:
+                break
+            await asyncio.sleep(wait_seconds)
+
+        if len(confirm_nodes) == 1:
+            return await self.hive_api_get_node(next(iter(confirm_nodes)))
+        return await self.hive_api_get_nodes("NoID")
+
+    async def initialise_api(self, username, password, mins_between_updates):
+        """Setup the Hive platform."""
+        self.hsc.username = username
+        self.hsc.password = password
+
+        if mins_between_updates <= 0:
+            mins_between_updates = 2
+
+        hive_node_update_interval = mins_between_updates * 60
+
+        if self.hsc.username is None or self.hsc.password is None:
+            return None
+        elif Pyhiveapi.p_load_node_snapshot(self):
+            self.hsc.update_node_interval_seconds = hive_node_update_interval
+            self.warm_start_task = asyncio.ensure_future(
+                self.p_initialise_session(hive_node_update_interval))
+        else:
+            await self.p_initialise_session(hive_node_update_interval)
+
+        return Pyhiveapi.p_device_list(self)
+
+    async def p_initialise_session(self, hive_node_update_interval):
+        """Log in, using the session cache if possible, and get the Hive nodes."""
+        get_nodes_successful = False
+
+        session_cached = Pyhiveapi.p_load_session_cache(self)
+        if not session_cached:
+            await self.check_hive_api_logon()
+        if self.hsc.session_id is not None:
+            self.hsc.update_node_interval_seconds = hive_node_update_interval
+            get_nodes_successful = await self.hive_api_get_nodes("NoID")
+            if session_cached and self.hsc.session_id is None:
+                get_nodes_successful = await self.hive_api_get_nodes("NoID")
+
+        self.hsc.initialise_successful = get_nodes_successful
+        return get_nodes_successful
+
+    class Heating(Pyhiveapi.Heating):
+        """Hive Heating."""
+
+        async def set_target_temperature(self, node_id, new_temperature):
+            """Set heating target temperature."""
+            await self.hive.check_hive_api_logon()
+
+            set_temperature_success = False
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Heating.p_set_target_temperature_call(self, node_id, new_temperature)
+                set_temperature_success = await self.hive.p_hive_api_write(node_id, api_call)
+
+            return set_temperature_success
+
+        async def set_mode(self, node_id, new_mode):
+            """Set heating mode."""
+            await self.hive.check_hive_api_logon()
+
+            set_mode_success = False
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Heating.p_set_mode_call(self, node_id, new_mode)
+                set_mode_success = await self.hive.p_hive_api_write(node_id, api_call)
+
+            return set_mode_success
+
+        async def set_state(self, node_id, **attributes):
+            """Set heating mode and target temperature in one update."""
+            await self.hive.check_hive_api_logon()
+
+            set_state_success = False
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Heating.p_set_state_call(self, node_id, **attributes)
+                set_state_success = await self.hive.p_hive_api_write(node_id, api_call)
+
+            return set_state_success
+
+        async def turn_boost_on(self, node_id, length_minutes, target_temperature):
+            """Turn heating boost on."""
+            api_call = Pyhiveapi.Heating.p_turn_boost_on_call(self, node_id, length_minutes, target_temperature)
+            if api_call is None:
+                return False
+
+            await self.hive.check_hive_api_logon()
+
+            return await self.hive.p_hive_api_write(node_id, api_call)
+
+        async def turn_boost_off(self, node_id):
+            """Turn heating boost off."""
+            set_boost_success = False
+            node_found = Pyhiveapi.p_get_product(self, node_id, "heating") is not None
+
+            await self.hive.check_hive_api_logon()
+
+            if node_found:
+                await self.hive.hive_api_get_nodes(node_id)
+                api_call = Pyhiveapi.Heating.p_turn_boost_off_call(self, node_id)
+                set_boost_success = await self.hive.p_hive_api_write(node_id, api_call)
+
+            return set_boost_success
+
+    class Hotwater(Pyhiveapi.Hotwater):
+        """Hive Hotwater."""
+
+        async def set_mode(self, node_id, new_mode):
+            """Set hot water mode."""
+            await self.hive.check_hive_api_logon()
+
+            set_mode_success = False
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Hotwater.p_set_mode_call(self, node_id, new_mode)
+                set_mode_success = await self.hive.p_hive_api_write(node_id, api_call)
+
+            return set_mode_success
+
+        async def set_state(self, node_id, **attributes):
+            """Set hot water attributes in one update."""
+            await self.hive.check_hive_api_logon()
+
+            set_state_success = False
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Hotwater.p_set_state_call(self, node_id, **attributes)
+                set_state_success = await self.hive.p_hive_api_write(node_id, api_call)
+
+            return set_state_success
+
+        async def turn_boost_on(self, node_id, length_minutes):
+            """Turn hot water boost on."""
+            api_call = Pyhiveapi.Hotwater.p_turn_boost_on_call(self, node_id, length_minutes)
+            if api_call is None:
+                return False
+
+            await self.hive.check_hive_api_logon()
+
+            return await self.hive.p_hive_api_write(node_id, api_call)
+
+        async def turn_boost_off(self, node_id):
+            """Turn hot water boost off."""
+            set_boost_success = False
+            node_found = Pyhiveapi.p_get_product(self, node_id, "hotwater") is not None
+
+            await self.hive.check_hive_api_logon()
+
+            if node_found:
+                await self.hive.hive_api_get_nodes(node_id)
+                api_call = Pyhiveapi.Hotwater.p_turn_boost_off_call(self, node_id)
+                set_boost_success = await self.hive.p_hive_api_write(node_id, api_call)
+
+            return set_boost_success
+
+    class Light(Pyhiveapi.Light):
+        """Hive Lights."""
+
+        async def p_light_write(self, node_id, api_call):
+            """Send a light update once logged in."""
+            await self.hive.check_hive_api_logon()
+
+            set_mode_success = False
+
+            if self.hsc.session_id is not None:
+                set_mode_success = await self.hive.p_hive_api_write(node_id, api_call)
+
+            return set_mode_success
+
+        async def turn_off(self, node_id):
+            """Set light to turn off."""
+            return await self.p_light_write(node_id, Pyhiveapi.Light.p_turn_off_call(self, node_id))
+
+        async def turn_on(self, node_id, nodedevicetype, new_brightness,
+                          new_color_temp, new_color):
+            """Set light to turn on."""
+            return await self.p_light_write(node_id, Pyhiveapi.Light.p_turn_on_with_call(self, node_id, nodedevicetype, new_brightness,
+                                                                                      new_color_temp, new_color))
+
+        async def set_state(self, node_id, **attributes):
+            """Set light state, brightness and colour in one update."""
+            return await self.p_light_write(node_id, Pyhiveapi.Light.p_set_state_call(self, node_id, **attributes))
+
+        async def set_brightness(self, node_id, new_brightness):
+            """Set light brightness."""
+            return await self.p_light_write(node_id, Pyhiveapi.Light.p_set_brightness_call(self, node_id, new_brightness))
+
+        async def set_color_temp(self, node_id, nodedevicetype, new_color_temp):
+            """Set light colour temperature."""
+            return await self.p_light_write(node_id, Pyhiveapi.Light.p_set_color_temp_call(self, node_id, nodedevicetype, new_color_temp))
+
+        async def set_color(self, node_id, new_color):
+            """Set light colour."""
+            return await self.p_light_write(node_id, Pyhiveapi.Light.p_set_color_call(self, node_id, new_color))
+
+    class Sensor(Pyhiveapi.Sensor):
+        """Hive Sensors."""
+
+    class Switch(Pyhiveapi.Switch):
+        """Hive Switches."""
+
+        async def p_plug_write(self, node_id, api_call):
+            """Send a smart plug update once logged in."""
+            await self.hive.check_hive_api_logon()
+
+            set_mode_success = False
+
+            if self.hsc.session_id is not None:
+                set_mode_success = await self.hive.p_hive_api_write(node_id, api_call)
+
+            return set_mode_success
+
+        async def turn_on(self, node_id):
+            """Set smart plug to turn on."""
+            return await self.p_plug_write(node_id, Pyhiveapi.Switch.p_turn_on_call(self, node_id))
+
+        async def turn_off(self, node_id):
+            """Set smart plug to turn off."""
+            return await self.p_plug_write(node_id, Pyhiveapi.Switch.p_turn_off_call(self, node_id))
+
+        async def set_state(self, node_id, **attributes):
+            """Set smart plug attributes in one update."""
+            return await self.p_plug_write(node_id, Pyhiveapi.Switch.p_set_state_call(self, node_id, **attributes))
+
+    class Weather(Pyhiveapi.Weather):
+        """Hive Weather."""
@@ -0,0 +1,248 @@
+"""Manage many Hive accounts from one process."""
+import heapq
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timedelta
+
+from .pyhiveapi import (HIVE_API_KEEPALIVE_SECONDS_DEFAULT,
+                        HiveAPIRateLimit, HiveAPITransport, Pyhiveapi)
+
+HIVE_FLEET_CONCURRENCY_DEFAULT = 20
+HIVE_FLEET_POOL_SIZE_DEFAULT = 50
+HIVE_FLEET_FETCH_WORKERS_DEFAULT = 40
+HIVE_FLEET_MIN_INTERVAL_SECONDS_DEFAULT = 60
+HIVE_FLEET_BACKOFF_MAX_EXPONENT = 5
+HIVE_FLEET_READ_RATE_DEFAULT = 20
+HIVE_FLEET_READ_BURST_DEFAULT = 50
+HIVE_FLEET_WRITE_RATE_DEFAULT = 10
+HIVE_FLEET_WRITE_BURST_DEFAULT = 20
+
+
+class HiveFleetAccount:
+    """Initiate Hive Fleet Account Class."""
+
+    def __init__(self, key, hive, username, password, mins_between_updates):
+        """Set up the polling and health state of one account."""
+        self.key = key
+        self.hive = hive
+        self.username = username
+        self.password = password
+        self.mins_between_updates = mins_between_updates
+        self.initialised = False
+        self.in_flight = False
+        self.next_due = datetime.now()
+        self.last_started = None
+        self.last_success = None
+        self.last_error = None
+        self.consecutive_failures = 0
+
+    def health(self):
+        """Get the health of this account."""
+        return {'initialised': self.initialised,
+                'in_flight': self.in_flight,
+                'next_due': self.next_due,
+                'last_success': self.last_success,
+                'last_error': self.last_error,
+                'consecutive_failures': self.consecutive_failures}
+
+
+class HiveFleet:
+    """Initiate Hive Fleet Class."""
+
+    def __init__(self, max_concurrency=HIVE_FLEET_CONCURRENCY_DEFAULT,
+                 pool_size=HIVE_FLEET_POOL_SIZE_DEFAULT,
+                 keepalive_seconds=HIVE_API_KEEPALIVE_SECONDS_DEFAULT,
+                 min_interval_seconds=HIVE_FLEET_MIN_INTERVAL_SECONDS_DEFAULT,
+                 fetch_workers=HIVE_FLEET_FETCH_WORKERS_DEFAULT,
+                 retry=None, rate_limit=None):
+        """Set up the shared connection pool and worker threads."""
+        if rate_limit is None:
+            rate_limit = HiveAPIRateLimit(HIVE_FLEET_READ_RATE_DEFAULT,
+                                          HIVE_FLEET_READ_BURST_DEFAULT,
+                                          HIVE_FLEET_WRITE_RATE_DEFAULT,
+                                          HIVE_FLEET_WRITE_BURST_DEFAULT)
+        self.transport = HiveAPITransport(pool_size, keepalive_seconds, retry, rate_limit)
+        self.fetch_executor = ThreadPoolExecutor(max_workers=fetch_workers)
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.min_interval_seconds = min_interval_seconds
+        self.accounts = {}
+        self.queue = []
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+        self.wake_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def add_account(self, key, username, password, mins_between_updates=2,
+                    **hive_options):
+        """Add a Hive account, logging in and polling it once started."""
+        if hive_options.get("rate_limit") is None:
+            # Writes are limited for each account as well as across the fleet.
+            hive_options["rate_limit"] = HiveAPIRateLimit(read_rate=None)
+        hive = Pyhiveapi(transport=self.transport,
+                         executor=self.fetch_executor,
+                         **hive_options)
+        account = HiveFleetAccount(key, hive, username, password, mins_between_updates)
+
+        with self.lock:
+            old_account = self.accounts.get(key)
+            self.accounts[key] = account
+            self.p_schedule(account)
+
+        if old_account is not None:
+            old_account.hive.close()
+        self.wake_event.set()
+
+        return hive
+
+    def remove_account(self, key):
+        """Stop polling a Hive account."""
+        with self.lock:
+            account = self.accounts.pop(key, None)
+
+        if account is not None:
+            account.hive.close()
+
+    def get_account(self, key):
+        """Get the Pyhiveapi of an account."""
+        account = self.accounts.get(key)
+        if account is None:
+            return None
+        return account.hive
+
+    def start(self):
+        """Start polling the accounts in the background."""
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run,
+                                           name="HiveFleet",
+                                           daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout=None):
+        """Stop polling and wait for the scheduler thread to finish."""
+        self.stop_event.set()
+        self.wake_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def close(self):
+        """Stop polling and release every account and shared resource."""
+        self.stop()
+        self.executor.shutdown(wait=True)
+
+        with self.lock:
+            accounts = list(self.accounts.values())
+            self.accounts = {}
+            self.queue = []
+
+        for account in accounts:
+            account.hive.close()
+        self.fetch_executor.shutdown(wait=False)
+        self.transport.close()
+
+    def run(self):
+        """Hand due accounts to the worker threads until stopped."""
+        while not self.stop_event.is_set():
+            due_accounts = []
+            wait_seconds = None
+
+            with self.lock:
+                current_time = datetime.now()
+                while len(self.queue) > 0 and self.queue[0][0] <= current_time:
+                    next_due, sequence, key = heapq.heappop(self.queue)
+                    account = self.accounts.get(key)
+                    if (account is not None and not account.in_flight and
+                            account.next_due == next_due):
+                        account.in_flight = True
+                        due_accounts.append(account)
+
+                if len(self.queue) > 0:
+                    wait_seconds = (self.queue[0][0] - current_time).total_seconds()
+
+            for account in due_accounts:
+                self.executor.submit(self.p_refresh_account, account)
+
+            self.wake_event.wait(wait_seconds)
+            self.wake_event.clear()
+
+    def p_schedule(self, account):
+        """Queue an account for its next poll; call with the lock held."""
+        heapq.heappush(self.queue, (account.next_due, next(self.sequence), account.key))
+
+    def p_refresh_account(self, account):
+        """Log in or refresh one account and schedule its next poll."""
+        account.last_started = datetime.now()
+        refresh_error = None
+
+        try:
+            if not account.initialised:
+                account.hive.initialise_api(account.username,
+                                            account.password,
+                                            account.mins_between_updates)
+                warm_start = account.hive.hsc.warm_start
+                if warm_start is not None:
+                    # A warm start logs in on its own thread; wait for the result.
+                    warm_start.join()
+                account.initialised = account.hive.hsc.initialise_successful
+                refresh_success = account.initialised
+            else:
+                refresh_success = Pyhiveapi.hive_api_get_nodes(account.hive, "NoID")
+            if not refresh_success:
+                refresh_error = "Hive API update failed"
+        except Exception as exc:
+            refresh_success = False
+            refresh_error = repr(exc)
+
+        earliest_due = account.last_started + timedelta(seconds=self.min_interval_seconds)
+        if refresh_success:
+            account.last_success = datetime.now()
+            account.last_error = None
+            account.consecutive_failures = 0
+            next_due = max(Pyhiveapi.p_refresh_due(account.hive), earliest_due)
+        else:
+            account.last_error = refresh_error
+            account.consecutive_failures += 1
+            backoff_exponent = min(account.consecutive_failures - 1,
+                                   HIVE_FLEET_BACKOFF_MAX_EXPONENT)
+            next_due = account.last_started + timedelta(
+                seconds=self.min_interval_seconds * 2 ** backoff_exponent)
+
+        with self.lock:
+            account.in_flight = False
+            account.next_due = next_due
+            if self.accounts.get(account.key) is account:
+                self.p_schedule(account)
+
+        self.wake_event.set()
+
+        return refresh_success
+
+    def health(self):
+        """Get a summary of the health of every account."""
+        with self.lock:
+            accounts = list(self.accounts.values())
+
+        failing = [account.key for account in accounts
+                   if account.consecutive_failures > 0]
+        pending = [account.key for account in accounts
+                   if account.last_success is None and account.consecutive_failures == 0]
+        last_successes = [account.last_success for account in accounts
+                          if account.last_success is not None]
+
+        return {'accounts': len(accounts),
+                'healthy': len(accounts) - len(failing) - len(pending),
+                'failing': failing,
+                'pending': pending,
+                'in_flight': sum(1 for account in accounts if account.in_flight),
+                'oldest_success': min(last_successes) if len(last_successes) > 0 else None}
+
+    def account_health(self, key):
+        """Get the health of one account."""
+        account = self.accounts.get(key)
+        if account is None:
+            return None
+        return account.health()
@@ -1,149 +1,795 @@
+import base64
+import bisect
+import copy
+import hashlib
+import logging
 import operator
+import os
+import random
+import threading
+import time
+from types import MappingProxyType
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from datetime import timedelta
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
 import requests
+from requests.adapters import HTTPAdapter
 import colorsys
+import json
+import zlib
+
+_LOGGER = logging.getLogger(__name__)
 
 HIVE_NODE_UPDATE_INTERVAL_DEFAULT = 120
 HIVE_WEATHER_UPDATE_INTERVAL_DEFAULT = 60  #### Update to 900 or 600
 MINUTES_BETWEEN_LOGONS = 15
-
-NODE_ATTRIBS = {"Header": "HeaderText"}
+HIVE_LOGON_EXPIRY_MARGIN_SECONDS = 120
+HIVE_LOGON_BACKOFF_SECONDS = 30
+HIVE_LOGON_BACKOFF_MAX_SECONDS = 900
+HIVE_API_POOL_SIZE_DEFAULT = 10
+HIVE_API_KEEPALIVE_SECONDS_DEFAULT = 300
+HIVE_API_FETCH_WORKERS_DEFAULT = 3
+HIVE_CALLBACK_WORKERS_DEFAULT = 1
+HIVE_API_RETRIES_DEFAULT = 2
+HIVE_API_RETRY_BACKOFF_SECONDS_DEFAULT = 1
+HIVE_API_RETRY_BACKOFF_MAX_SECONDS_DEFAULT = 30
+HIVE_API_RETRY_STATUS = (429, 500, 502, 503, 504)
+HIVE_API_CIRCUIT_FAILURES_DEFAULT = 5
+HIVE_API_CIRCUIT_RESET_SECONDS_DEFAULT = 60
+HIVE_API_READ_RATE_DEFAULT = 10
+HIVE_API_READ_BURST_DEFAULT = 20
+HIVE_API_WRITE_RATE_DEFAULT = 2
+HIVE_API_WRITE_BURST_DEFAULT = 10
+HIVE_RECONCILE_SECONDS_DEFAULT = 30
+HIVE_NODE_REFRESH_UNSUPPORTED_STATUS = (405, 501)
+HIVE_SESSION_REJECTED_STATUS = (401,)
+HIVE_REFRESH_JITTER_SECONDS_DEFAULT = 10
+HIVE_REFRESH_MIN_SECONDS = 5
+HIVE_REFRESH_FALLBACK_SECONDS = 60
+HIVE_POLL_FAST_SECONDS_DEFAULT = 30
+HIVE_POLL_FAST_WINDOW_SECONDS = 300
+HIVE_POLL_BACKOFF_MAX_DEFAULT = 4
+HIVE_WRITE_DEBOUNCE_MAX_WINDOWS = 10
+HIVE_DEVICE_CATEGORIES = ("hub", "thermostat", "boiler_module", "plug", "light", "sensors")
+HIVE_PRODUCT_CATEGORIES = ("heating", "hotwater", "light", "plug", "sensors")
+SCHEDULE_DAYS = ('monday', 'tuesday', 'wednesday', 'thursday',
+                 'friday', 'saturday', 'sunday')
 
 
 class HiveDevices:
     """Initiate Hive Devices Class."""
 
-    hub = []
-    thermostat = []
-    boiler_module = []
-    plug = []
-    light = []
-    sensors = []
+    def __init__(self):
+        """Set the initial values."""
+        self.hub = ()
+        self.thermostat = ()
+        self.boiler_module = ()
+        self.plug = ()
+        self.light = ()
+        self.sensors = ()
+        self.index = {}
 
 
 class HiveProducts:
     """Initiate Hive Products Class."""
 
-    heating = []
-    hotwater = []
-    light = []
-    plug = []
-    sensors = []
+    def __init__(self):
+        """Set the initial values."""
+        self.heating = ()
+        self.hotwater = ()
+        self.light = ()
+        self.plug = ()
+        self.sensors = ()
+        self.index = {}
+
+
+class HiveState:
+    """Initiate Hive State Class."""
+
+    __slots__ = ("devices", "products")
+
+    def __init__(self, devices, products):
+        """Hold a complete set of devices and products, never changed once published."""
+        self.devices = devices
+        self.products = products
+
+
+class HiveNode:
+    """Initiate Hive Node Class."""
+
+    __slots__ = ("id", "type", "name")
+    fields = {"id": ("id",),
+              "type": ("type",),
+              "name": ("state", "name")}
+
+    def __init__(self, api_data):
+        """Parse the node fields from the Hive API data."""
+        for slot_name, field_path in self.fields.items():
+            field_value = api_data
+            for field_key in field_path:
+                if isinstance(field_value, dict) and field_key in field_value:
+                    field_value = field_value[field_key]
+                else:
+                    field_value = None
+                    break
+            setattr(self, slot_name, field_value)
+
+
+class HubNode(HiveNode):
+    """Initiate Hive Hub Node Class."""
+
+    __slots__ = ("online",)
+    fields = dict(HiveNode.fields,
+                  online=("props", "online"))
+
+
+class DeviceNode(HiveNode):
+    """Initiate Hive Device Node Class."""
+
+    __slots__ = ("battery",)
+    fields = dict(HiveNode.fields,
+                  battery=("props", "battery"))
+
+
+class HeatingNode(HiveNode):
+    """Initiate Hive Heating Node Class."""
+
+    __slots__ = ("mode", "target", "boost", "schedule", "temperature",
+                 "schedule_override", "previous_mode", "previous_target")
+    fields = dict(HiveNode.fields,
+                  mode=("state", "mode"),
+                  target=("state", "target"),
+                  boost=("state", "boost"),
+                  schedule=("state", "schedule"),
+                  temperature=("props", "temperature"),
+                  schedule_override=("props", "scheduleOverride"),
+                  previous_mode=("props", "previous", "mode"),
+                  previous_target=("props", "previous", "target"))
+
+
+class HotwaterNode(HiveNode):
+    """Initiate Hive Hotwater Node Class."""
+
+    __slots__ = ("mode", "status", "boost", "schedule", "previous_mode")
+    fields = dict(HiveNode.fields,
+                  mode=("state", "mode"),
+                  status=("state", "status"),
+                  boost=("state", "boost"),
+                  schedule=("state", "schedule"),
+                  previous_mode=("props", "previous", "mode"))
+
+
+class LightNode(HiveNode):
+    """Initiate Hive Light Node Class."""
+
+    __slots__ = ("status", "mode", "brightness", "colour_mode",
+                 "colour_temperature", "hue", "saturation", "value",
+                 "colour_temperature_min", "colour_temperature_max")
+    fields = dict(HiveNode.fields,
+                  status=("state", "status"),
+                  mode=("state", "mode"),
+                  brightness=("state", "brightness"),
+                  colour_mode=("state", "colourMode"),
+                  colour_temperature=("state", "colourTemperature"),
+                  hue=("state", "hue"),
+                  saturation=("state", "saturation"),
+                  value=("state", "value"),
+                  colour_temperature_min=("props", "colourTemperature", "min"),
+                  colour_temperature_max=("props", "colourTemperature", "max"))
+
+
+class PlugNode(HiveNode):
+    """Initiate Hive Plug Node Class."""
+
+    __slots__ = ("status", "mode", "power_consumption")
+    fields = dict(HiveNode.fields,
+                  status=("state", "status"),
+                  mode=("state", "mode"),
+                  power_consumption=("props", "powerConsumption"))
+
+
+class SensorNode(HiveNode):
+    """Initiate Hive Sensor Node Class."""
+
+    __slots__ = ("status", "motion_status")
+    fields = dict(HiveNode.fields,
+                  status=("props", "status"),
+                  motion_status=("props", "motion", "status"))
+
+
+class HiveSchedule:
+    """Initiate Hive Schedule Class."""
+
+    __slots__ = ("payload", "starts", "slots")
+
+    def __init__(self, hive_api_schedule):
+        """Compile a weekly schedule into slots sorted by minute of week."""
+        week_slots = []
+        for day_index, day_name in enumerate(SCHEDULE_DAYS):
+            for a_slot in (hive_api_schedule or {}).get(day_name, []):
+                week_slots.append((day_index * 1440 + a_slot["start"], a_slot))
+        week_slots.sort(key=operator.itemgetter(0))
+
+        self.payload = hive_api_schedule
+        self.starts = [slot_start for slot_start, a_slot in week_slots]
+        self.slots = [a_slot for slot_start, a_slot in week_slots]
+
+
+class HiveNodeChanges:
+    """Initiate Hive Node Changes Class."""
+
+    __slots__ = ("generation", "added", "removed", "changed")
+
+    def __init__(self, generation, added, removed, changed):
+        """Store the nodes changed by a refresh."""
+        self.generation = generation
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self):
+        """Check if anything changed."""
+        return bool(self.added or self.removed or self.changed)
+
+
+class HiveListener:
+    """Initiate Hive Listener Class."""
+
+    __slots__ = ("callback", "node_id", "attribute", "device_type", "use_executor")
+
+    def __init__(self, callback, node_id, attribute, device_type, use_executor):
+        """Store a change callback and the changes it is interested in."""
+        self.callback = callback
+        self.node_id = node_id
+        self.attribute = attribute
+        self.device_type = device_type
+        self.use_executor = use_executor
 
 
 class HivePlatformData:
     """Initiate Hive PlatformData Class."""
 
-    minmax = {}
+    def __init__(self):
+        """Set the initial values."""
+        self.minmax = {}
+        self.schedules = {}
 
 
 class HiveTemperature:
     """Initiate Hive Temperature Class."""
 
-    unit = ""
-    value = 0.00
+    def __init__(self):
+        """Set the initial values."""
+        self.unit = ""
+        self.value = 0.00
 
 
 class HiveWeather:
     """Initiate Hive Weather Class."""
 
-    last_update = datetime(2017, 1, 1, 12, 0, 0)
-    nodeid = ""
-    icon = ""
-    description = ""
-    temperature = HiveTemperature()
+    def __init__(self):
+        """Set the initial values."""
+        self.last_update = datetime(2017, 1, 1, 12, 0, 0)
+        self.nodeid = ""
+        self.icon = ""
+        self.description = ""
+        self.temperature = HiveTemperature()
 
 
 class HiveSession:
     """Initiate Hive Session Class."""
 
-    session_id = ""
-    session_logon_datetime = datetime(2017, 1, 1, 12, 0, 0)
-    username = ""
-    password = ""
-    postcode = ""
-    timezone = ""
-    countrycode = ""
-    locale = ""
-    temperature_unit = ""
-    devices = HiveDevices()
-    products = HiveProducts()
-    weather = HiveWeather()
-    data = HivePlatformData()
-#    holiday_mode = Hive_HolidayMode()
-    update_node_interval_seconds = HIVE_NODE_UPDATE_INTERVAL_DEFAULT
-    update_weather_interval_seconds = HIVE_WEATHER_UPDATE_INTERVAL_DEFAULT
-    last_update = datetime(2017, 1, 1, 12, 0, 0)
-    logging = False
-    file = False
+    def __init__(self):
+        """Set the initial values."""
+        self.session_id = ""
+        self.session_logon_datetime = datetime(2017, 1, 1, 12, 0, 0)
+        self.session_expiry = datetime(2017, 1, 1, 12, 0, 0)
+        self.logon_lock = threading.Lock()
+        self.logon_failures = 0
+        self.logon_retry_after = datetime(2017, 1, 1, 12, 0, 0)
+        self.session_cache_file = None
+        self.node_snapshot_file = None
+        self.username = ""
+        self.password = ""
+        self.postcode = ""
+        self.timezone = ""
+        self.countrycode = ""
+        self.locale = ""
+        self.temperature_unit = ""
+        self.state = HiveState(HiveDevices(), HiveProducts())
+        self.state_lock = threading.RLock()
+        self.weather = HiveWeather()
+        self.data = HivePlatformData()
+#        self.holiday_mode = Hive_HolidayMode()
+        self.update_node_interval_seconds = HIVE_NODE_UPDATE_INTERVAL_DEFAULT
+        self.update_weather_interval_seconds = HIVE_WEATHER_UPDATE_INTERVAL_DEFAULT
+        self.last_update = datetime(2017, 1, 1, 12, 0, 0)
+        self.optimistic_writes = False
+        self.reconcile_seconds = HIVE_RECONCILE_SECONDS_DEFAULT
+        self.reconcile_due = None
+        self.node_refresh_supported = True
+        self.generation = 0
+        self.node_values = {}
+        self.parsed_state = None
+        self.parsed_hashes = (None, None)
+        self.validators = {}
+        self.changes = None
+        self.listeners = []
+        self.refresher = None
+        self.nodes_flights = {}
+        self.nodes_flights_lock = threading.Lock()
+        self.write_debounce_seconds = 0
+        self.confirm_flight = None
+        self.confirm_nodes = set()
+        self.confirm_started = datetime(2017, 1, 1, 12, 0, 0)
+        self.confirm_due = datetime(2017, 1, 1, 12, 0, 0)
+        self.confirm_lock = threading.Lock()
+        self.warm_start = None
+        self.initialise_successful = False
+        self.closed = False
+        self.refresh_jitter_seconds = HIVE_REFRESH_JITTER_SECONDS_DEFAULT
+        self.adaptive_polling = False
+        self.poll_fast_seconds = HIVE_POLL_FAST_SECONDS_DEFAULT
+        self.poll_backoff_max = HIVE_POLL_BACKOFF_MAX_DEFAULT
+        self.unchanged_refreshes = 0
+        self.last_write = datetime(2017, 1, 1, 12, 0, 0)
+        self.logging = False
+        self.file = False
+
+    @property
+    def devices(self):
+        """Get the devices of the current state."""
+        return self.state.devices
+
+    @property
+    def products(self):
+        """Get the products of the current state."""
+        return self.state.products
 
 
 class HiveAPIURLS:
     """Initiate Hive API URLS Class."""
 
-    global_login = ""
-    base = ""
-    weather = ""
-    holiday_mode = ""
-    devices = ""
-    products = ""
-    nodes = ""
+    def __init__(self):
+        """Set the initial values."""
+        self.global_login = ""
+        self.base = ""
+        self.weather = ""
+        self.holiday_mode = ""
+        self.devices = ""
+        self.products = ""
+        self.nodes = ""
 
 
 class HiveAPIHeaders:
     """Initiate Hive API Headers Class."""
 
-    accept_key = ""
-    accept_value = ""
-    content_type_key = ""
-    content_type_value = ""
-    session_id_key = ""
-    session_id_value = ""
+    def __init__(self):
+        """Set the initial values."""
+        self.accept_key = ""
+        self.accept_value = ""
+        self.content_type_key = ""
+        self.content_type_value = ""
+        self.session_id_key = ""
+        self.session_id_value = ""
 
 
-class HiveAPIDetails:
-    """Initiate Hive API Details Class."""
+class HiveAPIValidators:
+    """Initiate Hive API Validators Class."""
 
-    urls = HiveAPIURLS()
-    headers = HiveAPIHeaders()
-    platform_name = ""
+    def __init__(self, etag, last_modified, body_hash):
+        """Set the initial values."""
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body_hash = body_hash
 
 
-HIVE_API = HiveAPIDetails()
-HSC = HiveSession()
+class HiveAPIUnavailable(IOError):
+    """Raised without sending a request while the Hive API is known to be down."""
 
 
-class Pyhiveapi:
+class HiveAPICircuit:
+    """Initiate Hive API Circuit Class."""
+
     def __init__(self):
-        """Initialise the base variable values."""
+        """Set the initial values."""
+        self.failures = 0
+        self.open_until = datetime(2017, 1, 1, 12, 0, 0)
+
+
+class HiveAPIRetry:
+    """Initiate Hive API Retry Class."""
+
+    def __init__(self, retries=HIVE_API_RETRIES_DEFAULT,
+                 backoff_seconds=HIVE_API_RETRY_BACKOFF_SECONDS_DEFAULT,
+                 backoff_max_seconds=HIVE_API_RETRY_BACKOFF_MAX_SECONDS_DEFAULT,
+                 circuit_failures=HIVE_API_CIRCUIT_FAILURES_DEFAULT,
+                 circuit_reset_seconds=HIVE_API_CIRCUIT_RESET_SECONDS_DEFAULT):
+        """Set up the retry policy and a circuit breaker for each host."""
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.circuit_failures = circuit_failures
+        self.circuit_reset_seconds = circuit_reset_seconds
+        self.circuits = {}
+        self.lock = threading.Lock()
+
+    def retry_after_seconds(self, retry_after):
+        """Get the seconds asked for by a Retry-After header, if any."""
+        if retry_after is None:
+            return None
+
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
 
-        HIVE_API.platform_name = ""
+        try:
+            retry_datetime = parsedate_to_datetime(retry_after)
+        except (IndexError, TypeError, ValueError):
+            return None
+        if retry_datetime is None:
+            return None
+        if retry_datetime.tzinfo is None:
+            retry_datetime = retry_datetime.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_datetime - datetime.now(timezone.utc)).total_seconds())
+
+    def retry_delay(self, attempt, status_code, retry_after_seconds):
+        """Get the seconds to wait before retrying a request, or None to give up."""
+        if attempt >= self.retries:
+            return None
+        if status_code is not None and status_code not in HIVE_API_RETRY_STATUS:
+            return None
+
+        if retry_after_seconds is None:
+            return random.uniform(0, min(self.backoff_max_seconds,
+                                         self.backoff_seconds * 2 ** attempt))
+        if retry_after_seconds > self.backoff_max_seconds:
+            return None
+        return retry_after_seconds
+
+    def request_allowed(self, host):
+        """Check if a request to a host may be sent, failing fast while its circuit is open."""
+        with self.lock:
+            circuit = self.circuits.get(host)
+            if circuit is None:
+                return True
+
+            current_time = datetime.now()
+            if current_time < circuit.open_until:
+                return False
+            if circuit.failures >= self.circuit_failures:
+                # Let this request try the host and hold back the rest until it finishes.
+                circuit.open_until = current_time + timedelta(seconds=self.circuit_reset_seconds)
+            return True
+
+    def record_result(self, host, status_code, retry_after_seconds):
+        """Record the result of a request to a host; status None for no response."""
+        with self.lock:
+            circuit = self.circuits.get(host)
+            if circuit is None:
+                circuit = HiveAPICircuit()
+
+            current_time = datetime.now()
+            if status_code is None or status_code >= 500:
+                circuit.failures += 1
+                if circuit.failures >= self.circuit_failures:
+                    circuit.open_until = current_time + timedelta(seconds=self.circuit_reset_seconds)
+            else:
+                circuit.failures = 0
+                circuit.open_until = current_time
 
-        HIVE_API.urls.global_login = "https://beekeeper.hivehome.com/1.0/global/login"
-        HIVE_API.urls.base = ""
-        HIVE_API.urls.weather = "https://weather-prod.bgchprod.info/weather"
-        HIVE_API.urls.holiday_mode = "/holiday-mode"
-        HIVE_API.urls.devices = "/devices"
-        HIVE_API.urls.products = "/products"
-        HIVE_API.urls.nodes = "/nodes"
+            if retry_after_seconds is not None and status_code in HIVE_API_RETRY_STATUS:
+                circuit.open_until = max(circuit.open_until,
+                                         current_time + timedelta(seconds=retry_after_seconds))
 
-        HIVE_API.headers.accept_key = "Accept"
-        HIVE_API.headers.accept_value = "*/*"
-        HIVE_API.headers.content_type_key = "content-type"
-        HIVE_API.headers.content_type_value = "application/json"
-        HIVE_API.headers.session_id_key = "authorization"
-        HIVE_API.headers.session_id_value = None
+            if circuit.failures == 0 and circuit.open_until <= current_time:
+                self.circuits.pop(host, None)
+            else:
+                self.circuits[host] = circuit
+
+
+class HiveTokenBucket:
+    """Initiate Hive Token Bucket Class."""
+
+    def __init__(self, rate, burst):
+        """Set up a bucket refilled with rate tokens a second, holding up to burst."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, getting the seconds to wait until it is available."""
+        with self.lock:
+            current_time = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (current_time - self.updated) * self.rate)
+            self.updated = current_time
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class HiveAPIRateLimit:
+    """Initiate Hive API Rate Limit Class."""
+
+    def __init__(self, read_rate=HIVE_API_READ_RATE_DEFAULT,
+                 read_burst=HIVE_API_READ_BURST_DEFAULT,
+                 write_rate=HIVE_API_WRITE_RATE_DEFAULT,
+                 write_burst=HIVE_API_WRITE_BURST_DEFAULT):
+        """Set up separate read and write budgets; a rate of None is unlimited."""
+        self.reads = None
+        self.writes = None
+        if read_rate is not None:
+            self.reads = HiveTokenBucket(read_rate, read_burst)
+        if write_rate is not None:
+            self.writes = HiveTokenBucket(write_rate, write_burst)
+
+    def delay(self, request_type):
+        """Reserve a request, getting the seconds to wait before sending it."""
+        if request_type == "GET":
+            bucket = self.reads
+        else:
+            bucket = self.writes
+
+        if bucket is None:
+            return 0.0
+        return bucket.reserve()
+
+
+class HiveAPITransport:
+    """Initiate Hive API Transport Class."""
+
+    def __init__(self, pool_size=HIVE_API_POOL_SIZE_DEFAULT,
+                 keepalive_seconds=HIVE_API_KEEPALIVE_SECONDS_DEFAULT,
+                 retry=None, rate_limit=None):
+        """Set up a pooled, keep-alive HTTP transport."""
+        if retry is None:
+            retry = HiveAPIRetry()
+        if rate_limit is None:
+            rate_limit = HiveAPIRateLimit()
+        self.pool_size = pool_size
+        self.keepalive_seconds = keepalive_seconds
+        self.retry = retry
+        self.rate_limit = rate_limit
+        self.session = None
+        self.session_created = datetime(2017, 1, 1, 12, 0, 0)
+        self.lock = threading.Lock()
+
+    def get_session(self):
+        """Get the pooled session, recycling it after its keep-alive lifetime."""
+        with self.lock:
+            current_time = datetime.now()
+            session_age_secs = (current_time - self.session_created).total_seconds()
+            if self.session is None or session_age_secs >= self.keepalive_seconds:
+                if self.session is not None:
+                    self.session.close()
+                adapter = HTTPAdapter(pool_connections=self.pool_size,
+                                      pool_maxsize=self.pool_size)
+                self.session = requests.Session()
+                self.session.mount("https://", adapter)
+                self.session.mount("http://", adapter)
+                self.session_created = current_time
+            return self.session
+
+    def request(self, request_type, request_url, data, headers, timeout, rate_limit=None):
+        """Send a request, retrying failures; rate_limit is an extra budget of the caller."""
+        host = urlsplit(request_url).netloc
+        attempt = 0
+
+        while True:
+            if not self.retry.request_allowed(host):
+                raise HiveAPIUnavailable("Hive API is unavailable: " + host)
+
+            rate_limit_delay = self.rate_limit.delay(request_type)
+            if rate_limit is not None:
+                rate_limit_delay = max(rate_limit_delay, rate_limit.delay(request_type))
+            if rate_limit_delay > 0:
+                time.sleep(rate_limit_delay)
+
+            try:
+                response = self.get_session().request(request_type,
+                                                      request_url,
+                                                      data=data,
+                                                      headers=headers,
+                                                      timeout=timeout)
+            except IOError:
+                self.retry.record_result(host, None, None)
+                retry_delay = self.retry.retry_delay(attempt, None, None)
+                if retry_delay is None:
+                    raise
+            else:
+                retry_after_seconds = self.retry.retry_after_seconds(response.headers.get("Retry-After"))
+                self.retry.record_result(host, response.status_code, retry_after_seconds)
+                retry_delay = self.retry.retry_delay(attempt, response.status_code, retry_after_seconds)
+                if retry_delay is None:
+                    return response
+
+            time.sleep(retry_delay)
+            attempt += 1
+
+    def close(self):
+        """Close all pooled connections."""
+        with self.lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+
+class HiveRefresher:
+    """Initiate Hive Refresher Class."""
+
+    def __init__(self, hive):
+        """Set up a background thread refreshing the Hive nodes."""
+        self.hive = hive
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Start refreshing in the background."""
+        if not self.is_running():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run,
+                                           name="HiveRefresher",
+                                           daemon=True)
+            self.thread.start()
+
+    def run(self):
+        """Refresh the Hive nodes each time they are due until stopped."""
+        while not self.stop_event.is_set():
+            woken = self.wake_event.wait(Pyhiveapi.p_next_refresh_delay(self.hive))
+            self.wake_event.clear()
+            if self.stop_event.is_set():
+                break
+            if woken:
+                continue
+
+            try:
+                Pyhiveapi.hive_api_get_nodes(self.hive, "NoID")
+            except Exception:
+                # Keep refreshing; the next update will try again.
+                _LOGGER.exception("Error refreshing Hive nodes")
+
+    def wake(self):
+        """Work out when the next refresh is due again."""
+        self.wake_event.set()
+
+    def stop(self, timeout=None):
+        """Stop refreshing and wait for the thread to finish."""
+        self.stop_event.set()
+        self.wake_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    def is_running(self):
+        """Check if the refresher thread is running."""
+        return self.thread is not None and self.thread.is_alive()
+
+
+class HiveAPIDetails:
+    """Initiate Hive API Details Class."""
+
+    def __init__(self):
+        """Set the initial values."""
+        self.urls = HiveAPIURLS()
+        self.headers = HiveAPIHeaders()
+        self.transport = None
+        self.owns_transport = True
+        self.executor = None
+        self.owns_executor = True
+        self.callback_executor = None
+        self.rate_limit = None
+        self.platform_name = ""
+
+
+class HiveDomain:
+    """Initiate Hive Domain Class."""
+
+    def __init__(self, hive):
+        """Attach to a Hive account."""
+        self.hive = hive
+        self.hsc = hive.hsc
+        self.hive_api = hive.hive_api
+        self.node_attribs = hive.node_attribs
+
+
+class Pyhiveapi:
+    def __init__(self, pool_size=HIVE_API_POOL_SIZE_DEFAULT,
+                 keepalive_seconds=HIVE_API_KEEPALIVE_SECONDS_DEFAULT,
+                 optimistic_writes=False,
+                 reconcile_seconds=HIVE_RECONCILE_SECONDS_DEFAULT,
+                 adaptive_polling=False,
+                 transport=None,
+                 executor=None,
+                 session_cache_file=None,
+                 node_snapshot_file=None,
+                 retry=None,
+                 rate_limit=None,
+                 write_debounce_seconds=0):
+        """Initialise the base variable values."""
+        self.hsc = HiveSession()
+        self.hive_api = HiveAPIDetails()
+        self.node_attribs = {"Header": "HeaderText"}
+
+        self.hive_api.platform_name = ""
+
+        self.hsc.optimistic_writes = optimistic_writes
+        self.hsc.reconcile_seconds = reconcile_seconds
+        self.hsc.adaptive_polling = adaptive_polling
+        self.hsc.session_cache_file = session_cache_file
+        self.hsc.node_snapshot_file = node_snapshot_file
+        self.hsc.write_debounce_seconds = write_debounce_seconds
+
+        self.hive_api.owns_transport = transport is None
+        if transport is None:
+            transport = HiveAPITransport(pool_size, keepalive_seconds, retry, rate_limit)
+        else:
+            # A shared transport has its own budget; this one is for this account only.
+            self.hive_api.rate_limit = rate_limit
+        self.hive_api.transport = transport
+
+        self.hive_api.owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=HIVE_API_FETCH_WORKERS_DEFAULT)
+        self.hive_api.executor = executor
+
+        self.hive_api.urls.global_login = "https://beekeeper.hivehome.com/1.0/global/login"
+        self.hive_api.urls.base = ""
+        self.hive_api.urls.weather = "https://weather-prod.bgchprod.info/weather"
+        self.hive_api.urls.holiday_mode = "/holiday-mode"
+        self.hive_api.urls.devices = "/devices"
+        self.hive_api.urls.products = "/products"
+        self.hive_api.urls.nodes = "/nodes"
+
+        self.hive_api.headers.accept_key = "Accept"
+        self.hive_api.headers.accept_value = "*/*"
+        self.hive_api.headers.content_type_key = "content-type"
+        self.hive_api.headers.content_type_value = "application/json"
+        self.hive_api.headers.session_id_key = "authorization"
+        self.hive_api.headers.session_id_value = None
+
+        self.heating = type(self).Heating(self)
+        self.hotwater = type(self).Hotwater(self)
+        self.light = type(self).Light(self)
+        self.sensor = type(self).Sensor(self)
+        self.switch = type(self).Switch(self)
+        self.weather = type(self).Weather(self)
+
+
+    def close(self):
+        """Close the pooled connections and worker threads."""
+        self.hsc.closed = True
+        Pyhiveapi.stop_refresher(self)
+        warm_start = self.hsc.warm_start
+        if (warm_start is not None and warm_start.is_alive() and
+                warm_start is not threading.current_thread()):
+            warm_start.join()
+        if self.hive_api.transport is not None and self.hive_api.owns_transport:
+            self.hive_api.transport.close()
+        if self.hive_api.executor is not None and self.hive_api.owns_executor:
+            self.hive_api.executor.shutdown(wait=False)
+        self.hive_api.executor = None
+        if self.hive_api.callback_executor is not None:
+            self.hive_api.callback_executor.shutdown(wait=False)
+            self.hive_api.callback_executor = None
 
 
     def hive_api_json_call(self, request_type, request_url, json_string_content, absolute_request_url):
         """Call the JSON Hive API and return any returned data."""
-        api_headers = {HIVE_API.headers.content_type_key:
-                       HIVE_API.headers.content_type_value,
-                       HIVE_API.headers.accept_key:
-                       HIVE_API.headers.accept_value,
-                       HIVE_API.headers.session_id_key:
-                       HIVE_API.headers.session_id_value}
+        api_headers = {self.hive_api.headers.content_type_key:
+                       self.hive_api.headers.content_type_value,
+                       self.hive_api.headers.accept_key:
+                       self.hive_api.headers.accept_value,
+                       self.hive_api.headers.session_id_key:
+                       self.hive_api.headers.session_id_value}
 
         requests_timeout = 10
         json_return = {}
@@ -152,25 +798,24 @@ class Pyhiveapi:
         if absolute_request_url:
             full_request_url = request_url
         else:
-            full_request_url = HIVE_API.urls.base + request_url
+            full_request_url = self.hive_api.urls.base + request_url
+
+        api_validators = None
+        if request_type == "GET":
+            api_validators = Pyhiveapi.p_conditional_headers(self, full_request_url, api_headers)
+
+        if self.hive_api.transport is None:
+            self.hive_api.transport = HiveAPITransport()
 
         json_call_try_finished = False
         try:
-            if request_type == "POST":
-                json_response = requests.post(full_request_url,
-                                              data=json_string_content,
-                                              headers=api_headers,
-                                              timeout=requests_timeout)
-            elif request_type == "GET":
-                json_response = requests.get(full_request_url,
-                                             data=json_string_content,
-                                             headers=api_headers,
-                                             timeout=requests_timeout)
-            elif request_type == "PUT":
-                json_response = requests.put(full_request_url,
-                                             data=json_string_content,
-                                             headers=api_headers,
-                                             timeout=requests_timeout)
+            if request_type in ("POST", "GET", "PUT"):
+                json_response = self.hive_api.transport.request(request_type,
+                                                           full_request_url,
+                                                           json_string_content,
+                                                           api_headers,
+                                                           requests_timeout,
+                                                           self.hive_api.rate_limit)
             else:
                 json_response = ""
 
@@ -186,78 +831,158 @@ class Pyhiveapi:
             parse_json_try_finished = False
             try:
                 json_return['original'] = json_response
-                json_return['parsed'] = json_response.json()
+                if request_type == "GET":
+                    json_body = Pyhiveapi.p_parse_json_body(self, full_request_url, api_validators,
+                                                            json_response.status_code, json_response.headers,
+                                                            json_response.content)
+                    json_return['parsed'], json_return['unchanged'], json_return['body_hash'] = json_body
+                else:
+                    json_return['parsed'] = json_response.json()
 
                 parse_json_try_finished = True
-            except (IOError, RuntimeError, ZeroDivisionError):
+            except (IOError, RuntimeError, ValueError, ZeroDivisionError):
                 parse_json_try_finished = False
             finally:
                 if not parse_json_try_finished:
                     json_return['original'] = "Error parsing JSON data"
                     json_return['parsed'] = "Error parsing JSON data"
 
+            if not absolute_request_url and Pyhiveapi.p_session_rejected(self, json_response):
+                Pyhiveapi.p_clear_session(self, api_headers[self.hive_api.headers.session_id_key])
+
         return json_return
 
 
-    def hive_api_logon(self):
-        """Log in to the Hive API and get the Session ID."""
-        login_details_found = True
-        HSC.session_id = None
+    def p_conditional_headers(self, request_url, api_headers):
+        """Add the validators of the last response from a URL to a GET request."""
+        api_validators = self.hsc.validators.get(request_url)
+        if api_validators is not None:
+            if api_validators.etag is not None:
+                api_headers["If-None-Match"] = api_validators.etag
+            if api_validators.last_modified is not None:
+                api_headers["If-Modified-Since"] = api_validators.last_modified
+        return api_validators
 
-        try_finished = False
-        try:
-            api_resp_d = {}
-            api_resp_p = None
 
-            json_string_content = '{"username": "' + HSC.username + '","password": "' + HSC.password + '"}'
+    def p_parse_json_body(self, request_url, api_validators, status_code, response_headers, body):
+        """Parse a GET response, skipping the parse if the data has not changed."""
+        if api_validators is not None and status_code == 304:
+            return None, True, api_validators.body_hash
 
-            api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST", HIVE_API.urls.global_login, json_string_content, True)
-            api_resp_p = api_resp_d['parsed']
+        body_hash = hashlib.sha1(body).digest()
+        body_unchanged = (status_code == 200 and api_validators is not None and
+                          body_hash == api_validators.body_hash)
+        parsed = None
+        if not body_unchanged:
+            parsed = json.loads(body)
 
-            if ('token' in api_resp_p and
-                    'user' in api_resp_p and
-                    'platform' in api_resp_p):
-                HIVE_API.headers.session_id_value = api_resp_p["token"]
-                HSC.session_id = HIVE_API.headers.session_id_value
-                HSC.session_logon_datetime = datetime.now()
+        if status_code == 200:
+            self.hsc.validators[request_url] = HiveAPIValidators(response_headers.get("ETag"),
+                                                                 response_headers.get("Last-Modified"),
+                                                                 body_hash)
+        return parsed, body_unchanged, body_hash
 
-                if 'endpoint' in api_resp_p['platform']:
-                    HIVE_API.urls.base = api_resp_p['platform']['endpoint']
-                else:
-                    login_details_found = False
 
-                if 'name' in api_resp_p['platform']:
-                    HIVE_API.platform_name = api_resp_p['platform']['name']
-                else:
-                    login_details_found = False
+    def p_unconditional_call(self, request_type, request_url, json_string_content, absolute_request_url):
+        """Drop the validators of a JSON Hive API request, so its body is sent and parsed again."""
+        full_request_url = request_url
+        if not absolute_request_url:
+            full_request_url = self.hive_api.urls.base + request_url
+        self.hsc.validators.pop(full_request_url, None)
+        return request_type, request_url, json_string_content, absolute_request_url
 
-                if 'locale' in api_resp_p['user']:
-                    HSC.locale = api_resp_p['user']['locale']
-                else:
-                    login_details_found = False
 
-                if 'countryCode' in api_resp_p['user']:
-                    HSC.countrycode = api_resp_p['user']['countryCode']
-                else:
-                    login_details_found = False
+    def p_logon_content(self):
+        """Get the JSON content for a Hive API log in."""
+        return '{"username": "' + self.hsc.username + '","password": "' + self.hsc.password + '"}'
 
-                if 'timezone' in api_resp_p['user']:
-                    HSC.timezone = api_resp_p['user']['timezone']
-                else:
-                    login_details_found = False
 
-                if 'postcode' in api_resp_p['user']:
-                    HSC.postcode = api_resp_p['user']['postcode']
-                else:
-                    login_details_found = False
+    def p_store_logon(self, api_resp_p):
+        """Store the session details returned by a Hive API log in."""
+        login_details_found = True
 
-                if 'temperatureUnit' in api_resp_p['user']:
-                    HSC.temperature_unit = api_resp_p['user']['temperatureUnit']
-                else:
-                    login_details_found = False
+        if ('token' in api_resp_p and
+                'user' in api_resp_p and
+                'platform' in api_resp_p):
+            self.hive_api.headers.session_id_value = api_resp_p["token"]
+            self.hsc.session_id = self.hive_api.headers.session_id_value
+            self.hsc.session_logon_datetime = datetime.now()
+
+            session_expiry = Pyhiveapi.p_token_expiry(self, api_resp_p["token"])
+            if session_expiry is None:
+                session_expiry = (self.hsc.session_logon_datetime
+                                  + timedelta(minutes=MINUTES_BETWEEN_LOGONS))
+            else:
+                session_expiry = session_expiry - timedelta(seconds=HIVE_LOGON_EXPIRY_MARGIN_SECONDS)
+            self.hsc.session_expiry = session_expiry
+
+            if 'endpoint' in api_resp_p['platform']:
+                self.hive_api.urls.base = api_resp_p['platform']['endpoint']
+            else:
+                login_details_found = False
+
+            if 'name' in api_resp_p['platform']:
+                self.hive_api.platform_name = api_resp_p['platform']['name']
             else:
                 login_details_found = False
 
+            if 'locale' in api_resp_p['user']:
+                self.hsc.locale = api_resp_p['user']['locale']
+            else:
+                login_details_found = False
+
+            if 'countryCode' in api_resp_p['user']:
+                self.hsc.countrycode = api_resp_p['user']['countryCode']
+            else:
+                login_details_found = False
+
+            if 'timezone' in api_resp_p['user']:
+                self.hsc.timezone = api_resp_p['user']['timezone']
+            else:
+                login_details_found = False
+
+            if 'postcode' in api_resp_p['user']:
+                self.hsc.postcode = api_resp_p['user']['postcode']
+            else:
+                login_details_found = False
+
+            if 'temperatureUnit' in api_resp_p['user']:
+                self.hsc.temperature_unit = api_resp_p['user']['temperatureUnit']
+            else:
+                login_details_found = False
+        else:
+            login_details_found = False
+
+        return login_details_found
+
+
+    def p_token_expiry(self, session_token):
+        """Get the expiry time of a JWT session token, if it has one."""
+        try:
+            token_payload = session_token.split(".")[1]
+            token_payload += "=" * (-len(token_payload) % 4)
+            token_claims = json.loads(base64.urlsafe_b64decode(token_payload))
+            return datetime.fromtimestamp(int(token_claims["exp"]))
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+            return None
+
+
+    def hive_api_logon(self):
+        """Log in to the Hive API and get the Session ID."""
+        login_details_found = True
+
+        try_finished = False
+        try:
+            api_resp_d = {}
+            api_resp_p = None
+
+            json_string_content = Pyhiveapi.p_logon_content(self)
+
+            api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST", self.hive_api.urls.global_login, json_string_content, True)
+            api_resp_p = api_resp_d['parsed']
+
+            login_details_found = Pyhiveapi.p_store_logon(self, api_resp_p)
+
             try_finished = True
 
         except (IOError, RuntimeError, ZeroDivisionError):
@@ -267,203 +992,993 @@ class Pyhiveapi:
                 login_details_found = False
 
         if not login_details_found:
-            HSC.session_id = None
+            self.hsc.session_id = None
+        else:
+            Pyhiveapi.p_save_session_cache(self)
+
+
+    def p_session_rejected(self, api_resp):
+        """Check if a Hive API request was refused because of the Session ID."""
+        return getattr(api_resp, "status_code", None) in HIVE_SESSION_REJECTED_STATUS
+
+
+    def p_clear_session(self, session_id):
+        """Forget a rejected Session ID so the next request logs in again."""
+        if session_id is not None and self.hsc.session_id == session_id:
+            self.hsc.session_id = None
+            if self.hsc.session_cache_file is not None:
+                try:
+                    os.remove(self.hsc.session_cache_file)
+                except OSError:
+                    pass
+
+
+    def p_save_session_cache(self):
+        """Save the Session ID and platform details for the next start."""
+        if self.hsc.session_cache_file is None or self.hsc.session_id is None:
+            return False
+
+        session_cache = {"username": self.hsc.username,
+                         "token": self.hsc.session_id,
+                         "logon": self.hsc.session_logon_datetime.timestamp(),
+                         "expiry": self.hsc.session_expiry.timestamp(),
+                         "platform": {"endpoint": self.hive_api.urls.base,
+                                      "name": self.hive_api.platform_name},
+                         "user": {"locale": self.hsc.locale,
+                                  "countryCode": self.hsc.countrycode,
+                                  "timezone": self.hsc.timezone,
+                                  "postcode": self.hsc.postcode,
+                                  "temperatureUnit": self.hsc.temperature_unit}}
+
+        tmp_file_name = os.fspath(self.hsc.session_cache_file) + ".tmp"
+        try:
+            tmp_file = os.open(tmp_file_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(tmp_file, "w") as cache_file:
+                json.dump(session_cache, cache_file)
+            os.replace(tmp_file_name, self.hsc.session_cache_file)
+        except (IOError, OSError, TypeError, ValueError):
+            return False
+
+        return True
+
+
+    def p_load_session_cache(self):
+        """Use the cached Session ID and platform details if not expired."""
+        if self.hsc.session_cache_file is None:
+            return False
+
+        try:
+            with open(self.hsc.session_cache_file) as cache_file:
+                session_cache = json.load(cache_file)
+            session_logon_datetime = datetime.fromtimestamp(session_cache["logon"])
+            session_expiry = datetime.fromtimestamp(session_cache["expiry"])
+        except (IOError, OSError, KeyError, TypeError, ValueError):
+            return False
+
+        if session_cache.get("username") != self.hsc.username or datetime.now() >= session_expiry:
+            return False
+
+        if not Pyhiveapi.p_store_logon(self, session_cache):
+            self.hsc.session_id = None
+            return False
+
+        self.hsc.session_logon_datetime = session_logon_datetime
+        self.hsc.session_expiry = session_expiry
+
+        return True
+
+
+    def p_logon_needed(self):
+        """Check if the session is missing or about to expire."""
+        return self.hsc.session_id is None or datetime.now() >= self.hsc.session_expiry
+
+
+    def p_logon_allowed(self):
+        """Check if a log in may be tried, backing off after failures."""
+        return datetime.now() >= self.hsc.logon_retry_after
+
+
+    def p_record_logon(self):
+        """Record the result of a log in for backing off after failures."""
+        if self.hsc.session_id is None:
+            self.hsc.logon_failures += 1
+            backoff_seconds = min(HIVE_LOGON_BACKOFF_SECONDS * 2 ** (self.hsc.logon_failures - 1),
+                                  HIVE_LOGON_BACKOFF_MAX_SECONDS)
+            self.hsc.logon_retry_after = datetime.now() + timedelta(seconds=backoff_seconds)
+        else:
+            self.hsc.logon_failures = 0
 
 
     def check_hive_api_logon(self):
         """Check if currently logged in with a valid Session ID."""
-        current_time = datetime.now()
-        l_logon_secs = (current_time - HSC.session_logon_datetime).total_seconds()
-        l_logon_mins = int(round(l_logon_secs / 60))
-
-        if l_logon_mins >= MINUTES_BETWEEN_LOGONS or HSC.session_id is None:
-            Pyhiveapi.hive_api_logon(self)
+        if Pyhiveapi.p_logon_needed(self):
+            with self.hsc.logon_lock:
+                if Pyhiveapi.p_logon_needed(self) and Pyhiveapi.p_logon_allowed(self):
+                    Pyhiveapi.hive_api_logon(self)
+                    Pyhiveapi.p_record_logon(self)
 
-        if HSC.file == True:
-            HSC.session_id = "Test"
+        if self.hsc.file == True:
+            self.hsc.session_id = "Test"
 
 
 
     def update_data(self, node_id):
         """Get latest data for Hive nodes - rate limiting."""
         nodes_updated = False
-        current_time = datetime.now()
-        last_update_secs = (current_time - HSC.last_update).total_seconds()
-        if last_update_secs >= HSC.update_node_interval_seconds:
+        if self.hsc.refresher is not None and self.hsc.refresher.is_running():
+            return nodes_updated
+
+        if datetime.now() >= Pyhiveapi.p_refresh_due(self):
             nodes_updated = Pyhiveapi.hive_api_get_nodes(self, node_id)
         return nodes_updated
 
 
+    def p_poll_interval(self):
+        """Get the seconds between node updates, adapted to recent activity."""
+        poll_interval = self.hsc.update_node_interval_seconds
+
+        if self.hsc.adaptive_polling:
+            last_write_secs = (datetime.now() - self.hsc.last_write).total_seconds()
+            boost_active = any(a_node.boost is not None
+                               for a_node in self.hsc.products.heating + self.hsc.products.hotwater)
+
+            if last_write_secs < HIVE_POLL_FAST_WINDOW_SECONDS or boost_active:
+                poll_interval = min(poll_interval, self.hsc.poll_fast_seconds)
+            else:
+                poll_interval = poll_interval * min(2 ** self.hsc.unchanged_refreshes,
+                                                    self.hsc.poll_backoff_max)
+
+        return poll_interval
+
+
+    def p_next_schedule_change(self):
+        """Get when the next schedule slot starts for heating or hot water following its schedule."""
+        schedule_change = None
+
+        products = self.hsc.products
+        schedule_nodes = ([a_node for a_node in products.heating
+                           if Pyhiveapi.Heating.p_node_mode(self, a_node) == "SCHEDULE"] +
+                          [a_node for a_node in products.hotwater
+                           if Pyhiveapi.Hotwater.p_node_mode(self, a_node) == "SCHEDULE"])
+
+        for a_node in schedule_nodes:
+            if a_node.schedule is not None:
+                snan = Pyhiveapi.p_get_schedule_now_next_later(self, Pyhiveapi.p_node_schedule(self, a_node))
+                if 'now' in snan:
+                    if snan['now']['Start_DateTime'] > self.hsc.last_update:
+                        slot_change = snan['now']['Start_DateTime']
+                    else:
+                        slot_change = snan['next']['Start_DateTime']
+                    if schedule_change is None or slot_change < schedule_change:
+                        schedule_change = slot_change
+
+        return schedule_change
+
+
+    def p_refresh_due(self):
+        """Get when the next node update is due."""
+        refresh_due = self.hsc.last_update + timedelta(seconds=Pyhiveapi.p_poll_interval(self))
+        if self.hsc.reconcile_due is not None and self.hsc.reconcile_due < refresh_due:
+            refresh_due = self.hsc.reconcile_due
+
+        if self.hsc.adaptive_polling:
+            schedule_change = Pyhiveapi.p_next_schedule_change(self)
+            if schedule_change is not None and schedule_change < refresh_due:
+                refresh_due = schedule_change
+
+        return refresh_due
+
+
+    def p_refresh_delay(self):
+        """Get the seconds until the next background refresh, with jitter."""
+        refresh_due = Pyhiveapi.p_refresh_due(self)
+
+        refresh_delay = ((refresh_due - datetime.now()).total_seconds()
+                         + random.uniform(0, self.hsc.refresh_jitter_seconds))
+
+        return max(refresh_delay, HIVE_REFRESH_MIN_SECONDS)
+
+
+    def p_next_refresh_delay(self):
+        """Get the seconds until the next background refresh, or a fallback on error."""
+        try:
+            return Pyhiveapi.p_refresh_delay(self)
+        except Exception:
+            _LOGGER.exception("Error working out the next Hive refresh")
+            return HIVE_REFRESH_FALLBACK_SECONDS
+
+
+    def start_refresher(self, jitter_seconds=HIVE_REFRESH_JITTER_SECONDS_DEFAULT):
+        """Keep the Hive nodes up to date from a background thread."""
+        self.hsc.refresh_jitter_seconds = jitter_seconds
+        if self.hsc.refresher is None:
+            self.hsc.refresher = HiveRefresher(self)
+        self.hsc.refresher.start()
+
+
+    def stop_refresher(self):
+        """Stop the background refresh thread."""
+        if self.hsc.refresher is not None:
+            self.hsc.refresher.stop()
+            self.hsc.refresher = None
+
+
+    def p_patch_node(self, node_id, api_call):
+        """Apply a successful node update to a copy of the stored node."""
+        changes = None
+        with self.hsc.state_lock:
+            for product_category in ("heating", "hotwater", "light", "plug"):
+                a_node = Pyhiveapi.p_get_product(self, node_id, product_category)
+                if a_node is not None:
+                    a_node = copy.copy(a_node)
+                    Pyhiveapi.p_patch_node_values(self, a_node, json.loads(api_call[1]))
+                    changes = Pyhiveapi.p_replace_product(self, product_category, a_node)
+                    node_values = self.hsc.node_values
+                    break
+
+        if a_node is None:
+            return False
+
+        if changes is not None:
+            Pyhiveapi.p_notify_listeners(self, changes, node_values)
+
+        if self.hsc.reconcile_due is None:
+            self.hsc.reconcile_due = datetime.now() + timedelta(seconds=self.hsc.reconcile_seconds)
+
+        return True
+
+
+    def p_patch_node_values(self, a_node, node_content):
+        """Set the node values changed by a node update."""
+        if "mode" in node_content and "boost" in a_node.fields:
+            if node_content["mode"] == "BOOST":
+                if a_node.mode != "BOOST":
+                    a_node.previous_mode = a_node.mode
+                    if "previous_target" in a_node.fields:
+                        a_node.previous_target = a_node.target
+            else:
+                a_node.boost = None
+
+        if ("target" in node_content and "schedule_override" in a_node.fields and
+                a_node.mode == "SCHEDULE" and node_content.get("mode", "SCHEDULE") == "SCHEDULE"):
+            a_node.schedule_override = True
+
+        for slot_name, field_path in a_node.fields.items():
+            if (len(field_path) == 2 and field_path[0] == "state" and
+                    field_path[1] in node_content):
+                setattr(a_node, slot_name, node_content[field_path[1]])
+
+
+    def p_record_write(self):
+        """Note a successful write so the next refresh can be brought forward."""
+        self.hsc.last_write = datetime.now()
+        if self.hsc.refresher is not None:
+            self.hsc.refresher.wake()
+
+
+    def p_hive_api_write(self, node_id, api_call):
+        """Send a node update to the Hive API and refresh on success."""
+        write_success = False
+
+        if api_call is not None:
+            api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST", api_call[0], api_call[1], False)
+            api_resp = api_resp_d['original']
+
+            if str(api_resp) == "<Response [200]>":
+                if not (self.hsc.optimistic_writes and
+                        Pyhiveapi.p_patch_node(self, node_id, api_call)):
+                    Pyhiveapi.p_confirm_write(self, node_id)
+                Pyhiveapi.p_record_write(self)
+                write_success = True
+
+        return write_success
+
+
+    def p_confirm_write(self, node_id):
+        """Refresh a written node, batching writes made within the debounce window."""
+        if self.hsc.write_debounce_seconds <= 0:
+            return Pyhiveapi.hive_api_get_node(self, node_id)
+
+        confirm_flight, confirm_leader = Pyhiveapi.p_debounce_write(self, node_id, Future)
+        if not confirm_leader:
+            return confirm_flight.result()
+
+        try:
+            confirm_success = Pyhiveapi.p_run_confirm(self)
+        except BaseException as exc:
+            confirm_flight.set_exception(exc)
+            raise
+        confirm_flight.set_result(confirm_success)
+
+        return confirm_success
+
+
+    def p_debounce_write(self, node_id, new_flight):
+        """Add a written node to the next confirmation refresh, starting one if needed."""
+        with self.hsc.confirm_lock:
+            current_time = datetime.now()
+            confirm_leader = self.hsc.confirm_flight is None
+            if confirm_leader:
+                self.hsc.confirm_started = current_time
+                self.hsc.confirm_flight = new_flight()
+
+            debounce_seconds = self.hsc.write_debounce_seconds
+            self.hsc.confirm_due = min(current_time + timedelta(seconds=debounce_seconds),
+                                       self.hsc.confirm_started + timedelta(
+                                           seconds=debounce_seconds * HIVE_WRITE_DEBOUNCE_MAX_WINDOWS))
+            self.hsc.confirm_nodes.add(node_id)
+
+            return self.hsc.confirm_flight, confirm_leader
+
+
+    def p_debounce_due(self):
+        """Get the seconds until the writes stop, or take the written nodes once they have."""
+        with self.hsc.confirm_lock:
+            wait_seconds = (self.hsc.confirm_due - datetime.now()).total_seconds()
+            if wait_seconds > 0:
+                return wait_seconds, None
+
+            confirm_nodes = self.hsc.confirm_nodes
+            self.hsc.confirm_flight = None
+            self.hsc.confirm_nodes = set()
+
+            return 0, confirm_nodes
+
+
+    def p_run_confirm(self):
+        """Wait for the writes to stop and refresh the nodes written."""
+        while True:
+            wait_seconds, confirm_nodes = Pyhiveapi.p_debounce_due(self)
+            if confirm_nodes is not None:
+                break
+            time.sleep(wait_seconds)
+
+        if len(confirm_nodes) == 1:
+            return Pyhiveapi.hive_api_get_node(self, next(iter(confirm_nodes)))
+        return Pyhiveapi.hive_api_get_nodes(self, "NoID")
+
+
+    def p_check_state_attributes(self, attributes, known_attributes):
+        """Reject set_state attributes the device does not have."""
+        for attribute_name in attributes:
+            if attribute_name not in known_attributes:
+                raise TypeError("set_state() got an unknown attribute '" + attribute_name + "'")
+
+
+    def p_merge_calls(self, api_calls):
+        """Merge Hive API calls for the same node into a single call."""
+        hive_api_url = None
+        merged_content = {}
+
+        for api_call in api_calls:
+            if api_call is None:
+                return None
+            if hive_api_url is not None and api_call[0] != hive_api_url:
+                return None
+            hive_api_url = api_call[0]
+            merged_content.update(json.loads(api_call[1]))
+
+        if hive_api_url is None:
+            return None
+
+        return (hive_api_url, json.dumps(merged_content))
+
+
     def hive_api_get_nodes_nl(self):
         """Get latest data for Hive nodes - not rate limiting."""
         Pyhiveapi.hive_api_get_nodes(self, "NoID")
 
 
-    def hive_api_get_nodes(self, node_id):
+    def p_hive_api_json_calls(self, api_calls):
+        """Call several JSON Hive API requests concurrently."""
+        if self.hsc.closed:
+            return [{'original': "No response to JSON Hive API request",
+                     'parsed': "No response to JSON Hive API request"} for api_call in api_calls]
+
+        if self.hive_api.executor is None:
+            self.hive_api.executor = ThreadPoolExecutor(max_workers=HIVE_API_FETCH_WORKERS_DEFAULT)
+
+        futures = []
+        for api_call in api_calls:
+            futures.append(self.hive_api.executor.submit(Pyhiveapi.hive_api_json_call, self, *api_call))
+
+        return [future.result() for future in futures]
+
+
+    def p_parse_devices(self, api_resp_p):
+        """Parse the devices returned by the Hive API by device type."""
+        tmp_devices = {"hub": [],
+                       "thermostat": [],
+                       "boiler_module": [],
+                       "plug": [],
+                       "light": [],
+                       "sensors": []}
+
+        try_finished = False
+        try:
+            for a_device in api_resp_p:
+                if "type" in a_device:
+                    if a_device["type"] == "hub":
+                        tmp_devices["hub"].append(HubNode(a_device))
+                    if a_device["type"] == "thermostatui":
+                        tmp_devices["thermostat"].append(DeviceNode(a_device))
+                    if a_device["type"] == "boilermodule":
+                        tmp_devices["boiler_module"].append(DeviceNode(a_device))
+                    if a_device["type"] == "activeplug":
+                        tmp_devices["plug"].append(DeviceNode(a_device))
+                    if (a_device["type"] == "warmwhitelight" or
+                            a_device["type"] == "tuneablelight" or
+                            a_device["type"] == "colourtuneablelight"):
+                        tmp_devices["light"].append(DeviceNode(a_device))
+                    if (a_device["type"] == "motionsensor" or
+                            a_device["type"] == "contactsensor"):
+                        tmp_devices["sensors"].append(DeviceNode(a_device))
+
+            try_finished = True
+        except (IOError, RuntimeError, ZeroDivisionError):
+            try_finished = False
+        finally:
+            if not try_finished:
+                try_finished = False
+
+        return tmp_devices
+
+
+    def p_parse_products(self, api_resp_p):
+        """Parse the products returned by the Hive API by product type."""
+        tmp_products = {"heating": [],
+                        "hotwater": [],
+                        "light": [],
+                        "plug": [],
+                        "sensors": []}
+
+        try_finished = False
+        try:
+            for a_product in api_resp_p:
+                if "type" in a_product:
+                    if a_product["type"] == "heating":
+                        tmp_products["heating"].append(HeatingNode(a_product))
+                    if a_product["type"] == "hotwater":
+                        tmp_products["hotwater"].append(HotwaterNode(a_product))
+                    if a_product["type"] == "activeplug":
+                        tmp_products["plug"].append(PlugNode(a_product))
+                    if (a_product["type"] == "warmwhitelight" or
+                            a_product["type"] == "tuneablelight" or
+                            a_product["type"] == "colourtuneablelight"):
+                        tmp_products["light"].append(LightNode(a_product))
+                    if (a_product["type"] == "motionsensor" or
+                            a_product["type"] == "contactsensor"):
+                        tmp_products["sensors"].append(SensorNode(a_product))
+
+            try_finished = True
+        except (IOError, RuntimeError, ZeroDivisionError):
+            try_finished = False
+        finally:
+            if not try_finished:
+                try_finished = False
+
+        return tmp_products
+
+
+    def p_store_nodes(self, tmp_devices, tmp_products, body_hashes=(None, None)):
+        """Store the sorted devices and products in the session."""
+        get_nodes_successful = True
+
+        changes = None
+        try_finished = False
+        try:
+            with self.hsc.state_lock:
+                new_devices = HiveDevices()
+                for device_category in HIVE_DEVICE_CATEGORIES:
+                    setattr(new_devices, device_category, tuple(tmp_devices[device_category]))
+
+                new_products = HiveProducts()
+                for product_category in HIVE_PRODUCT_CATEGORIES:
+                    setattr(new_products, product_category, tuple(tmp_products[product_category]))
+
+                Pyhiveapi.p_index_nodes(self, new_devices, HIVE_DEVICE_CATEGORIES)
+                Pyhiveapi.p_index_nodes(self, new_products, HIVE_PRODUCT_CATEGORIES)
+                self.hsc.state = HiveState(new_devices, new_products)
+                self.hsc.parsed_state = self.hsc.state
+                self.hsc.parsed_hashes = body_hashes
+
+                changes = Pyhiveapi.p_record_changes(self)
+                node_values = self.hsc.node_values
+                if changes:
+                    self.hsc.unchanged_refreshes = 0
+                else:
+                    self.hsc.unchanged_refreshes += 1
+
+            try_finished = True
+        except (IOError, RuntimeError, ZeroDivisionError):
+            try_finished = False
+        finally:
+            if not try_finished:
+                get_nodes_successful = False
+
+        # Listeners are called without the state lock so they can refresh or write.
+        if changes is not None:
+            Pyhiveapi.p_notify_listeners(self, changes, node_values)
+
+        return get_nodes_successful
+
+
+    def p_index_nodes(self, nodes, node_categories):
+        """Index new devices or products by node id."""
+        nodes_index = {}
+        for node_category in node_categories:
+            nodes_index[node_category] = {}
+            for a_node in getattr(nodes, node_category):
+                if a_node.id is not None:
+                    nodes_index[node_category][a_node.id] = a_node
+
+        nodes.index = nodes_index
+
+
+    def p_replace_product(self, product_category, new_product):
+        """Publish a new state with one product replaced and get its changes; hold the state lock."""
+        old_state = self.hsc.state
+        stored_products = getattr(old_state.products, product_category)
+
+        for product_index, a_product in enumerate(stored_products):
+            if a_product.id == new_product.id:
+                new_products = HiveProducts()
+                for a_category in HIVE_PRODUCT_CATEGORIES:
+                    setattr(new_products, a_category, getattr(old_state.products, a_category))
+                setattr(new_products, product_category,
+                        stored_products[:product_index] + (new_product,) + stored_products[product_index + 1:])
+
+                Pyhiveapi.p_index_nodes(self, new_products, HIVE_PRODUCT_CATEGORIES)
+                self.hsc.state = HiveState(old_state.devices, new_products)
+                return Pyhiveapi.p_record_changes(self)
+
+        return None
+
+
+    def p_node_values(self):
+        """Get the attribute values of every stored node by node id."""
+        node_values = {}
+
+        for nodes_index in (self.hsc.devices.index, self.hsc.products.index):
+            for category_nodes in nodes_index.values():
+                for node_id, a_node in category_nodes.items():
+                    values = node_values.setdefault(node_id, {})
+                    for slot_name in a_node.fields:
+                        values[slot_name] = getattr(a_node, slot_name)
+
+        return node_values
+
+
+    def p_record_changes(self):
+        """Record the nodes and attributes changed since the last update."""
+        old_values = self.hsc.node_values
+        new_values = Pyhiveapi.p_node_values(self)
+
+        added = [node_id for node_id in new_values if node_id not in old_values]
+        removed = [node_id for node_id in old_values if node_id not in new_values]
+        changed = {}
+        for node_id, values in new_values.items():
+            if node_id in old_values:
+                previous = old_values[node_id]
+                changed_attributes = {slot_name: (previous.get(slot_name), value)
+                                      for slot_name, value in values.items()
+                                      if slot_name not in previous or previous[slot_name] != value}
+                if changed_attributes:
+                    changed[node_id] = changed_attributes
+
+        self.hsc.generation += 1
+        self.hsc.node_values = new_values
+        self.hsc.changes = HiveNodeChanges(self.hsc.generation, added, removed, changed)
+
+        return self.hsc.changes
+
+
+    def subscribe(self, callback, node_id=None, attribute=None, device_type=None,
+                  use_executor=False):
+        """Call callback(node_id, changed_attributes) when matching node values change."""
+        a_listener = HiveListener(callback, node_id, attribute, device_type, use_executor)
+        self.hsc.listeners = self.hsc.listeners + [a_listener]
+        return a_listener
+
+
+    def unsubscribe(self, a_listener):
+        """Stop calling a subscribed callback."""
+        self.hsc.listeners = [listener for listener in self.hsc.listeners
+                         if listener is not a_listener]
+
+
+    def p_notify_listeners(self, changes, node_values):
+        """Call the listeners interested in the given node changes."""
+        if len(self.hsc.listeners) == 0:
+            return
+
+        node_changes = dict(changes.changed)
+        for node_id in changes.added:
+            node_changes[node_id] = {slot_name: (None, value)
+                                     for slot_name, value in node_values[node_id].items()}
+
+        for node_id, changed_attributes in node_changes.items():
+            node_type = node_values[node_id].get("type")
+
+            for a_listener in self.hsc.listeners:
+                if a_listener.node_id is not None and a_listener.node_id != node_id:
+                    continue
+                if a_listener.device_type is not None and a_listener.device_type != node_type:
+                    continue
+
+                listener_changes = changed_attributes
+                if a_listener.attribute is not None:
+                    if a_listener.attribute not in changed_attributes:
+                        continue
+                    listener_changes = {a_listener.attribute: changed_attributes[a_listener.attribute]}
+
+                if a_listener.use_executor:
+                    # Not the fetch executor, which a callback refreshing the nodes would starve.
+                    if self.hive_api.callback_executor is None:
+                        self.hive_api.callback_executor = ThreadPoolExecutor(
+                            max_workers=HIVE_CALLBACK_WORKERS_DEFAULT)
+                    self.hive_api.callback_executor.submit(Pyhiveapi.p_call_listener, self,
+                                                           a_listener, node_id, listener_changes)
+                else:
+                    Pyhiveapi.p_call_listener(self, a_listener, node_id, listener_changes)
+
+
+    def p_call_listener(self, a_listener, node_id, listener_changes):
+        """Call a listener, logging rather than raising any error from it."""
+        try:
+            a_listener.callback(node_id, listener_changes)
+        except Exception:
+            _LOGGER.exception("Error in Hive change listener for node %s", node_id)
+
+
+    def get_changes(self):
+        """Get the nodes and attributes changed by the last update."""
+        return self.hsc.changes
+
+
+    def p_get_device(self, node_id, *device_categories):
+        """Get a device of one of the given categories by node id."""
+        for device_category in device_categories:
+            a_device = self.hsc.devices.index.get(device_category, {}).get(node_id)
+            if a_device is not None:
+                return a_device
+        return None
+
+
+    def p_get_product(self, node_id, *product_categories):
+        """Get a product of one of the given categories by node id."""
+        for product_category in product_categories:
+            a_product = self.hsc.products.index.get(product_category, {}).get(node_id)
+            if a_product is not None:
+                return a_product
+        return None
+
+
+    def hive_api_get_nodes(self, node_id, include_weather=False):
+        """Get latest data for Hive nodes, sharing a fetch already in progress."""
+        with self.hsc.nodes_flights_lock:
+            flight_leader, nodes_flight = self.hsc.nodes_flights.get(include_weather, (None, None))
+            if nodes_flight is None:
+                flight_leader = None
+                nodes_flight = Future()
+                self.hsc.nodes_flights[include_weather] = (threading.get_ident(), nodes_flight)
+
+        if flight_leader == threading.get_ident():
+            # Called back from the fetch in progress, e.g. by a listener.
+            return False
+        if flight_leader is not None:
+            return nodes_flight.result()
+
+        try:
+            get_nodes_successful = Pyhiveapi.p_fetch_nodes(self, node_id, include_weather)
+        except BaseException as exc:
+            nodes_flight.set_exception(exc)
+            raise
+        else:
+            nodes_flight.set_result(get_nodes_successful)
+        finally:
+            with self.hsc.nodes_flights_lock:
+                del self.hsc.nodes_flights[include_weather]
+
+        return get_nodes_successful
+
+
+    def p_fetch_nodes(self, node_id, include_weather):
         """Get latest data for Hive nodes."""
         get_nodes_successful = True
 
         Pyhiveapi.check_hive_api_logon(self)
 
-        if HSC.session_id is not None:
-            tmp_devices_hub = []
-            tmp_devices_thermostat = []
-            tmp_devices_boiler_module = []
-            tmp_devices_plug = []
-            tmp_devices_light = []
-            tmp_devices_sensors = []
+        if self.hsc.session_id is not None:
+            api_calls = [("GET", self.hive_api.urls.devices, "", False),
+                         ("GET", self.hive_api.urls.products, "", False)]
 
-            tmp_products_heating = []
-            tmp_products_hotwater = []
-            tmp_products_light = []
-            tmp_products_plug = []
-            tmp_products_sensors = []
+            weather_due = include_weather and Pyhiveapi.p_weather_due(self)
+            if weather_due:
+                api_calls.append(("GET", Pyhiveapi.p_weather_url(self), "", True))
 
-            try_finished = False
-            try:
-                api_resp_d = {}
-                api_resp_p = None
-                api_resp_d = Pyhiveapi.hive_api_json_call(self, "GET", HIVE_API.urls.devices, "", False)
-
-                api_resp_p = api_resp_d['parsed']
-
-                for a_device in api_resp_p:
-                    if "type" in a_device:
-                        if a_device["type"] == "hub":
-                            tmp_devices_hub.append(a_device)
-                        if a_device["type"] == "thermostatui":
-                            tmp_devices_thermostat.append(a_device)
-                        if a_device["type"] == "boilermodule":
-                            tmp_devices_boiler_module.append(a_device)
-                        if a_device["type"] == "activeplug":
-                            tmp_devices_plug.append(a_device)
-                        if (a_device["type"] == "warmwhitelight" or
-                                a_device["type"] == "tuneablelight" or
-                                a_device["type"] == "colourtuneablelight"):
-                            tmp_devices_light.append(a_device)
-                        if (a_device["type"] == "motionsensor" or
-                                a_device["type"] == "contactsensor"):
-                            tmp_devices_sensors.append(a_device)
-
-                try_finished = True
-            except (IOError, RuntimeError, ZeroDivisionError):
-                try_finished = False
-            finally:
-                if not try_finished:
-                    try_finished = False
+            api_resps = Pyhiveapi.p_hive_api_json_calls(self, api_calls)
+
+            if self.hsc.session_id is None:
+                get_nodes_successful = False
+            else:
+                api_resps[:2] = Pyhiveapi.p_refetch_node_bodies(self, api_calls[:2], api_resps[:2])
+
+                if (Pyhiveapi.p_nodes_response_ok(self, api_resps[0]) and
+                        Pyhiveapi.p_nodes_response_ok(self, api_resps[1])):
+                    get_nodes_successful = Pyhiveapi.p_store_node_responses(self, api_resps[0], api_resps[1])
+                else:
+                    get_nodes_successful = False
+
+                if weather_due:
+                    Pyhiveapi.p_store_weather_response(self, api_resps[2])
+        else:
+            get_nodes_successful = False
+
+        if get_nodes_successful:
+            self.hsc.last_update = datetime.now()
+            self.hsc.reconcile_due = None
+            if self.hsc.unchanged_refreshes == 0:
+                Pyhiveapi.p_save_node_snapshot(self)
+
+        return get_nodes_successful
+
+
+    def p_nodes_response_ok(self, api_resp_d):
+        """Check if a devices or products response holds a current list of nodes."""
+        return (getattr(api_resp_d['original'], "status_code", None) in (200, 304) and
+                (isinstance(api_resp_d['parsed'], list) or api_resp_d.get('unchanged', False)))
+
+
+    def p_node_bodies_needed(self, api_resps):
+        """Get the indexes of the unchanged node lists whose last body is not in the parsed state."""
+        parsed_hashes = self.hsc.parsed_hashes
+        return [resp_index for resp_index, api_resp_d in enumerate(api_resps)
+                if (api_resp_d.get('unchanged', False) and
+                    api_resp_d.get('body_hash') != parsed_hashes[resp_index])]
+
+
+    def p_refetch_node_bodies(self, api_calls, api_resps):
+        """Get the unchanged node lists again with their bodies if they are not in the parsed state."""
+        refetch_indexes = Pyhiveapi.p_node_bodies_needed(self, api_resps)
+        refetch_calls = [Pyhiveapi.p_unconditional_call(self, *api_calls[resp_index])
+                         for resp_index in refetch_indexes]
+        refetch_resps = Pyhiveapi.p_hive_api_json_calls(self, refetch_calls)
+
+        api_resps = list(api_resps)
+        for resp_index, api_resp_d in zip(refetch_indexes, refetch_resps):
+            api_resps[resp_index] = api_resp_d
+        return api_resps
+
+
+    def p_parsed_nodes(self, parsed_nodes, node_categories):
+        """Get the nodes of the parsed state by category, as a parse of the same body would."""
+        return {node_category: list(getattr(parsed_nodes, node_category))
+                for node_category in node_categories}
+
+
+    def p_store_node_responses(self, devices_resp_d, products_resp_d):
+        """Store the devices and products responses, reusing the parsed state for unchanged lists."""
+        body_hashes = (devices_resp_d.get('body_hash'), products_resp_d.get('body_hash'))
+
+        with self.hsc.state_lock:
+            parsed_state = self.hsc.parsed_state
+            parsed_hashes = self.hsc.parsed_hashes
+            nodes_unchanged = (None not in body_hashes and body_hashes == parsed_hashes and
+                               self.hsc.state is parsed_state)
+            if nodes_unchanged:
+                self.hsc.generation += 1
+                self.hsc.changes = HiveNodeChanges(self.hsc.generation, [], [], {})
+                self.hsc.unchanged_refreshes += 1
+        if nodes_unchanged:
+            return True
+
+        if isinstance(devices_resp_d['parsed'], list):
+            tmp_devices = Pyhiveapi.p_parse_devices(self, devices_resp_d['parsed'])
+        elif body_hashes[0] is not None and body_hashes[0] == parsed_hashes[0]:
+            tmp_devices = Pyhiveapi.p_parsed_nodes(self, parsed_state.devices, HIVE_DEVICE_CATEGORIES)
+        else:
+            return False
+
+        if isinstance(products_resp_d['parsed'], list):
+            tmp_products = Pyhiveapi.p_parse_products(self, products_resp_d['parsed'])
+        elif body_hashes[1] is not None and body_hashes[1] == parsed_hashes[1]:
+            tmp_products = Pyhiveapi.p_parsed_nodes(self, parsed_state.products, HIVE_PRODUCT_CATEGORIES)
+        else:
+            return False
+
+        return Pyhiveapi.p_store_nodes(self, tmp_devices, tmp_products, body_hashes)
+
+
+    def p_node_api_data(self, a_node):
+        """Get the Hive API data needed to parse a stored node again."""
+        api_data = {}
+        for slot_name, field_path in a_node.fields.items():
+            field_value = getattr(a_node, slot_name)
+            if field_value is not None:
+                field_parent = api_data
+                for field_key in field_path[:-1]:
+                    field_parent = field_parent.setdefault(field_key, {})
+                field_parent[field_path[-1]] = field_value
+        return api_data
+
+
+    def p_save_node_snapshot(self):
+        """Save the stored devices and products for a warm start."""
+        if self.hsc.node_snapshot_file is None:
+            return False
+
+        state = self.hsc.state
+        node_snapshot = {"username": self.hsc.username,
+                         "devices": [Pyhiveapi.p_node_api_data(self, a_device)
+                                     for device_category in HIVE_DEVICE_CATEGORIES
+                                     for a_device in getattr(state.devices, device_category)],
+                         "products": [Pyhiveapi.p_node_api_data(self, a_product)
+                                      for product_category in HIVE_PRODUCT_CATEGORIES
+                                      for a_product in getattr(state.products, product_category)]}
+
+        tmp_file_name = os.fspath(self.hsc.node_snapshot_file) + ".tmp"
+        try:
+            snapshot_data = zlib.compress(json.dumps(node_snapshot, separators=(",", ":")).encode("utf-8"))
+            with open(tmp_file_name, "wb") as snapshot_file:
+                snapshot_file.write(snapshot_data)
+            os.replace(tmp_file_name, self.hsc.node_snapshot_file)
+        except (IOError, OSError, TypeError, ValueError):
+            return False
+
+        return True
+
+
+    def p_load_node_snapshot(self):
+        """Store the devices and products saved by an earlier run."""
+        if self.hsc.node_snapshot_file is None:
+            return False
+
+        try:
+            with open(self.hsc.node_snapshot_file, "rb") as snapshot_file:
+                node_snapshot = json.loads(zlib.decompress(snapshot_file.read()).decode("utf-8"))
+            api_devices = node_snapshot["devices"]
+            api_products = node_snapshot["products"]
+        except (IOError, OSError, KeyError, TypeError, ValueError, zlib.error):
+            return False
+
+        if node_snapshot.get("username") != self.hsc.username:
+            return False
+
+        tmp_devices = Pyhiveapi.p_parse_devices(self, api_devices)
+        tmp_products = Pyhiveapi.p_parse_products(self, api_products)
+        if not Pyhiveapi.p_store_nodes(self, tmp_devices, tmp_products):
+            return False
+
+        self.hsc.last_update = datetime.now()
+
+        return True
+
+
+    def p_node_url(self, node_id):
+        """Get the Hive API URL of a single stored product node."""
+        a_node = Pyhiveapi.p_get_product(self, node_id, "heating", "hotwater", "light", "plug", "sensors")
+        if a_node is None or a_node.type is None:
+            return None
+        return self.hive_api.urls.nodes + "/" + a_node.type + "/" + a_node.id
+
+
+    def p_node_refresh_unsupported(self, api_resp):
+        """Check if a single node request was rejected by the Hive API."""
+        return getattr(api_resp, "status_code", None) in HIVE_NODE_REFRESH_UNSUPPORTED_STATUS
+
+
+    def p_store_node(self, node_id, api_resp_p):
+        """Replace a single stored product with the node returned by the Hive API."""
+        if isinstance(api_resp_p, dict):
+            api_resp_p = [api_resp_p]
+        if not isinstance(api_resp_p, list):
+            return False
+
+        tmp_products = Pyhiveapi.p_parse_products(self, [a_product for a_product in api_resp_p
+                                                         if isinstance(a_product, dict) and
+                                                         a_product.get("id") == node_id])
+
+        for product_category, new_products in tmp_products.items():
+            if len(new_products) > 0:
+                with self.hsc.state_lock:
+                    changes = Pyhiveapi.p_replace_product(self, product_category, new_products[0])
+                    node_values = self.hsc.node_values
+                if changes is None:
+                    return False
+                Pyhiveapi.p_notify_listeners(self, changes, node_values)
+                return True
+
+        return False
+
+
+    def hive_api_get_node(self, node_id):
+        """Get latest data for a single Hive node, or all nodes if not possible."""
+        node_url = None
+        if self.hsc.node_refresh_supported:
+            node_url = Pyhiveapi.p_node_url(self, node_id)
+
+        if node_url is not None:
+            Pyhiveapi.check_hive_api_logon(self)
+
+            if self.hsc.session_id is not None:
+                api_resp_d = Pyhiveapi.hive_api_json_call(self, "GET", node_url, "", False)
+                if api_resp_d.get('unchanged', False):
+                    api_resp_d = Pyhiveapi.hive_api_json_call(
+                        self, *Pyhiveapi.p_unconditional_call(self, "GET", node_url, "", False))
+                api_resp = api_resp_d['original']
+
+                if str(api_resp) == "<Response [200]>":
+                    if Pyhiveapi.p_store_node(self, node_id, api_resp_d['parsed']):
+                        return True
+                elif Pyhiveapi.p_node_refresh_unsupported(self, api_resp):
+                    self.hsc.node_refresh_supported = False
+
+        return Pyhiveapi.hive_api_get_nodes(self, node_id)
+
+
+    def p_weather_due(self):
+        """Check if the weather data is due an update."""
+        current_time = datetime.now()
+        last_update_secs = (current_time - self.hsc.weather.last_update).total_seconds()
+        return last_update_secs >= self.hsc.update_weather_interval_seconds
+
+
+    def p_weather_url(self):
+        """Get the weather URL for the session postcode."""
+        weather_url = self.hive_api.urls.weather + "?postcode=" + self.hsc.postcode + "&country=" + self.hsc.countrycode
+        return weather_url.replace(" ", "%20")
+
+
+    def p_store_weather(self, api_resp_p):
+        """Store the weather data returned by the Hive API."""
+        get_weather_successful = True
+
+        try_finished = False
+        try:
+            if "weather" in api_resp_p:
+                if "icon" in api_resp_p["weather"]:
+                    self.hsc.weather.icon = api_resp_p["weather"]["icon"]
+                if "description" in api_resp_p["weather"]:
+                    self.hsc.weather.description = api_resp_p["weather"]["icon"]
+                if "temperature" in api_resp_p["weather"]:
+                    if "unit" in api_resp_p["weather"]["temperature"]:
+                        self.hsc.weather.temperature.unit = api_resp_p["weather"]["temperature"]["unit"]
+                    if "unit" in api_resp_p["weather"]["temperature"]:
+                        self.hsc.weather.temperature.value = api_resp_p["weather"]["temperature"]["value"]
+                self.hsc.weather.nodeid = "HiveWeather"
+            else:
+                get_weather_successful = False
 
+            self.hsc.weather.last_update = datetime.now()
+            try_finished = True
+        except (IOError, RuntimeError, ZeroDivisionError):
             try_finished = False
-            try:
-                api_resp_d = {}
-                api_resp_p = None
-                api_resp_d = Pyhiveapi.hive_api_json_call(self, "GET", HIVE_API.urls.products, "", False)
-
-                api_resp_p = api_resp_d['parsed']
-
-                for a_product in api_resp_p:
-                    if "type" in a_product:
-                        if a_product["type"] == "heating":
-                            tmp_products_heating.append(a_product)
-                        if a_product["type"] == "hotwater":
-                            tmp_products_hotwater.append(a_product)
-                        if a_product["type"] == "activeplug":
-                            tmp_products_plug.append(a_product)
-                        if (a_product["type"] == "warmwhitelight" or
-                                a_product["type"] == "tuneablelight" or
-                                a_product["type"] == "colourtuneablelight"):
-                            tmp_products_light.append(a_product)
-                        if (a_product["type"] == "motionsensor" or
-                                a_product["type"] == "contactsensor"):
-                            tmp_products_sensors.append(a_product)
-                try_finished = True
-            except (IOError, RuntimeError, ZeroDivisionError):
+        finally:
+            if not try_finished:
                 try_finished = False
-            finally:
-                if not try_finished:
-                    try_finished = False
 
-            try_finished = False
-            try:
-                if len(tmp_devices_hub) > 0:
-                    HSC.devices.hub = tmp_devices_hub
-                if len(tmp_devices_thermostat) > 0:
-                    HSC.devices.thermostat = tmp_devices_thermostat
-                if len(tmp_devices_boiler_module) > 0:
-                    HSC.devices.boiler_module = tmp_devices_boiler_module
-                if len(tmp_devices_plug) > 0:
-                    HSC.devices.plug = tmp_devices_plug
-                if len(tmp_devices_light) > 0:
-                    HSC.devices.light = tmp_devices_light
-                if len(tmp_devices_sensors) > 0:
-                    HSC.devices.sensors = tmp_devices_sensors
-
-                if len(tmp_products_heating) > 0:
-                    HSC.products.heating = tmp_products_heating
-                if len(tmp_products_hotwater) > 0:
-                    HSC.products.hotwater = tmp_products_hotwater
-                if len(tmp_products_plug) > 0:
-                    HSC.products.plug = tmp_products_plug
-                if len(tmp_products_light) > 0:
-                    HSC.products.light = tmp_products_light
-                if len(tmp_products_sensors) > 0:
-                    HSC.products.sensors = tmp_products_sensors
-
-                try_finished = True
-            except (IOError, RuntimeError, ZeroDivisionError):
-                try_finished = False
-            finally:
-                if not try_finished:
-                    get_nodes_successful = False
-        else:
-            get_nodes_successful = False
+        return get_weather_successful
 
-        if get_nodes_successful:
-            HSC.last_update = datetime.now()
 
-        return get_nodes_successful
+    def p_store_weather_response(self, api_resp_d):
+        """Store a weather response, keeping the stored weather if it has not changed."""
+        if api_resp_d.get('unchanged', False):
+            self.hsc.weather.last_update = datetime.now()
+            return True
+        return Pyhiveapi.p_store_weather(self, api_resp_d['parsed'])
 
 
     def hive_api_get_weather(self):
         """Get latest weather data from Hive."""
         get_weather_successful = True
 
-        current_time = datetime.now()
-        last_update_secs = (current_time - HSC.weather.last_update).total_seconds()
-        if last_update_secs >= HSC.update_weather_interval_seconds:
+        if Pyhiveapi.p_weather_due(self):
             Pyhiveapi.check_hive_api_logon(self)
 
-            if HSC.session_id is not None:
-                try_finished = False
-                try:
-                    api_resp_d = {}
-                    api_resp_p = None
-                    weather_url = HIVE_API.urls.weather + "?postcode=" + HSC.postcode + "&country=" + HSC.countrycode
-                    weather_url = weather_url.replace(" ", "%20")
-
-                    api_resp_d = Pyhiveapi.hive_api_json_call(self, "GET", weather_url, "", True)
-                    api_resp_p = api_resp_d['parsed']
-
-                    if "weather" in api_resp_p:
-                        if "icon" in api_resp_p["weather"]:
-                            HSC.weather.icon = api_resp_p["weather"]["icon"]
-                        if "description" in api_resp_p["weather"]:
-                            HSC.weather.description = api_resp_p["weather"]["icon"]
-                        if "temperature" in api_resp_p["weather"]:
-                            if "unit" in api_resp_p["weather"]["temperature"]:
-                                HSC.weather.temperature.unit = api_resp_p["weather"]["temperature"]["unit"]
-                            if "unit" in api_resp_p["weather"]["temperature"]:
-                                HSC.weather.temperature.value = api_resp_p["weather"]["temperature"]["value"]
-                        HSC.weather.nodeid = "HiveWeather"
-                    else:
-                        get_weather_successful = False
-
-                    HSC.weather.last_update = current_time
-                    try_finished = True
-                except (IOError, RuntimeError, ZeroDivisionError):
-                    try_finished = False
-                finally:
-                    if not try_finished:
-                        try_finished = False
+            if self.hsc.session_id is not None:
+                api_resp_d = Pyhiveapi.hive_api_json_call(self, "GET", Pyhiveapi.p_weather_url(self), "", True)
+                get_weather_successful = Pyhiveapi.p_store_weather_response(self, api_resp_d)
             else:
                 get_weather_successful = False
 
@@ -481,88 +1996,100 @@ class Pyhiveapi:
         return converted_time_string
 
 
-    def p_get_schedule_now_next_later(self, hive_api_schedule):
-        """Get the schedule now, next and later of a given nodes schedule."""
-        schedule_now_and_next = {}
-        date_time_now = datetime.now()
-        date_time_now_day_int = date_time_now.today().weekday()
-
-        days_t = ('monday',
-                  'tuesday',
-                  'wednesday',
-                  'thursday',
-                  'friday',
-                  'saturday',
-                  'sunday')
-
-        days_rolling_list = list(days_t[date_time_now_day_int:] + days_t)[:7]
-
-        full_schedule_list = []
-
-        for day_index in range(0, len(days_rolling_list)):
-            current_day_schedule = hive_api_schedule[days_rolling_list[day_index]]
-            current_day_schedule_sorted = sorted(current_day_schedule,
-                                                 key=operator.itemgetter('start'),
-                                                 reverse=False)
+    def p_node_schedule(self, a_node):
+        """Get the compiled schedule of a node, compiling it when it changes."""
+        compiled_schedule = self.hsc.data.schedules.get(a_node.id)
 
-            for current_slot in range(0, len(current_day_schedule_sorted)):
-                current_slot_custom = current_day_schedule_sorted[current_slot]
-
-                slot_date = datetime.now() + timedelta(days=day_index)
-                slot_time = Pyhiveapi.p_minutes_to_time(self, current_slot_custom["start"])
-                slot_time_date_s = (slot_date.strftime("%d-%m-%Y")
-                                    + " "
-                                    + slot_time)
-                slot_time_date_dt = datetime.strptime(slot_time_date_s,
-                                                      "%d-%m-%Y %H:%M")
-                if slot_time_date_dt <= date_time_now:
-                    slot_time_date_dt = slot_time_date_dt + timedelta(days=7)
+        if compiled_schedule is None or compiled_schedule.payload is not a_node.schedule:
+            if compiled_schedule is not None and compiled_schedule.payload == a_node.schedule:
+                compiled_schedule.payload = a_node.schedule
+            else:
+                compiled_schedule = HiveSchedule(a_node.schedule)
+                self.hsc.data.schedules[a_node.id] = compiled_schedule
 
-                current_slot_custom['Start_DateTime'] = slot_time_date_dt
-                full_schedule_list.append(current_slot_custom)
+        return compiled_schedule
 
-        fsl_sorted = sorted(full_schedule_list,
-                            key=operator.itemgetter('Start_DateTime'),
-                            reverse=False)
 
-        schedule_now = fsl_sorted[-1]
-        schedule_next = fsl_sorted[0]
-        schedule_later = fsl_sorted[1]
+    def p_get_schedule_now_next_later(self, hive_api_schedule):
+        """Get the schedule now, next and later of a given nodes schedule."""
+        schedule_now_and_next = {}
 
-        schedule_now['Start_DateTime'] = (schedule_now['Start_DateTime']
-                                          - timedelta(days=7))
+        if not isinstance(hive_api_schedule, HiveSchedule):
+            hive_api_schedule = HiveSchedule(hive_api_schedule)
 
-        schedule_now['End_DateTime'] = schedule_next['Start_DateTime']
-        schedule_next['End_DateTime'] = schedule_later['Start_DateTime']
-        schedule_later['End_DateTime'] = fsl_sorted[2]['Start_DateTime']
+        slots_count = len(hive_api_schedule.slots)
+        if slots_count == 0:
+            return schedule_now_and_next
 
-        schedule_now_and_next['now'] = schedule_now
-        schedule_now_and_next['next'] = schedule_next
-        schedule_now_and_next['later'] = schedule_later
+        date_time_now = datetime.now()
+        week_start = (datetime(date_time_now.year, date_time_now.month, date_time_now.day)
+                      - timedelta(days=date_time_now.weekday()))
+        minute_of_week_now = (date_time_now.weekday() * 1440
+                              + date_time_now.hour * 60
+                              + date_time_now.minute)
+
+        slot_position = bisect.bisect_right(hive_api_schedule.starts, minute_of_week_now) - 1
+
+        slot_start_times = []
+        for position in range(slot_position, slot_position + 4):
+            week_offset, slot_index = divmod(position, slots_count)
+            slot_start_times.append(week_start + timedelta(
+                minutes=hive_api_schedule.starts[slot_index] + week_offset * 7 * 1440))
+
+        for slot_offset, slot_name in enumerate(('now', 'next', 'later')):
+            a_slot = dict(hive_api_schedule.slots[(slot_position + slot_offset) % slots_count])
+            a_slot['Start_DateTime'] = slot_start_times[slot_offset]
+            a_slot['End_DateTime'] = slot_start_times[slot_offset + 1]
+            schedule_now_and_next[slot_name] = a_slot
 
         return schedule_now_and_next
 
 
     def initialise_api(self, username, password, mins_between_updates):
         """Setup the Hive platform."""
-        HSC.username = username
-        HSC.password = password
+        self.hsc.username = username
+        self.hsc.password = password
 
         if mins_between_updates <= 0:
             mins_between_updates = 2
 
         hive_node_update_interval = mins_between_updates * 60
 
-        if HSC.username is None or HSC.password is None:
+        if self.hsc.username is None or self.hsc.password is None:
             return None
+        elif Pyhiveapi.p_load_node_snapshot(self):
+            self.hsc.update_node_interval_seconds = hive_node_update_interval
+            self.hsc.warm_start = threading.Thread(target=Pyhiveapi.p_initialise_session,
+                                                   args=(self, hive_node_update_interval),
+                                                   name="HiveWarmStart",
+                                                   daemon=True)
+            self.hsc.warm_start.start()
         else:
-            Pyhiveapi.hive_api_logon(self)
-            if HSC.session_id is not None:
-                HSC.update_node_interval_seconds = hive_node_update_interval
-                Pyhiveapi.hive_api_get_nodes_nl(self)
-#                Pyhiveapi.hive_api_get_weather(self)
+            Pyhiveapi.p_initialise_session(self, hive_node_update_interval)
+
+        return Pyhiveapi.p_device_list(self)
+
+
+    def p_initialise_session(self, hive_node_update_interval):
+        """Log in, using the session cache if possible, and get the Hive nodes."""
+        get_nodes_successful = False
+
+        session_cached = Pyhiveapi.p_load_session_cache(self)
+        if not session_cached and not self.hsc.closed:
+            Pyhiveapi.check_hive_api_logon(self)
+        if self.hsc.session_id is not None and not self.hsc.closed:
+            self.hsc.update_node_interval_seconds = hive_node_update_interval
+            get_nodes_successful = Pyhiveapi.hive_api_get_nodes(self, "NoID")
+            if session_cached and self.hsc.session_id is None:
+                get_nodes_successful = Pyhiveapi.hive_api_get_nodes(self, "NoID")
+#            Pyhiveapi.hive_api_get_weather(self)
+
+        self.hsc.initialise_successful = get_nodes_successful
+        return get_nodes_successful
 
 
+    def p_device_list(self):
+        """Get the list of Hive devices to set up."""
         device_list_all = {}
         device_list_sensor = []
         device_list_binary_sensor = []
@@ -570,76 +2097,76 @@ class Pyhiveapi:
         device_list_light = []
         device_list_plug = []
 
-        if len(HSC.devices.hub) > 0:
-            for a_device in HSC.devices.hub:
-                if ("id" in a_device and "state" in a_device and "name" in a_device["state"]):
-                    device_list_sensor.append({'HA_DeviceType': 'Hub_OnlineStatus', 'Hive_NodeID': a_device["id"], 'Hive_NodeName': a_device["state"]["name"], "Hive_DeviceType": "Hub"})
+        if len(self.hsc.devices.hub) > 0:
+            for a_device in self.hsc.devices.hub:
+                if (a_device.id is not None and a_device.name is not None):
+                    device_list_sensor.append({'HA_DeviceType': 'Hub_OnlineStatus', 'Hive_NodeID': a_device.id, 'Hive_NodeName': a_device.name, "Hive_DeviceType": "Hub"})
 
 
-        if len(HSC.products.heating) > 0:
-            for product in HSC.products.heating:
-                if ("id" in product and "state" in product and "name" in product["state"]):
-                    node_name = product["state"]["name"]
-                    if len(HSC.products.heating) == 1:
+        if len(self.hsc.products.heating) > 0:
+            for product in self.hsc.products.heating:
+                if (product.id is not None and product.name is not None):
+                    node_name = product.name
+                    if len(self.hsc.products.heating) == 1:
                         node_name = None
-                    device_list_climate.append({'HA_DeviceType': 'Heating', 'Hive_NodeID': product["id"], 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
-                    device_list_sensor.append({'HA_DeviceType': 'Heating_CurrentTemperature', 'Hive_NodeID': product["id"], 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
-                    device_list_sensor.append({'HA_DeviceType': 'Heating_TargetTemperature', 'Hive_NodeID': product["id"], 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
-                    device_list_sensor.append({'HA_DeviceType': 'Heating_State', 'Hive_NodeID': product["id"], 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
-                    device_list_sensor.append({'HA_DeviceType': 'Heating_Mode', 'Hive_NodeID': product["id"], 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
-                    device_list_sensor.append({'HA_DeviceType': 'Heating_Boost', 'Hive_NodeID': product["id"], 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
-
-
-        if len(HSC.products.hotwater) > 0:
-            for product in HSC.products.hotwater:
-                if ("id" in product and "state" in product and "name" in product["state"]):
-                    node_name = product["state"]["name"]
-                    if len(HSC.products.hotwater) == 1:
+                    device_list_climate.append({'HA_DeviceType': 'Heating', 'Hive_NodeID': product.id, 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
+                    device_list_sensor.append({'HA_DeviceType': 'Heating_CurrentTemperature', 'Hive_NodeID': product.id, 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
+                    device_list_sensor.append({'HA_DeviceType': 'Heating_TargetTemperature', 'Hive_NodeID': product.id, 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
+                    device_list_sensor.append({'HA_DeviceType': 'Heating_State', 'Hive_NodeID': product.id, 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
+                    device_list_sensor.append({'HA_DeviceType': 'Heating_Mode', 'Hive_NodeID': product.id, 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
+                    device_list_sensor.append({'HA_DeviceType': 'Heating_Boost', 'Hive_NodeID': product.id, 'Hive_NodeName': node_name, "Hive_DeviceType": "Heating"})
+
+
+        if len(self.hsc.products.hotwater) > 0:
+            for product in self.hsc.products.hotwater:
+                if (product.id is not None and product.name is not None):
+                    node_name = product.name
+                    if len(self.hsc.products.hotwater) == 1:
                         node_name = None
-                    device_list_climate.append({'HA_DeviceType': 'HotWater', 'Hive_NodeID': product["id"], 'Hive_NodeName': node_name, "Hive_DeviceType": "HotWater"})
-                    device_list_sensor.append({'HA_DeviceType': 'HotWater_State', 'Hive_NodeID': product["id"], 'Hive_NodeName': node_name, "Hive_DeviceType": "HotWater"})
-                    device_list_sensor.append({'HA_DeviceType': 'HotWater_Mode', 'Hive_NodeID': product["id"], 'Hive_NodeName': node_name, "Hive_DeviceType": "HotWater"})
-                    device_list_sensor.append({'HA_DeviceType': 'HotWater_Boost', 'Hive_NodeID': product["id"], 'Hive_NodeName': node_name, "Hive_DeviceType": "HotWater"})
+                    device_list_climate.append({'HA_DeviceType': 'HotWater', 'Hive_NodeID': product.id, 'Hive_NodeName': node_name, "Hive_DeviceType": "HotWater"})
+                    device_list_sensor.append({'HA_DeviceType': 'HotWater_State', 'Hive_NodeID': product.id, 'Hive_NodeName': node_name, "Hive_DeviceType": "HotWater"})
+                    device_list_sensor.append({'HA_DeviceType': 'HotWater_Mode', 'Hive_NodeID': product.id, 'Hive_NodeName': node_name, "Hive_DeviceType": "HotWater"})
+                    device_list_sensor.append({'HA_DeviceType': 'HotWater_Boost', 'Hive_NodeID': product.id, 'Hive_NodeName': node_name, "Hive_DeviceType": "HotWater"})
 
 
-        if len(HSC.devices.thermostat) > 0 or len(HSC.devices.sensors) > 0:
-            all_devices = HSC.devices.thermostat + HSC.devices.sensors
+        if len(self.hsc.devices.thermostat) > 0 or len(self.hsc.devices.sensors) > 0:
+            all_devices = self.hsc.devices.thermostat + self.hsc.devices.sensors
             for a_device in all_devices:
-                if ("id" in a_device and "state" in a_device and "name" in a_device["state"]):
-                    node_name = a_device["state"]["name"]
-                    if (a_device["type"] == "thermostatui" and len(HSC.devices.thermostat) == 1):
+                if (a_device.id is not None and a_device.name is not None):
+                    node_name = a_device.name
+                    if (a_device.type == "thermostatui" and len(self.hsc.devices.thermostat) == 1):
                         node_name = None
-                    if "type" in a_device:
-                        hive_device_type = a_device["type"]
-                        device_list_sensor.append({'HA_DeviceType': 'Hive_Device_BatteryLevel', 'Hive_NodeID': a_device["id"], 'Hive_NodeName': node_name, "Hive_DeviceType": hive_device_type})
-
-
-        if len(HSC.products.light) > 0:
-            for product in HSC.products.light:
-                if ("id" in product and "state" in product and "name" in product["state"]):
-                    if "type" in product:
-                        light_device_type = product["type"]
-                        device_list_light.append({'HA_DeviceType': 'Hive_Device_Light', 'Hive_Light_DeviceType': light_device_type, 'Hive_NodeID': product["id"], 'Hive_NodeName': product["state"]["name"], "Hive_DeviceType": "Light"})
-                        device_list_sensor.append({'HA_DeviceType': 'Hive_Device_Light_Mode', 'Hive_NodeID': product["id"], 'Hive_NodeName': product["state"]["name"], "Hive_DeviceType": light_device_type})
-
-
-        if len(HSC.products.plug) > 0:
-            for product in HSC.products.plug:
-                if ("id" in product and "state" in product and "name" in product["state"]):
-                    if "type" in product:
-                        plug_device_type = product["type"]
-                        device_list_plug.append({'HA_DeviceType': 'Hive_Device_Plug', 'Hive_Plug_DeviceType': plug_device_type, 'Hive_NodeID': product["id"], 'Hive_NodeName': product["state"]["name"], "Hive_DeviceType": "Switch"})
-                        device_list_sensor.append({'HA_DeviceType': 'Hive_Device_Plug_Mode', 'Hive_NodeID': product["id"], 'Hive_NodeName': product["state"]["name"], "Hive_DeviceType": plug_device_type})
-
-        if len(HSC.products.sensors) > 0:
-            for product in HSC.products.sensors:
-                if ("id" in product and "state" in product and "name" in product["state"]):
-                    if "type" in product:
-                        hive_sensor_device_type = product["type"]
-                        device_list_binary_sensor.append({'HA_DeviceType': 'Hive_Device_Binary_Sensor', 'Hive_NodeID': product["id"], 'Hive_NodeName': product["state"]["name"], "Hive_DeviceType": hive_sensor_device_type})
-
-#        if HSC.weather.nodeid == "HiveWeather":
-#        device_list_sensor.append({'HA_DeviceType': 'Weather_OutsideTemperature', 'Hive_NodeID': HSC.weather.nodeid, 'Hive_NodeName': "Hive Weather"})
+                    if a_device.type is not None:
+                        hive_device_type = a_device.type
+                        device_list_sensor.append({'HA_DeviceType': 'Hive_Device_BatteryLevel', 'Hive_NodeID': a_device.id, 'Hive_NodeName': node_name, "Hive_DeviceType": hive_device_type})
+
+
+        if len(self.hsc.products.light) > 0:
+            for product in self.hsc.products.light:
+                if (product.id is not None and product.name is not None):
+                    if product.type is not None:
+                        light_device_type = product.type
+                        device_list_light.append({'HA_DeviceType': 'Hive_Device_Light', 'Hive_Light_DeviceType': light_device_type, 'Hive_NodeID': product.id, 'Hive_NodeName': product.name, "Hive_DeviceType": "Light"})
+                        device_list_sensor.append({'HA_DeviceType': 'Hive_Device_Light_Mode', 'Hive_NodeID': product.id, 'Hive_NodeName': product.name, "Hive_DeviceType": light_device_type})
+
+
+        if len(self.hsc.products.plug) > 0:
+            for product in self.hsc.products.plug:
+                if (product.id is not None and product.name is not None):
+                    if product.type is not None:
+                        plug_device_type = product.type
+                        device_list_plug.append({'HA_DeviceType': 'Hive_Device_Plug', 'Hive_Plug_DeviceType': plug_device_type, 'Hive_NodeID': product.id, 'Hive_NodeName': product.name, "Hive_DeviceType": "Switch"})
+                        device_list_sensor.append({'HA_DeviceType': 'Hive_Device_Plug_Mode', 'Hive_NodeID': product.id, 'Hive_NodeName': product.name, "Hive_DeviceType": plug_device_type})
+
+        if len(self.hsc.products.sensors) > 0:
+            for product in self.hsc.products.sensors:
+                if (product.id is not None and product.name is not None):
+                    if product.type is not None:
+                        hive_sensor_device_type = product.type
+                        device_list_binary_sensor.append({'HA_DeviceType': 'Hive_Device_Binary_Sensor', 'Hive_NodeID': product.id, 'Hive_NodeName': product.name, "Hive_DeviceType": hive_sensor_device_type})
+
+#        if self.hsc.weather.nodeid == "HiveWeather":
+#        device_list_sensor.append({'HA_DeviceType': 'Weather_OutsideTemperature', 'Hive_NodeID': self.hsc.weather.nodeid, 'Hive_NodeName': "Hive Weather"})
 
         device_list_all['device_list_sensor'] = device_list_sensor
         device_list_all['device_list_binary_sensor'] = device_list_binary_sensor
@@ -649,132 +2176,135 @@ class Pyhiveapi:
 
         return device_list_all
 
+    def p_snapshot_add(self, snapshot, node_id, node_values):
+        """Add a node's values to a snapshot being built."""
+        if node_id is not None:
+            if node_id in snapshot:
+                snapshot[node_id].update(node_values)
+            else:
+                snapshot[node_id] = dict(node_values)
+
+    def p_snapshot_heating(self, a_node):
+        """Get the snapshot values of a heating node."""
+        heating_mode = Pyhiveapi.Heating.p_node_mode(self, a_node)
+        heating_current = a_node.temperature if a_node.temperature is not None else 0
+        heating_target = Pyhiveapi.Heating.p_node_target_temperature(self, a_node, heating_mode)
+        if heating_target is None:
+            heating_target = 0
+        heating_boost = "OFF" if a_node.boost is None else "ON"
+
+        return {'current_temperature': heating_current,
+                'target_temperature': heating_target,
+                'min_temperature': Pyhiveapi.Heating.min_temperature(self, a_node.id),
+                'max_temperature': Pyhiveapi.Heating.max_temperature(self, a_node.id),
+                'mode': heating_mode if heating_mode is not None else "UNKNOWN",
+                'state': Pyhiveapi.Heating.p_node_state(self, heating_current, heating_target, heating_mode, heating_boost),
+                'boost': heating_boost,
+                'boost_time': a_node.boost if a_node.boost is not None else "UNKNOWN",
+                'operation_modes': tuple(Pyhiveapi.Heating.get_operation_modes(self, a_node.id))}
+
+    def p_snapshot_hotwater(self, a_node):
+        """Get the snapshot values of a hot water node."""
+        hotwater_mode = "UNKNOWN"
+        if a_node.mode is not None:
+            hotwater_mode = Pyhiveapi.Hotwater.p_node_mode(self, a_node)
+        hotwater_boost = "OFF" if a_node.boost is None else "ON"
+        hotwater_state = Pyhiveapi.Hotwater.p_node_state(self, a_node, hotwater_mode, hotwater_boost)
+
+        return {'mode': hotwater_mode,
+                'state': hotwater_state if hotwater_state is not None else "OFF",
+                'boost': hotwater_boost,
+                'boost_time': a_node.boost if a_node.boost is not None else "UNKNOWN",
+                'operation_modes': tuple(Pyhiveapi.Hotwater.get_operation_modes(self, a_node.id))}
+
+    def p_snapshot_light(self, a_node):
+        """Get the snapshot values of a light node."""
+        light_color = 0
+        if (a_node.hue is not None and a_node.saturation is not None and
+                a_node.value is not None):
+            light_color = tuple(int(i * 255) for i in colorsys.hsv_to_rgb(a_node.hue / 360,
+                                                                          a_node.saturation / 100,
+                                                                          a_node.value / 100))
+
+        return {'state': a_node.status == "ON",
+                'brightness': (a_node.brightness / 100) * 255 if a_node.brightness is not None else 0,
+                'min_color_temp': round((1 / a_node.colour_temperature_max) * 1000000) if a_node.colour_temperature_max else 0,
+                'max_color_temp': round((1 / a_node.colour_temperature_min) * 1000000) if a_node.colour_temperature_min else 0,
+                'color_temp': round((1 / a_node.colour_temperature) * 1000000) if a_node.colour_temperature else 0,
+                'color': light_color,
+                'mode': a_node.mode if a_node.mode is not None else "UNKNOWN"}
+
+    def p_snapshot_plug(self, a_node):
+        """Get the snapshot values of a smart plug node."""
+        return {'state': a_node.status == "ON",
+                'power_usage': a_node.power_consumption if a_node.power_consumption is not None else 0,
+                'mode': a_node.mode if a_node.mode is not None else "UNKNOWN"}
+
+    def p_snapshot_sensor(self, a_node):
+        """Get the snapshot values of a sensor node."""
+        sensor_state = False
+        if a_node.type == "contactsensor":
+            sensor_state = a_node.status == "OPEN"
+        elif a_node.type == "motionsensor" and a_node.motion_status is not None:
+            sensor_state = a_node.motion_status
+
+        return {'state': sensor_state}
+
+    def get_snapshot(self):
+        """Get every entity value from the current Hive data in one pass."""
+        snapshot = {}
+        state = self.hsc.state
+
+        for a_hub in state.devices.hub:
+            Pyhiveapi.p_snapshot_add(self, snapshot, a_hub.id,
+                                     {'online_status': "Online" if a_hub.online else "Offline"})
+
+        for a_device in state.devices.thermostat + state.devices.sensors:
+            Pyhiveapi.p_snapshot_add(self, snapshot, a_device.id,
+                                     {'battery_level': a_device.battery if a_device.battery is not None else 0})
+
+        for a_node in state.products.heating:
+            Pyhiveapi.p_snapshot_add(self, snapshot, a_node.id, Pyhiveapi.p_snapshot_heating(self, a_node))
+
+        for a_node in state.products.hotwater:
+            Pyhiveapi.p_snapshot_add(self, snapshot, a_node.id, Pyhiveapi.p_snapshot_hotwater(self, a_node))
+
+        for a_node in state.products.light:
+            Pyhiveapi.p_snapshot_add(self, snapshot, a_node.id, Pyhiveapi.p_snapshot_light(self, a_node))
+
+        for a_node in state.products.plug:
+            Pyhiveapi.p_snapshot_add(self, snapshot, a_node.id, Pyhiveapi.p_snapshot_plug(self, a_node))
+
+        for a_node in state.products.sensors:
+            Pyhiveapi.p_snapshot_add(self, snapshot, a_node.id, Pyhiveapi.p_snapshot_sensor(self, a_node))
+
+        return MappingProxyType({node_id: MappingProxyType(node_values)
+                                 for node_id, node_values in snapshot.items()})
+
     def test_use_file(self, devices, products):
         """Get latest data for Hive nodes."""
         get_nodes_successful = True
 
         UseFile = True
         if UseFile == True:
-            HSC.file = True
-            HSC.session_id = 'Test'
-
-
+            self.hsc.file = True
+            self.hsc.session_id = 'Test'
 
-        tmp_devices_hub = []
-        tmp_devices_thermostat = []
-        tmp_devices_boiler_module = []
-        tmp_devices_plug = []
-        tmp_devices_light = []
-        tmp_devices_sensors = []
-
-        tmp_products_heating = []
-        tmp_products_hotwater = []
-        tmp_products_light = []
-        tmp_products_plug = []
-        tmp_products_sensors = []
+        tmp_devices = Pyhiveapi.p_parse_devices(self, [])
+        tmp_products = Pyhiveapi.p_parse_products(self, [])
 
         if devices != None:
-            try_finished = False
-            try:
-                api_resp_d = {}
-                api_resp_p = None
-                api_resp_d = devices
-
-                api_resp_p = api_resp_d
-
-                for a_device in api_resp_p:
-                    if "type" in a_device:
-                        if a_device["type"] == "hub":
-                            tmp_devices_hub.append(a_device)
-                        if a_device["type"] == "thermostatui":
-                            tmp_devices_thermostat.append(a_device)
-                        if a_device["type"] == "boilermodule":
-                            tmp_devices_boiler_module.append(a_device)
-                        if a_device["type"] == "activeplug":
-                            tmp_devices_plug.append(a_device)
-                        if (a_device["type"] == "warmwhitelight" or
-                                a_device["type"] == "tuneablelight" or
-                                a_device["type"] == "colourtuneablelight"):
-                            tmp_devices_light.append(a_device)
-                        if (a_device["type"] == "motionsensor" or
-                                a_device["type"] == "contactsensor"):
-                            tmp_devices_sensors.append(a_device)
-
-                try_finished = True
-            except (IOError, RuntimeError, ZeroDivisionError):
-                try_finished = False
-            finally:
-                if not try_finished:
-                    try_finished = False
+            tmp_devices = Pyhiveapi.p_parse_devices(self, devices)
 
         if products != None:
+            tmp_products = Pyhiveapi.p_parse_products(self, products)
 
-            try_finished = False
-            try:
-                api_resp_d = {}
-                api_resp_p = None
-                api_resp_d = products
-
-                api_resp_p = api_resp_d
-                for a_product in api_resp_p:
-                    if "type" in a_product:
-                        if a_product["type"] == "heating":
-                            tmp_products_heating.append(a_product)
-                        if a_product["type"] == "hotwater":
-                            tmp_products_hotwater.append(a_product)
-                        if a_product["type"] == "activeplug":
-                            tmp_products_plug.append(a_product)
-                        if (a_product["type"] == "warmwhitelight" or
-                                a_product["type"] == "tuneablelight" or
-                                a_product["type"] == "colourtuneablelight"):
-                            tmp_products_light.append(a_product)
-                        if (a_product["type"] == "motionsensor" or
-                                a_product["type"] == "contactsensor"):
-                            tmp_products_sensors.append(a_product)
-                try_finished = True
-            except (IOError, RuntimeError, ZeroDivisionError):
-                try_finished = False
-            finally:
-                if not try_finished:
-                    try_finished = False
-
-        try_finished = False
-        try:
-            if len(tmp_devices_hub) > 0:
-                HSC.devices.hub = tmp_devices_hub
-            if len(tmp_devices_thermostat) > 0:
-                HSC.devices.thermostat = tmp_devices_thermostat
-            if len(tmp_devices_boiler_module) > 0:
-                HSC.devices.boiler_module = tmp_devices_boiler_module
-            if len(tmp_devices_plug) > 0:
-                HSC.devices.plug = tmp_devices_plug
-            if len(tmp_devices_light) > 0:
-                HSC.devices.light = tmp_devices_light
-            if len(tmp_devices_sensors) > 0:
-                HSC.devices.sensors = tmp_devices_sensors
-
-            if len(tmp_products_heating) > 0:
-                HSC.products.heating = tmp_products_heating
-            if len(tmp_products_hotwater) > 0:
-                HSC.products.hotwater = tmp_products_hotwater
-            if len(tmp_products_plug) > 0:
-                HSC.products.plug = tmp_products_plug
-            if len(tmp_products_light) > 0:
-                HSC.products.light = tmp_products_light
-            if len(tmp_products_sensors) > 0:
-                HSC.products.sensors = tmp_products_sensors
-
-            try_finished = True
-        except (IOError, RuntimeError, ZeroDivisionError):
-                try_finished = False
-        finally:
-            if not try_finished:
-                get_nodes_successful = False
+        get_nodes_successful = Pyhiveapi.p_store_nodes(self, tmp_devices, tmp_products)
 
         return get_nodes_successful
 
 
-    class Heating():
+    class Heating(HiveDomain):
         """Hive Switches."""
         def min_temperature(self, node_id):
             """Get heating minimum target temperature."""
@@ -788,11 +2318,11 @@ class Pyhiveapi:
             current_node_attribute = "Heating_Min_Temperature_" + node_id
 
             if heating_min_temp_found:
-                NODE_ATTRIBS[current_node_attribute] = heating_min_temp_tmp
+                self.node_attribs[current_node_attribute] = heating_min_temp_tmp
                 heating_min_temp_return = heating_min_temp_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    heating_min_temp_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    heating_min_temp_return = self.node_attribs.get(current_node_attribute)
                 else:
                     heating_min_temp_return = heating_min_temp_default
 
@@ -811,11 +2341,11 @@ class Pyhiveapi:
             current_node_attribute = "Heating_Max_Temperature_" + node_id
 
             if heating_max_temp_found:
-                NODE_ATTRIBS[current_node_attribute] = heating_max_temp_tmp
+                self.node_attribs[current_node_attribute] = heating_max_temp_tmp
                 heating_max_temp_return = heating_max_temp_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    heating_max_temp_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    heating_max_temp_return = self.node_attribs.get(current_node_attribute)
                 else:
                     heating_max_temp_return = heating_max_temp_default
 
@@ -824,7 +2354,7 @@ class Pyhiveapi:
 
         def current_temperature(self, node_id):
             """Get heating current temperature."""
-            node_index = -1
+            a_node = None
 
             current_temp_return = 0
             current_temp_tmp = 0
@@ -832,47 +2362,40 @@ class Pyhiveapi:
 
             current_node_attribute = "Heating_CurrentTemp_" + node_id
 
-            if len(HSC.products.heating) > 0:
-                for current_node_index in range(0, len(HSC.products.heating)):
-                    if "id" in HSC.products.heating[current_node_index]:
-                        if HSC.products.heating[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
+            if len(self.hsc.products.heating) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "heating")
 
-                if node_index != -1:
-                    if "props" in HSC.products.heating[node_index]:
-                        if "temperature" in HSC.products.heating[node_index]["props"]:
-                            current_temp_tmp = (HSC.products.heating[node_index]
-                                                ["props"]["temperature"])
-                            current_temp_found = True
+                if a_node is not None and a_node.temperature is not None:
+                    current_temp_tmp = a_node.temperature
+                    current_temp_found = True
 
             if current_temp_found:
-                NODE_ATTRIBS[current_node_attribute] = current_temp_tmp
+                self.node_attribs[current_node_attribute] = current_temp_tmp
                 current_temp_return = current_temp_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    current_temp_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    current_temp_return = self.node_attribs.get(current_node_attribute)
                 else:
                     current_temp_return = -1000
 
             if current_temp_return != -1000:
-                if node_id in HSC.data.minmax:
-                    if (HSC.data.minmax[node_id]['TodayDate'] != datetime.date(datetime.now())):
-                        HSC.data.minmax[node_id]['TodayMin'] = 1000
-                        HSC.data.minmax[node_id]['TodayMax'] = -1000
-                        HSC.data.minmax[node_id]['TodayDate'] = datetime.date(datetime.now())
+                if node_id in self.hsc.data.minmax:
+                    if (self.hsc.data.minmax[node_id]['TodayDate'] != datetime.date(datetime.now())):
+                        self.hsc.data.minmax[node_id]['TodayMin'] = 1000
+                        self.hsc.data.minmax[node_id]['TodayMax'] = -1000
+                        self.hsc.data.minmax[node_id]['TodayDate'] = datetime.date(datetime.now())
 
-                    if (current_temp_return < HSC.data.minmax[node_id]['TodayMin']):
-                        HSC.data.minmax[node_id]['TodayMin'] = current_temp_return
+                    if (current_temp_return < self.hsc.data.minmax[node_id]['TodayMin']):
+                        self.hsc.data.minmax[node_id]['TodayMin'] = current_temp_return
 
-                    if (current_temp_return > HSC.data.minmax[node_id]['TodayMax']):
-                        HSC.data.minmax[node_id]['TodayMax'] = current_temp_return
+                    if (current_temp_return > self.hsc.data.minmax[node_id]['TodayMax']):
+                        self.hsc.data.minmax[node_id]['TodayMax'] = current_temp_return
 
-                    if (current_temp_return < HSC.data.minmax[node_id]['RestartMin']):
-                        HSC.data.minmax[node_id]['RestartMin'] = current_temp_return
+                    if (current_temp_return < self.hsc.data.minmax[node_id]['RestartMin']):
+                        self.hsc.data.minmax[node_id]['RestartMin'] = current_temp_return
 
-                    if (current_temp_return > HSC.data.minmax[node_id]['RestartMax']):
-                        HSC.data.minmax[node_id]['RestartMax'] = current_temp_return
+                    if (current_temp_return > self.hsc.data.minmax[node_id]['RestartMax']):
+                        self.hsc.data.minmax[node_id]['RestartMax'] = current_temp_return
                 else:
                     current_node_max_min_data = {}
                     current_node_max_min_data['TodayMin'] = current_temp_return
@@ -880,21 +2403,21 @@ class Pyhiveapi:
                     current_node_max_min_data['TodayDate'] = datetime.date(datetime.now())
                     current_node_max_min_data['RestartMin'] = current_temp_return
                     current_node_max_min_data['RestartMax'] = current_temp_return
-                    HSC.data.minmax[node_id] = current_node_max_min_data
+                    self.hsc.data.minmax[node_id] = current_node_max_min_data
             else:
                 current_temp_return = 0
 
             return current_temp_return
 
         def minmax_temperatures(self, node_id):
-            if node_id in HSC.data.minmax:
-                return HSC.data.minmax[node_id]
+            if node_id in self.hsc.data.minmax:
+                return self.hsc.data.minmax[node_id]
             else:
                 return None
 
         def get_target_temperature(self, node_id):
             """Get heating target temperature."""
-            node_index = -1
+            a_node = None
 
             heating_target_temp_return = 0
             heating_target_temp_tmp = 0
@@ -902,62 +2425,59 @@ class Pyhiveapi:
 
             current_node_attribute = "Heating_TargetTemp_" + node_id
 
-            if len(HSC.products.heating) > 0:
-                for current_node_index in range(0, len(HSC.products.heating)):
-                    if "id" in HSC.products.heating[current_node_index]:
-                        if HSC.products.heating[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
+            if len(self.hsc.products.heating) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "heating")
 
-                if node_index != -1:
+                if a_node is not None:
                     heating_mode_current = Pyhiveapi.Heating.get_mode(self, node_id)
-                    if heating_mode_current == "SCHEDULE":
-                        if ('props' in HSC.products.heating[node_index] and
-                                'scheduleOverride' in
-                                HSC.products.heating[node_index]["props"]):
-                            if (HSC.products.heating[node_index]
-                                    ["props"]["scheduleOverride"]):
-                                if ("state" in HSC.products.heating[node_index] and
-                                        "target" in HSC.products.heating[node_index]
-                                        ["state"]):
-                                    heating_target_temp_tmp = (HSC.products.heating
-                                                               [node_index]["state"]
-                                                               ["target"])
-                                    heating_target_temp_found = True
-                            else:
-                                snan = (
-                                    Pyhiveapi.p_get_schedule_now_next_later(self, HSC.products.heating[node_index]["state"]["schedule"]))
-                                if 'now' in snan:
-                                    if ('value' in snan["now"] and
-                                            'target' in snan["now"]
-                                            ["value"]):
-                                        heating_target_temp_tmp = (snan["now"]
-                                                                   ["value"]
-                                                                   ["target"])
-                                        heating_target_temp_found = True
-                    else:
-                        if ("state" in HSC.products.heating[node_index] and "target"
-                                in HSC.products.heating[node_index]["state"]):
-                            heating_target_temp_tmp = \
-                                HSC.products.heating[node_index]["state"]["target"]
-                            heating_target_temp_found = True
+                    heating_target_temp_tmp = Pyhiveapi.Heating.p_node_target_temperature(self, a_node, heating_mode_current)
+                    if heating_target_temp_tmp is not None:
+                        heating_target_temp_found = True
 
             if heating_target_temp_found:
-                NODE_ATTRIBS[current_node_attribute] = heating_target_temp_tmp
+                self.node_attribs[current_node_attribute] = heating_target_temp_tmp
                 heating_target_temp_return = heating_target_temp_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
+                if current_node_attribute in self.node_attribs:
                     heating_target_temp_return = \
-                        NODE_ATTRIBS.get(current_node_attribute)
+                        self.node_attribs.get(current_node_attribute)
                 else:
                     heating_target_temp_return = 0
 
             return heating_target_temp_return
 
 
+        def p_node_target_temperature(self, a_node, heating_mode):
+            """Get the target temperature of a heating node in the given mode."""
+            node_target = None
+
+            if heating_mode == "SCHEDULE":
+                if a_node.schedule_override is not None:
+                    if a_node.schedule_override:
+                        node_target = a_node.target
+                    else:
+                        snan = Pyhiveapi.p_get_schedule_now_next_later(self, Pyhiveapi.p_node_schedule(self, a_node))
+                        if 'now' in snan:
+                            if ('value' in snan["now"] and
+                                    'target' in snan["now"]["value"]):
+                                node_target = snan["now"]["value"]["target"]
+            else:
+                node_target = a_node.target
+
+            return node_target
+
+
+        def p_node_mode(self, a_node):
+            """Get the mode of a heating node."""
+            node_mode = a_node.mode
+            if node_mode == "BOOST" and a_node.previous_mode is not None:
+                node_mode = a_node.previous_mode
+            return node_mode
+
+
         def get_mode(self, node_id):
             """Get heating current mode."""
-            node_index = -1
+            a_node = None
 
             mode_return = "UNKNOWN"
             mode_tmp = "UNKNOWN"
@@ -965,34 +2485,19 @@ class Pyhiveapi:
 
             current_node_attribute = "Heating_Mode_" + node_id
 
-            if len(HSC.products.heating) > 0:
-                for current_node_index in range(0, len(HSC.products.heating)):
-                    if "id" in HSC.products.heating[current_node_index]:
-                        if HSC.products.heating[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("state" in HSC.products.heating[node_index] and
-                            "mode" in HSC.products.heating[node_index]["state"]):
-                        mode_tmp = HSC.products.heating[node_index]["state"]["mode"]
-                        if mode_tmp == "BOOST":
-                            if ("props" in HSC.products.heating[node_index] and
-                                    "previous" in
-                                    HSC.products.heating[node_index]["props"] and
-                                    "mode" in
-                                    HSC.products.heating[node_index]
-                                    ["props"]["previous"]):
-                                mode_tmp = (HSC.products.heating[node_index]
-                                            ["props"]["previous"]["mode"])
-                        mode_found = True
+            if len(self.hsc.products.heating) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "heating")
+
+                if a_node is not None and a_node.mode is not None:
+                    mode_tmp = Pyhiveapi.Heating.p_node_mode(self, a_node)
+                    mode_found = True
 
             if mode_found:
-                NODE_ATTRIBS[current_node_attribute] = mode_tmp
+                self.node_attribs[current_node_attribute] = mode_tmp
                 mode_return = mode_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    mode_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    mode_return = self.node_attribs.get(current_node_attribute)
                 else:
                     mode_return = "UNKNOWN"
 
@@ -1001,46 +2506,56 @@ class Pyhiveapi:
 
         def get_state(self, node_id):
             """Get heating current state."""
+            a_node = None
+
             heating_state_return = "OFF"
             heating_state_tmp = "OFF"
             heating_state_found = False
 
             current_node_attribute = "Heating_State_" + node_id
 
-            if len(HSC.products.heating) > 0:
-                temperature_current = Pyhiveapi.Heating.current_temperature(self, node_id)
-                temperature_target = Pyhiveapi.Heating.get_target_temperature(self, node_id)
-                heating_boost = Pyhiveapi.Heating.get_boost(self, node_id)
-                heating_mode = Pyhiveapi.Heating.get_mode(self, node_id)
-
-                if (heating_mode == "SCHEDULE" or
-                        heating_mode == "MANUAL" or
-                        heating_boost == "ON"):
-                    if temperature_current < temperature_target:
-                        heating_state_tmp = "ON"
-                        heating_state_found = True
-                    else:
-                        heating_state_tmp = "OFF"
-                        heating_state_found = True
-                else:
-                    heating_state_tmp = "OFF"
+            if len(self.hsc.products.heating) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "heating")
+
+                if a_node is not None:
+                    heating_mode = Pyhiveapi.Heating.p_node_mode(self, a_node)
+                    temperature_current = a_node.temperature if a_node.temperature is not None else 0
+                    temperature_target = Pyhiveapi.Heating.p_node_target_temperature(self, a_node, heating_mode)
+                    if temperature_target is None:
+                        temperature_target = 0
+                    heating_boost = "OFF" if a_node.boost is None else "ON"
+
+                    heating_state_tmp = Pyhiveapi.Heating.p_node_state(self, temperature_current, temperature_target, heating_mode, heating_boost)
                     heating_state_found = True
 
             if heating_state_found:
-                NODE_ATTRIBS[current_node_attribute] = heating_state_tmp
+                self.node_attribs[current_node_attribute] = heating_state_tmp
                 heating_state_return = heating_state_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    heating_state_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    heating_state_return = self.node_attribs.get(current_node_attribute)
                 else:
                     heating_state_return = "UNKNOWN"
 
             return heating_state_return
 
 
+        def p_node_state(self, temperature_current, temperature_target, heating_mode, heating_boost):
+            """Get the heating state from the current heating values."""
+            heating_state = "OFF"
+
+            if (heating_mode == "SCHEDULE" or
+                    heating_mode == "MANUAL" or
+                    heating_boost == "ON"):
+                if temperature_current < temperature_target:
+                    heating_state = "ON"
+
+            return heating_state
+
+
         def get_boost(self, node_id):
             """Get heating boost current status."""
-            node_index = -1
+            a_node = None
 
             heating_boost_return = "UNKNOWN"
             heating_boost_tmp = "UNKNOWN"
@@ -1048,30 +2563,22 @@ class Pyhiveapi:
 
             current_node_attribute = "Heating_Boost_" + node_id
 
-            if len(HSC.products.heating) > 0:
-                for current_node_index in range(0, len(HSC.products.heating)):
-                    if "id" in HSC.products.heating[current_node_index]:
-                        if HSC.products.heating[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("state" in HSC.products.heating[node_index] and
-                            "boost" in HSC.products.heating[node_index]["state"]):
-                        heating_boost_tmp = (HSC.products.heating[node_index]
-                                             ["state"]["boost"])
-                        if heating_boost_tmp is None:
-                            heating_boost_tmp = "OFF"
-                        else:
-                            heating_boost_tmp = "ON"
-                        heating_boost_found = True
+            if len(self.hsc.products.heating) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "heating")
+
+                if a_node is not None:
+                    if a_node.boost is None:
+                        heating_boost_tmp = "OFF"
+                    else:
+                        heating_boost_tmp = "ON"
+                    heating_boost_found = True
 
             if heating_boost_found:
-                NODE_ATTRIBS[current_node_attribute] = heating_boost_tmp
+                self.node_attribs[current_node_attribute] = heating_boost_tmp
                 heating_boost_return = heating_boost_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    heating_boost_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    heating_boost_return = self.node_attribs.get(current_node_attribute)
                 else:
                     heating_boost_return = "UNKNOWN"
 
@@ -1083,25 +2590,10 @@ class Pyhiveapi:
             heating_boost = "UNKNOWN"
 
             if Pyhiveapi.Heating.get_boost(self, node_id) == "ON":
-                node_index = -1
+                a_node = Pyhiveapi.p_get_product(self, node_id, "heating")
 
-                heating_boost_tmp = "UNKNOWN"
-                heating_boost_found = False
-
-                if len(HSC.products.heating) > 0:
-                    for current_node_index in range(0, len(HSC.products.heating)):
-                        if "id" in HSC.products.heating[current_node_index]:
-                            if (HSC.products.heating[current_node_index]["id"] == node_id):
-                                node_index = current_node_index
-                                break
-
-                    if node_index != -1:
-                        if ("state" in HSC.products.heating[node_index] and "boost" in HSC.products.heating[node_index]["state"]):
-                            heating_boost_tmp = (HSC.products.heating[node_index]["state"]["boost"])
-                            heating_boost_found = True
-
-                if heating_boost_found:
-                    heating_boost = heating_boost_tmp
+                if a_node is not None and a_node.boost is not None:
+                    heating_boost = a_node.boost
 
             return heating_boost
 
@@ -1119,17 +2611,10 @@ class Pyhiveapi:
             snan = None
 
             if heating_mode_current == "SCHEDULE":
-                node_index = -1
-
-                if len(HSC.products.heating) > 0:
-                    for current_node_index in range(0, len(HSC.products.heating)):
-                        if "id" in HSC.products.heating[current_node_index]:
-                            if HSC.products.heating[current_node_index]["id"] == node_id:
-                                node_index = current_node_index
-                                break
+                a_node = Pyhiveapi.p_get_product(self, node_id, "heating")
 
-                if node_index != -1:
-                    snan = Pyhiveapi.p_get_schedule_now_next_later(self, HSC.products.heating[node_index]["state"]["schedule"])
+                if a_node is not None:
+                    snan = Pyhiveapi.p_get_schedule_now_next_later(self, Pyhiveapi.p_node_schedule(self, a_node))
                 else:
                     snan = None
             else:
@@ -1138,37 +2623,58 @@ class Pyhiveapi:
             return snan
 
 
+        def p_set_target_temperature_call(self, node_id, new_temperature):
+            """Get the Hive API call to set heating target temperature."""
+            api_call = None
+
+            a_node = None
+            if len(self.hsc.products.heating) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "heating")
+
+                if a_node is not None:
+                    if a_node.id is not None:
+                        json_string_content = ('{"target":' + str(new_temperature) + '}')
+                        hive_api_url = (self.hive_api.urls.nodes + "/heating/" + a_node.id)
+                        api_call = (hive_api_url, json_string_content)
+
+            return api_call
+
+
         def set_target_temperature(self, node_id, new_temperature):
             """Set heating target temperature."""
             Pyhiveapi.check_hive_api_logon(self)
 
             set_temperature_success = False
-            api_resp_d = {}
-            api_resp = ""
 
-            if HSC.session_id is not None:
-                node_index = -1
-                if len(HSC.products.heating) > 0:
-                    for current_node_index in range(0, len(HSC.products.heating)):
-                        if "id" in HSC.products.heating[current_node_index]:
-                            if (HSC.products.heating[current_node_index]["id"] == node_id):
-                                node_index = current_node_index
-                                break
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Heating.p_set_target_temperature_call(self, node_id, new_temperature)
+                set_temperature_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
-                    if node_index != -1:
-                        if "id" in HSC.products.heating[node_index]:
-                            json_string_content = ('{"target":' + str(new_temperature) + '}')
+            return set_temperature_success
 
-                            hive_api_url = (HIVE_API.urls.nodes + "/heating/" + HSC.products.heating[node_index]["id"])
-                            api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST", hive_api_url, json_string_content, False)
 
-                            api_resp = api_resp_d['original']
+        def p_set_mode_call(self, node_id, new_mode):
+            """Get the Hive API call to set heating mode."""
+            api_call = None
 
-                            if str(api_resp) == "<Response [200]>":
-                                Pyhiveapi.hive_api_get_nodes(self, node_id)
-                                set_temperature_success = True
+            a_node = None
+            if len(self.hsc.products.heating) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "heating")
 
-            return set_temperature_success
+                if a_node is not None:
+                    if a_node.id is not None:
+                        if new_mode == "SCHEDULE":
+                            json_string_content = '{"mode": "SCHEDULE"}'
+                        elif new_mode == "MANUAL":
+                            json_string_content = '{"mode": "MANUAL"}'
+                        elif new_mode == "OFF":
+                            json_string_content = '{"mode": "OFF"}'
+
+                        if (new_mode == "SCHEDULE" or new_mode == "MANUAL" or new_mode == "OFF"):
+                            hive_api_url = (self.hive_api.urls.nodes + "/heating/" + a_node.id)
+                            api_call = (hive_api_url, json_string_content)
+
+            return api_call
 
 
         def set_mode(self, node_id, new_mode):
@@ -1176,129 +2682,114 @@ class Pyhiveapi:
             Pyhiveapi.check_hive_api_logon(self)
 
             set_mode_success = False
-            api_resp_d = {}
-            api_resp = ""
-
-            if HSC.session_id is not None:
-                node_index = -1
-                if len(HSC.products.heating) > 0:
-                    for current_node_index in range(0, len(HSC.products.heating)):
-                        if "id" in HSC.products.heating[current_node_index]:
-                            if (HSC.products.heating[current_node_index]["id"] == node_id):
-                                node_index = current_node_index
-                                break
-
-                    if node_index != -1:
-                        if "id" in HSC.products.heating[node_index]:
-                            if new_mode == "SCHEDULE":
-                                json_string_content = '{"mode": "SCHEDULE"}'
-                            elif new_mode == "MANUAL":
-                                json_string_content = '{"mode": "MANUAL"}'
-                            elif new_mode == "OFF":
-                                json_string_content = '{"mode": "OFF"}'
-
-                            if (new_mode == "SCHEDULE" or new_mode == "MANUAL" or new_mode == "OFF"):
-                                hive_api_url = (HIVE_API.urls.nodes + "/heating/" + HSC.products.heating[node_index]["id"])
-                                api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST", hive_api_url, json_string_content, False)
-
-                                api_resp = api_resp_d['original']
-
-                                if str(api_resp) == "<Response [200]>":
-                                    Pyhiveapi.hive_api_get_nodes(self, node_id)
-                                    set_mode_success = True
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Heating.p_set_mode_call(self, node_id, new_mode)
+                set_mode_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
             return set_mode_success
 
 
-        def turn_boost_on(self, node_id, length_minutes, target_temperature):
-            """Turn heating boost on."""
-            set_boost_success = False
-            heating_node_found = False
-            api_resp_d = {}
-            api_resp = ""
+        def p_set_state_call(self, node_id, **attributes):
+            """Get a single Hive API call to set several heating attributes."""
+            Pyhiveapi.p_check_state_attributes(self, attributes, ("mode", "target_temperature"))
+            api_calls = []
 
-            if length_minutes > 0 and target_temperature >= self.min_temperature(node_id) and target_temperature <= self.max_temperature(node_id):
-                heating_node_found = False
-            else:
-                return False
+            for attribute_name, attribute_value in attributes.items():
+                if attribute_name == "mode":
+                    api_calls.append(Pyhiveapi.Heating.p_set_mode_call(self, node_id, attribute_value))
+                elif attribute_name == "target_temperature":
+                    api_calls.append(Pyhiveapi.Heating.p_set_target_temperature_call(self, node_id, attribute_value))
+                else:
+                    api_calls.append(None)
+
+            return Pyhiveapi.p_merge_calls(self, api_calls)
 
-            for a_heating in HSC.products.heating:
-                if "id" in a_heating:
-                    if a_heating["id"] == node_id:
-                        heating_node_found = True
-                        break
 
+        def set_state(self, node_id, **attributes):
+            """Set heating mode and target temperature in one update."""
             Pyhiveapi.check_hive_api_logon(self)
 
-            if heating_node_found:
-                json_string_content = '{"mode": "BOOST", "boost": ' + str(length_minutes) + ', "target": ' + str(target_temperature) + '}'
-                hive_api_url = (HIVE_API.urls.nodes + "/heating/" + node_id)
-                api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST", hive_api_url, json_string_content, False)
+            set_state_success = False
 
-                api_resp = api_resp_d['original']
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Heating.p_set_state_call(self, node_id, **attributes)
+                set_state_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
-                if str(api_resp) == "<Response [200]>":
-                    Pyhiveapi.hive_api_get_nodes(self, node_id)
-                    set_boost_success = True
+            return set_state_success
 
-            return set_boost_success
 
+        def p_turn_boost_on_call(self, node_id, length_minutes, target_temperature):
+            """Get the Hive API call to turn heating boost on."""
+            api_call = None
 
-        def turn_boost_off(self, node_id):
-            """Turn heating boost off."""
-            set_boost_success = False
-            heating_node_found = False
-            api_resp_d = {}
-            api_resp = ""
+            if (length_minutes > 0 and
+                    target_temperature >= Pyhiveapi.Heating.min_temperature(self, node_id) and
+                    target_temperature <= Pyhiveapi.Heating.max_temperature(self, node_id)):
+                if Pyhiveapi.p_get_product(self, node_id, "heating") is not None:
+                    json_string_content = '{"mode": "BOOST", "boost": ' + str(length_minutes) + ', "target": ' + str(target_temperature) + '}'
+                    hive_api_url = (self.hive_api.urls.nodes + "/heating/" + node_id)
+                    api_call = (hive_api_url, json_string_content)
 
-            for a_heating in HSC.products.heating:
-                if "id" in a_heating:
-                    if a_heating["id"] == node_id:
-                        heating_node_found = True
-                        break
+            return api_call
+
+
+        def turn_boost_on(self, node_id, length_minutes, target_temperature):
+            """Turn heating boost on."""
+            api_call = Pyhiveapi.Heating.p_turn_boost_on_call(self, node_id, length_minutes, target_temperature)
+            if api_call is None:
+                return False
 
             Pyhiveapi.check_hive_api_logon(self)
 
-            if heating_node_found:
-                Pyhiveapi.hive_api_get_nodes(self, node_id)
-                boost_state = self.get_boost(node_id)
+            return Pyhiveapi.p_hive_api_write(self, node_id, api_call)
+
+
+        def p_turn_boost_off_call(self, node_id):
+            """Get the Hive API call to turn heating boost off."""
+            api_call = None
+            boost_state = Pyhiveapi.Heating.get_boost(self, node_id)
+
+            a_node = Pyhiveapi.p_get_product(self, node_id, "heating")
+
+            if a_node is not None and boost_state == "ON":
+                send_previous_mode = ''
+                send_previous_temperature = ''
+
+                if a_node.previous_mode is not None:
+                    previous_mode = a_node.previous_mode
+                    send_previous_mode = '"mode": "' + str(previous_mode) + '"'
+                    if previous_mode == "MANUAL":
+                        previous_temperature = a_node.previous_target
+                        send_previous_temperature = ', "target": ' + str(previous_temperature)
 
-                node_index = -1
-                for current_node_index in range(0, len(HSC.products.heating)):
-                    if "id" in HSC.products.heating[current_node_index]:
-                        if (HSC.products.heating[current_node_index]["id"] == node_id):
-                            node_index = current_node_index
-                            break
+                    json_string_content = '{' + send_previous_mode + send_previous_temperature + '}'
+                    hive_api_url = (self.hive_api.urls.nodes + "/heating/" + node_id)
+                    api_call = (hive_api_url, json_string_content)
 
-                if node_index != -1 and boost_state == "ON":
-                    send_previous_mode = ''
-                    send_previous_temperature = ''
+            return api_call
 
-                    if ("props" in HSC.products.heating[node_index] and "previous" in HSC.products.heating[node_index]["props"] and "mode" in HSC.products.heating[node_index]["props"]["previous"]):
-                        previous_mode = HSC.products.heating[node_index]["props"]["previous"]["mode"]
-                        send_previous_mode = '"mode": "' + str(previous_mode) + '"'
-                        if previous_mode == "MANUAL":
-                            previous_temperature = HSC.products.heating[node_index]["props"]["previous"]["target"]
-                            send_previous_temperature  = ', "target": ' + str(previous_temperature)
 
-                        json_string_content = '{' + send_previous_mode + send_previous_temperature + '}'
-                        hive_api_url = (HIVE_API.urls.nodes + "/heating/" + node_id)
-                        api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST", hive_api_url, json_string_content, False)
+        def turn_boost_off(self, node_id):
+            """Turn heating boost off."""
+            set_boost_success = False
+            heating_node_found = Pyhiveapi.p_get_product(self, node_id, "heating") is not None
 
-                        api_resp = api_resp_d['original']
+            Pyhiveapi.check_hive_api_logon(self)
 
-                    if str(api_resp) == "<Response [200]>":
-                        Pyhiveapi.hive_api_get_nodes(self, node_id)
-                        set_boost_success = True
+            if heating_node_found:
+                Pyhiveapi.hive_api_get_nodes(self, node_id)
+                api_call = Pyhiveapi.Heating.p_turn_boost_off_call(self, node_id)
+                set_boost_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
             return set_boost_success
 
 
-    class Hotwater():
+    class Hotwater(HiveDomain):
         """Hive Hotwater."""
         def get_mode(self, node_id):
             """Get hot water current mode."""
-            node_index = -1
+            a_node = None
 
             hotwater_mode_return = "UNKNOWN"
             hotwater_mode_tmp = "UNKNOWN"
@@ -1306,43 +2797,36 @@ class Pyhiveapi:
 
             current_node_attribute = "HotWater_Mode_" + node_id
 
-            if len(HSC.products.hotwater) > 0:
-                for current_node_index in range(0, len(HSC.products.hotwater)):
-                    if "id" in HSC.products.hotwater[current_node_index]:
-                        if HSC.products.hotwater[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("state" in HSC.products.hotwater[node_index] and
-                            "mode" in HSC.products.hotwater[node_index]["state"]):
-                        hotwater_mode_tmp = (HSC.products.hotwater[node_index]
-                                             ["state"]["mode"])
-                        if hotwater_mode_tmp == "BOOST":
-                            if ("props" in HSC.products.hotwater[node_index] and
-                                    "previous" in
-                                    HSC.products.hotwater[node_index]["props"] and
-                                    "mode" in
-                                    HSC.products.hotwater[node_index]
-                                    ["props"]["previous"]):
-                                hotwater_mode_tmp = (HSC.products.hotwater[node_index]
-                                                     ["props"]["previous"]["mode"])
-                        elif hotwater_mode_tmp == "MANUAL":
-                            hotwater_mode_tmp = "ON"
-                        hotwater_mode_found = True
+            if len(self.hsc.products.hotwater) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "hotwater")
+
+                if a_node is not None and a_node.mode is not None:
+                    hotwater_mode_tmp = Pyhiveapi.Hotwater.p_node_mode(self, a_node)
+                    hotwater_mode_found = True
 
             if hotwater_mode_found:
-                NODE_ATTRIBS[current_node_attribute] = hotwater_mode_tmp
+                self.node_attribs[current_node_attribute] = hotwater_mode_tmp
                 hotwater_mode_return = hotwater_mode_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    hotwater_mode_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    hotwater_mode_return = self.node_attribs.get(current_node_attribute)
                 else:
                     hotwater_mode_return = "UNKNOWN"
 
             return hotwater_mode_return
 
 
+        def p_node_mode(self, a_node):
+            """Get the mode of a hot water node."""
+            node_mode = a_node.mode
+            if node_mode == "BOOST":
+                if a_node.previous_mode is not None:
+                    node_mode = a_node.previous_mode
+            elif node_mode == "MANUAL":
+                node_mode = "ON"
+            return node_mode
+
+
         def get_operation_modes(self, node_id):
             """Get heating list of possible modes."""
             hotwater_operation_list = ["SCHEDULE", "ON", "OFF"]
@@ -1351,7 +2835,7 @@ class Pyhiveapi:
 
         def get_boost(self, node_id):
             """Get hot water current boost status."""
-            node_index = -1
+            a_node = None
 
             hotwater_boost_return = "UNKNOWN"
             hotwater_boost_tmp = "UNKNOWN"
@@ -1359,30 +2843,22 @@ class Pyhiveapi:
 
             current_node_attribute = "HotWater_Boost_" + node_id
 
-            if len(HSC.products.hotwater) > 0:
-                for current_node_index in range(0, len(HSC.products.hotwater)):
-                    if "id" in HSC.products.hotwater[current_node_index]:
-                        if HSC.products.hotwater[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("state" in HSC.products.hotwater[node_index] and
-                            "boost" in HSC.products.hotwater[node_index]["state"]):
-                        hotwater_boost_tmp = (HSC.products.hotwater[node_index]
-                                              ["state"]["boost"])
-                        if hotwater_boost_tmp is None:
-                            hotwater_boost_tmp = "OFF"
-                        else:
-                            hotwater_boost_tmp = "ON"
-                        hotwater_boost_found = True
+            if len(self.hsc.products.hotwater) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "hotwater")
+
+                if a_node is not None:
+                    if a_node.boost is None:
+                        hotwater_boost_tmp = "OFF"
+                    else:
+                        hotwater_boost_tmp = "ON"
+                    hotwater_boost_found = True
 
             if hotwater_boost_found:
-                NODE_ATTRIBS[current_node_attribute] = hotwater_boost_tmp
+                self.node_attribs[current_node_attribute] = hotwater_boost_tmp
                 hotwater_boost_return = hotwater_boost_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    hotwater_boost_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    hotwater_boost_return = self.node_attribs.get(current_node_attribute)
                 else:
                     hotwater_boost_return = "UNKNOWN"
 
@@ -1394,87 +2870,69 @@ class Pyhiveapi:
             hotwater_boost = "UNKNOWN"
 
             if Pyhiveapi.Hotwater.get_boost(self, node_id) == "ON":
-                node_index = -1
-
-                hotwater_boost_tmp = "UNKNOWN"
-                hotwater_boost_found = False
+                a_node = Pyhiveapi.p_get_product(self, node_id, "hotwater")
 
-                if len(HSC.products.hotwater) > 0:
-                    for current_node_index in range(0, len(HSC.products.hotwater)):
-                        if "id" in HSC.products.hotwater[current_node_index]:
-                            if (HSC.products.hotwater[current_node_index]["id"] == node_id):
-                                node_index = current_node_index
-                                break
-
-                    if node_index != -1:
-                        if ("state" in HSC.products.hotwater[node_index] and "boost" in HSC.products.hotwater[node_index]["state"]):
-                            hotwater_boost_tmp = (HSC.products.hotwater[node_index]["state"]["boost"])
-                            hotwater_boost_found = True
-
-                if hotwater_boost_found:
-                    hotwater_boost = hotwater_boost_tmp
+                if a_node is not None and a_node.boost is not None:
+                    hotwater_boost = a_node.boost
 
             return hotwater_boost
 
 
         def get_state(self, node_id):
             """Get hot water current state."""
-            node_index = -1
+            a_node = None
 
             state_return = "OFF"
             state_tmp = "OFF"
             state_found = False
-            mode_current = Pyhiveapi.Hotwater.get_mode(self, node_id)
 
             current_node_attribute = "HotWater_State_" + node_id
 
-            if len(HSC.products.hotwater) > 0:
-                for current_node_index in range(0, len(HSC.products.hotwater)):
-                    if "id" in HSC.products.hotwater[current_node_index]:
-                        if HSC.products.hotwater[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("state" in HSC.products.hotwater[node_index] and
-                            "status" in HSC.products.hotwater[node_index]["state"]):
-                        state_tmp = (HSC.products.hotwater[node_index]
-                                     ["state"]["status"])
-                        if state_tmp is None:
-                            state_tmp = "OFF"
-                        else:
-                            if mode_current == "SCHEDULE":
-                                if Pyhiveapi.Hotwater.get_boost(self, node_id) == "ON":
-                                    state_tmp = "ON"
-                                    state_found = True
-                                else:
-                                    if ("state" in
-                                            HSC.products.hotwater[node_index] and
-                                            "schedule" in
-                                            HSC.products.hotwater[node_index]
-                                            ["state"]):
-                                        snan = Pyhiveapi.p_get_schedule_now_next_later(self, HSC.products.hotwater[node_index]["state"]["schedule"])
-                                        if 'now' in snan:
-                                            if ('value' in snan["now"] and
-                                                    'status' in snan["now"]["value"]):
-                                                state_tmp = (snan["now"]["value"]
-                                                             ["status"])
-                                                state_found = True
-                            else:
-                                state_found = True
+            if len(self.hsc.products.hotwater) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "hotwater")
+
+                if a_node is not None:
+                    mode_current = "UNKNOWN"
+                    if a_node.mode is not None:
+                        mode_current = Pyhiveapi.Hotwater.p_node_mode(self, a_node)
+                    hotwater_boost = "OFF" if a_node.boost is None else "ON"
+                    state_tmp = Pyhiveapi.Hotwater.p_node_state(self, a_node, mode_current, hotwater_boost)
+                    if state_tmp is None:
+                        state_tmp = "OFF"
+                    else:
+                        state_found = True
 
             if state_found:
-                NODE_ATTRIBS[current_node_attribute] = state_tmp
+                self.node_attribs[current_node_attribute] = state_tmp
                 state_return = state_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    state_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    state_return = self.node_attribs.get(current_node_attribute)
                 else:
                     state_return = "UNKNOWN"
 
             return state_return
 
 
+        def p_node_state(self, a_node, hotwater_mode, hotwater_boost):
+            """Get the state of a hot water node from its mode and boost."""
+            node_state = a_node.status
+
+            if node_state is not None:
+                if hotwater_mode == "SCHEDULE":
+                    node_state = None
+                    if hotwater_boost == "ON":
+                        node_state = "ON"
+                    elif a_node.schedule is not None:
+                        snan = Pyhiveapi.p_get_schedule_now_next_later(self, Pyhiveapi.p_node_schedule(self, a_node))
+                        if 'now' in snan:
+                            if ('value' in snan["now"] and
+                                    'status' in snan["now"]["value"]):
+                                node_state = snan["now"]["value"]["status"]
+
+            return node_state
+
+
         def get_schedule_now_next_later(self, node_id):
             """Hive get hotwater schedule now, next and later."""
             hotwater_mode_current = Pyhiveapi.Hotwater.get_mode(self, node_id)
@@ -1482,17 +2940,10 @@ class Pyhiveapi:
             snan = None
 
             if hotwater_mode_current == "SCHEDULE":
-                node_index = -1
-
-                if len(HSC.products.hotwater) > 0:
-                    for current_node_index in range(0, len(HSC.products.hotwater)):
-                        if "id" in HSC.products.hotwater[current_node_index]:
-                            if HSC.products.hotwater[current_node_index]["id"] == node_id:
-                                node_index = current_node_index
-                                break
+                a_node = Pyhiveapi.p_get_product(self, node_id, "hotwater")
 
-                if node_index != -1:
-                    snan = Pyhiveapi.p_get_schedule_now_next_later(self, HSC.products.hotwater[node_index]["state"]["schedule"])
+                if a_node is not None:
+                    snan = Pyhiveapi.p_get_schedule_now_next_later(self, Pyhiveapi.p_node_schedule(self, a_node))
                 else:
                     snan = None
             else:
@@ -1501,130 +2952,135 @@ class Pyhiveapi:
             return snan
 
 
+        def p_set_mode_call(self, node_id, new_mode):
+            """Get the Hive API call to set hot water mode."""
+            api_call = None
+
+            a_node = None
+            if len(self.hsc.products.hotwater) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "hotwater")
+
+                if a_node is not None:
+                    if a_node.id is not None:
+                        if new_mode == "SCHEDULE":
+                            json_string_content = '{"mode": "SCHEDULE"}'
+                        elif new_mode == "ON":
+                            json_string_content = '{"mode": "MANUAL"}'
+                        elif new_mode == "OFF":
+                            json_string_content = '{"mode": "OFF"}'
+
+                        if (new_mode == "SCHEDULE" or new_mode == "ON" or new_mode == "OFF"):
+                            hive_api_url = (self.hive_api.urls.nodes + "/hotwater/" + a_node.id)
+                            api_call = (hive_api_url, json_string_content)
+
+            return api_call
+
+
         def set_mode(self, node_id, new_mode):
             """Set hot water mode."""
             Pyhiveapi.check_hive_api_logon(self)
 
             set_mode_success = False
-            api_resp_d = {}
-            api_resp = ""
-
-            if HSC.session_id is not None:
-                node_index = -1
-                if len(HSC.products.hotwater) > 0:
-                    for current_node_index in range(0, len(HSC.products.hotwater)):
-                        if "id" in HSC.products.hotwater[current_node_index]:
-                            if (HSC.products.hotwater[current_node_index]["id"] == node_id):
-                                node_index = current_node_index
-                                break
-
-                    if node_index != -1:
-                        if "id" in HSC.products.hotwater[node_index]:
-                            if new_mode == "SCHEDULE":
-                                json_string_content = '{"mode": "SCHEDULE"}'
-                            elif new_mode == "ON":
-                                json_string_content = '{"mode": "MANUAL"}'
-                            elif new_mode == "OFF":
-                                json_string_content = '{"mode": "OFF"}'
-
-                            if (new_mode == "SCHEDULE" or new_mode == "ON" or new_mode == "OFF"):
-                                hive_api_url = (HIVE_API.urls.nodes + "/hotwater/" + HSC.products.hotwater[node_index]["id"])
-                                api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST", hive_api_url, json_string_content, False)
-
-                                api_resp = api_resp_d['original']
-
-                                if str(api_resp) == "<Response [200]>":
-                                    Pyhiveapi.hive_api_get_nodes(self, node_id)
-                                    set_mode_success = True
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Hotwater.p_set_mode_call(self, node_id, new_mode)
+                set_mode_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
             return set_mode_success
 
 
-        def turn_boost_on(self, node_id, length_minutes):
-            """Turn hot water boost on."""
-            set_boost_success = False
-            hotwater_node_found = False
-            api_resp_d = {}
-            api_resp = ""
+        def p_set_state_call(self, node_id, **attributes):
+            """Get a single Hive API call to set several hot water attributes."""
+            Pyhiveapi.p_check_state_attributes(self, attributes, ("mode",))
+            api_calls = []
 
-            if length_minutes > 0:
-                hotwater_node_found = False
-            else:
-                return False
+            for attribute_name, attribute_value in attributes.items():
+                if attribute_name == "mode":
+                    api_calls.append(Pyhiveapi.Hotwater.p_set_mode_call(self, node_id, attribute_value))
+                else:
+                    api_calls.append(None)
 
-            for a_hotwater in HSC.products.hotwater:
-                if "id" in a_hotwater:
-                    if a_hotwater["id"] == node_id:
-                        hotwater_node_found = True
-                        break
+            return Pyhiveapi.p_merge_calls(self, api_calls)
 
+
+        def set_state(self, node_id, **attributes):
+            """Set hot water attributes in one update."""
             Pyhiveapi.check_hive_api_logon(self)
 
-            if hotwater_node_found:
-                json_string_content = '{"mode": "BOOST", "boost": ' + str(length_minutes) + '}'
-                hive_api_url = (HIVE_API.urls.nodes + "/hotwater/" + node_id)
-                api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST", hive_api_url, json_string_content, False)
+            set_state_success = False
 
-                api_resp = api_resp_d['original']
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Hotwater.p_set_state_call(self, node_id, **attributes)
+                set_state_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
-                if str(api_resp) == "<Response [200]>":
-                    Pyhiveapi.hive_api_get_nodes(self, node_id)
-                    set_boost_success = True
+            return set_state_success
 
-            return set_boost_success
 
+        def p_turn_boost_on_call(self, node_id, length_minutes):
+            """Get the Hive API call to turn hot water boost on."""
+            api_call = None
+
+            if length_minutes > 0:
+                if Pyhiveapi.p_get_product(self, node_id, "hotwater") is not None:
+                    json_string_content = '{"mode": "BOOST", "boost": ' + str(length_minutes) + '}'
+                    hive_api_url = (self.hive_api.urls.nodes + "/hotwater/" + node_id)
+                    api_call = (hive_api_url, json_string_content)
+
+            return api_call
 
-        def turn_boost_off(self, node_id):
-            """Turn hot water boost off."""
-            set_boost_success = False
-            hotwater_node_found = False
-            api_resp_d = {}
-            api_resp = ""
 
-            for a_hotwater in HSC.products.hotwater:
-                if "id" in a_hotwater:
-                    if a_hotwater["id"] == node_id:
-                        hotwater_node_found = True
-                        break
+        def turn_boost_on(self, node_id, length_minutes):
+            """Turn hot water boost on."""
+            api_call = Pyhiveapi.Hotwater.p_turn_boost_on_call(self, node_id, length_minutes)
+            if api_call is None:
+                return False
 
             Pyhiveapi.check_hive_api_logon(self)
 
-            if hotwater_node_found:
-                Pyhiveapi.hive_api_get_nodes(self, node_id)
-                boost_state = self.get_boost(node_id)
+            return Pyhiveapi.p_hive_api_write(self, node_id, api_call)
+
+
+        def p_turn_boost_off_call(self, node_id):
+            """Get the Hive API call to turn hot water boost off."""
+            api_call = None
+            boost_state = Pyhiveapi.Hotwater.get_boost(self, node_id)
+
+            a_node = Pyhiveapi.p_get_product(self, node_id, "hotwater")
 
-                node_index = -1
-                for current_node_index in range(0, len(HSC.products.hotwater)):
-                    if "id" in HSC.products.hotwater[current_node_index]:
-                        if (HSC.products.hotwater[current_node_index]["id"] == node_id):
-                            node_index = current_node_index
-                            break
+            if a_node is not None and boost_state == "ON":
+                send_previous_mode = ''
 
-                if node_index != -1 and boost_state == "ON":
-                    send_previous_mode = ''
+                if a_node.previous_mode is not None:
+                    previous_mode = a_node.previous_mode
+                    send_previous_mode = '"mode": "' + str(previous_mode) + '"'
 
-                    if ("props" in HSC.products.hotwater[node_index] and "previous" in HSC.products.hotwater[node_index]["props"] and "mode" in HSC.products.hotwater[node_index]["props"]["previous"]):
-                        previous_mode = HSC.products.hotwater[node_index]["props"]["previous"]["mode"]
-                        send_previous_mode = '"mode": "' + str(previous_mode) + '"'
+                    json_string_content = '{' + send_previous_mode + '}'
+                    hive_api_url = (self.hive_api.urls.nodes + "/hotwater/" + node_id)
+                    api_call = (hive_api_url, json_string_content)
 
-                        json_string_content = '{' + send_previous_mode + '}'
-                        hive_api_url = (HIVE_API.urls.nodes + "/hotwater/" + node_id)
-                        api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST", hive_api_url, json_string_content, False)
+            return api_call
 
-                        api_resp = api_resp_d['original']
 
-                    if str(api_resp) == "<Response [200]>":
-                        Pyhiveapi.hive_api_get_nodes(self, node_id)
-                        set_boost_success = True
+        def turn_boost_off(self, node_id):
+            """Turn hot water boost off."""
+            set_boost_success = False
+            hotwater_node_found = Pyhiveapi.p_get_product(self, node_id, "hotwater") is not None
+
+            Pyhiveapi.check_hive_api_logon(self)
+
+            if hotwater_node_found:
+                Pyhiveapi.hive_api_get_nodes(self, node_id)
+                api_call = Pyhiveapi.Hotwater.p_turn_boost_off_call(self, node_id)
+                set_boost_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
             return set_boost_success
 
 
-    class Light():
+    class Light(HiveDomain):
         """Hive Lights."""
         def get_state(self, node_id):
             """Get light current state."""
-            node_index = -1
+            a_node = None
 
             light_state_return = "UNKNOWN"
             light_state_tmp = "UNKNOWN"
@@ -1632,28 +3088,19 @@ class Pyhiveapi:
 
             current_node_attribute = "Light_State_" + node_id
 
-            if len(HSC.products.light) > 0:
-                for current_node_index in range(0, len(HSC.products.light)):
-                    if "id" in HSC.products.light[current_node_index]:
-                        if HSC.products.light[current_node_index][
-                            "id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("state" in HSC.products.light[
-                        node_index] and "status" in
-                        HSC.products.light[node_index]["state"]):
-                        light_state_tmp = (HSC.products.light[node_index]
-                                           ["state"]["status"])
-                        light_state_found = True
+            if len(self.hsc.products.light) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "light")
+
+                if a_node is not None and a_node.status is not None:
+                    light_state_tmp = a_node.status
+                    light_state_found = True
 
             if light_state_found:
-                NODE_ATTRIBS[current_node_attribute] = light_state_tmp
+                self.node_attribs[current_node_attribute] = light_state_tmp
                 light_state_return = light_state_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    light_state_return = NODE_ATTRIBS.get(
+                if current_node_attribute in self.node_attribs:
+                    light_state_return = self.node_attribs.get(
                         current_node_attribute)
                 else:
                     light_state_return = "UNKNOWN"
@@ -1667,7 +3114,7 @@ class Pyhiveapi:
 
         def get_brightness(self, node_id):
             """Get light current brightness."""
-            node_index = -1
+            a_node = None
 
             tmp_brightness_return = 0
             light_brightness_return = 0
@@ -1676,29 +3123,20 @@ class Pyhiveapi:
 
             current_node_attribute = "Light_Brightness_" + node_id
 
-            if len(HSC.products.light) > 0:
-                for current_node_index in range(0, len(HSC.products.light)):
-                    if "id" in HSC.products.light[current_node_index]:
-                        if HSC.products.light[current_node_index][
-                            "id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("state" in HSC.products.light[
-                        node_index] and "brightness" in
-                        HSC.products.light[node_index]["state"]):
-                        light_brightness_tmp = (HSC.products.light[node_index]
-                                                ["state"]["brightness"])
-                        light_brightness_found = True
+            if len(self.hsc.products.light) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "light")
+
+                if a_node is not None and a_node.brightness is not None:
+                    light_brightness_tmp = a_node.brightness
+                    light_brightness_found = True
 
             if light_brightness_found:
-                NODE_ATTRIBS[current_node_attribute] = light_brightness_tmp
+                self.node_attribs[current_node_attribute] = light_brightness_tmp
                 tmp_brightness_return = light_brightness_tmp
                 light_brightness_return = ((tmp_brightness_return / 100) * 255)
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    tmp_brightness_return = NODE_ATTRIBS.get(
+                if current_node_attribute in self.node_attribs:
+                    tmp_brightness_return = self.node_attribs.get(
                         current_node_attribute)
                     light_brightness_return = (
                     (tmp_brightness_return / 100) * 255)
@@ -1709,7 +3147,7 @@ class Pyhiveapi:
 
         def get_min_color_temp(self, node_id):
             """Get light minimum color temperature."""
-            node_index = -1
+            a_node = None
 
             light_min_color_temp_tmp = 0
             light_min_color_temp_return = 0
@@ -1717,36 +3155,22 @@ class Pyhiveapi:
 
             node_attrib = "Light_Min_color_Temp_" + node_id
 
-            if len(HSC.products.light) > 0:
-                for current_node_index in range(0, len(HSC.products.light)):
-                    if "id" in HSC.products.light[current_node_index]:
-                        if HSC.products.light[current_node_index][
-                            "id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("props" in HSC.products.light[node_index] and
-                                "colourTemperature" in
-                                HSC.products.light[node_index][
-                                    "props"] and "max" in
-                        HSC.products.light[node_index]
-                        ["props"]["colourTemperature"]):
-                        light_min_color_temp_tmp = (
-                        HSC.products.light[node_index]
-                        ["props"]
-                        ["colourTemperature"]["max"])
-                        light_min_color_temp_found = True
+            if len(self.hsc.products.light) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "light")
+
+                if a_node is not None and a_node.colour_temperature_max is not None:
+                    light_min_color_temp_tmp = a_node.colour_temperature_max
+                    light_min_color_temp_found = True
 
             if light_min_color_temp_found:
-                NODE_ATTRIBS[node_attrib] = light_min_color_temp_tmp
+                self.node_attribs[node_attrib] = light_min_color_temp_tmp
                 light_min_color_temp_return = round(
                     (1 / light_min_color_temp_tmp)
                     * 1000000)
             else:
-                if node_attrib in NODE_ATTRIBS:
+                if node_attrib in self.node_attribs:
                     light_min_color_temp_return = (
-                    NODE_ATTRIBS.get(node_attrib))
+                    self.node_attribs.get(node_attrib))
                 else:
                     light_min_color_temp_return = 0
 
@@ -1754,7 +3178,7 @@ class Pyhiveapi:
 
         def get_max_color_temp(self, node_id):
             """Get light maximum color temperature."""
-            node_index = -1
+            a_node = None
 
             light_max_color_temp_tmp = 0
             light_max_color_temp_return = 0
@@ -1762,35 +3186,21 @@ class Pyhiveapi:
 
             node_attrib = "Light_Max_color_Temp_" + node_id
 
-            if len(HSC.products.light) > 0:
-                for current_node_index in range(0, len(HSC.products.light)):
-                    if "id" in HSC.products.light[current_node_index]:
-                        if HSC.products.light[current_node_index][
-                            "id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("props" in HSC.products.light[node_index] and
-                                "colourTemperature" in
-                                HSC.products.light[node_index]["props"] and
-                                "min" in
-                                HSC.products.light[node_index]["props"]
-                                ["colourTemperature"]):
-                        light_max_color_temp_tmp = (
-                        HSC.products.light[node_index]
-                        ["props"]["colourTemperature"]
-                        ["min"])
-                        light_max_color_temp_found = True
+            if len(self.hsc.products.light) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "light")
+
+                if a_node is not None and a_node.colour_temperature_min is not None:
+                    light_max_color_temp_tmp = a_node.colour_temperature_min
+                    light_max_color_temp_found = True
 
             if light_max_color_temp_found:
-                NODE_ATTRIBS[node_attrib] = light_max_color_temp_tmp
+                self.node_attribs[node_attrib] = light_max_color_temp_tmp
                 light_max_color_temp_return = round(
                     (1 / light_max_color_temp_tmp)
                     * 1000000)
             else:
-                if node_attrib in NODE_ATTRIBS:
-                    light_max_color_temp_return = NODE_ATTRIBS.get(node_attrib)
+                if node_attrib in self.node_attribs:
+                    light_max_color_temp_return = self.node_attribs.get(node_attrib)
                 else:
                     light_max_color_temp_return = 0
 
@@ -1798,7 +3208,7 @@ class Pyhiveapi:
 
         def get_color_temp(self, node_id):
             """Get light current color temperature."""
-            node_index = -1
+            a_node = None
 
             light_color_temp_tmp = 0
             light_color_temp_return = 0
@@ -1806,29 +3216,20 @@ class Pyhiveapi:
 
             current_node_attribute = "Light_Color_Temp_" + node_id
 
-            if len(HSC.products.light) > 0:
-                for current_node_index in range(0, len(HSC.products.light)):
-                    if "id" in HSC.products.light[current_node_index]:
-                        if HSC.products.light[current_node_index][
-                            "id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("state" in HSC.products.light[node_index] and
-                                "colourTemperature" in
-                                HSC.products.light[node_index]["state"]):
-                        light_color_temp_tmp = (HSC.products.light[node_index]
-                                                ["state"]["colourTemperature"])
-                        light_color_temp_found = True
+            if len(self.hsc.products.light) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "light")
+
+                if a_node is not None and a_node.colour_temperature is not None:
+                    light_color_temp_tmp = a_node.colour_temperature
+                    light_color_temp_found = True
 
             if light_color_temp_found:
-                NODE_ATTRIBS[current_node_attribute] = light_color_temp_tmp
+                self.node_attribs[current_node_attribute] = light_color_temp_tmp
                 light_color_temp_return = round(
                     (1 / light_color_temp_tmp) * 1000000)
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    light_color_temp_return = NODE_ATTRIBS.get(
+                if current_node_attribute in self.node_attribs:
+                    light_color_temp_return = self.node_attribs.get(
                         current_node_attribute)
                 else:
                     light_color_temp_return = 0
@@ -1837,7 +3238,7 @@ class Pyhiveapi:
 
         def get_color(self,node_id):
             """Get color"""
-            node_index = -1
+            a_node = None
 
             light_color_hue_tmp = 0
             light_color_saturation_tmp = 0
@@ -1848,18 +3249,14 @@ class Pyhiveapi:
 
             current_node_attribute = "Light_Color_" + node_id
 
-            if len(HSC.products.light) > 0:
-                for current_node_index in range(0, len(HSC.products.light)):
-                    if "id" in HSC.products.light[current_node_index]:
-                        if HSC.products.light[current_node_index][
-                            "id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    light_color_hue_tmp = (HSC.products.light[node_index]["state"]["hue"])
-                    light_color_saturation_tmp = (HSC.products.light[node_index]["state"]["saturation"])
-                    light_color_value_tmp = (HSC.products.light[node_index]["state"]["value"])
+            if len(self.hsc.products.light) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "light")
+
+                if (a_node is not None and a_node.hue is not None and
+                        a_node.saturation is not None and a_node.value is not None):
+                    light_color_hue_tmp = a_node.hue
+                    light_color_saturation_tmp = a_node.saturation
+                    light_color_value_tmp = a_node.value
                     light_color_found = True
 
             if light_color_found:
@@ -1867,275 +3264,226 @@ class Pyhiveapi:
                 s = light_color_saturation_tmp / 100
                 v = light_color_value_tmp / 100
                 rgb = tuple(int(i * 255) for i in colorsys.hsv_to_rgb(h, s, v))
-                NODE_ATTRIBS[current_node_attribute] = rgb
+                self.node_attribs[current_node_attribute] = rgb
                 light_color_return = rgb
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    light_color_return = NODE_ATTRIBS.get(
+                if current_node_attribute in self.node_attribs:
+                    light_color_return = self.node_attribs.get(
                         current_node_attribute)
                 else:
                     light_color_return = 0
 
             return light_color_return
 
+        def p_light_call(self, node_id, json_string_content):
+            """Get the Hive API call to send the given content to a light."""
+            a_node = None
+            api_call = None
+
+            if len(self.hsc.products.light) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "light")
+                if a_node is not None:
+                    hive_api_url = (self.hive_api.urls.nodes
+                                    + '/' + a_node.type
+                                    + '/' + a_node.id)
+                    api_call = (hive_api_url, json_string_content)
+
+            return api_call
+
+        def p_turn_off_call(self, node_id):
+            """Get the Hive API call to turn a light off."""
+            return Pyhiveapi.Light.p_light_call(self, node_id, '{"status": "OFF"}')
+
         def turn_off(self, node_id):
             """Set light to turn off."""
             Pyhiveapi.check_hive_api_logon(self)
 
-            node_index = -1
-
             set_mode_success = False
-            api_resp_d = {}
-            api_resp = ""
-
-            if HSC.session_id is not None:
-                if len(HSC.products.light) > 0:
-                    for current_node_index in range(0,
-                                                    len(HSC.products.light)):
-                        if "id" in HSC.products.light[current_node_index]:
-                            if (HSC.products.light[current_node_index]
-                                ["id"] == node_id):
-                                node_index = current_node_index
-                                break
-                    if node_index != -1:
-                        json_string_content = '{"status": "OFF"}'
-                        hive_api_url = (HIVE_API.urls.nodes
-                                        + '/'
-                                        + HSC.products.light[node_index]["type"]
-                                        + '/'
-                                        + HSC.products.light[node_index]["id"])
-                        api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST",
-                                                        hive_api_url,
-                                                        json_string_content,
-                                                        False)
-
-                        api_resp = api_resp_d['original']
-
-                        if str(api_resp) == "<Response [200]>":
-                            Pyhiveapi.hive_api_get_nodes(self, node_id)
-                            set_mode_success = True
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Light.p_turn_off_call(self, node_id)
+                set_mode_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
             return set_mode_success
 
+        def p_turn_on_call(self, node_id):
+            """Get the Hive API call to turn a light on."""
+            return Pyhiveapi.Light.p_light_call(self, node_id, '{"status": "ON"}')
+
         def turn_on(self, node_id, nodedevicetype, new_brightness,
                     new_color_temp, new_color):
             """Set light to turn on."""
             Pyhiveapi.check_hive_api_logon(self, )
 
+            set_mode_success = False
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Light.p_turn_on_with_call(self, node_id, nodedevicetype, new_brightness,
+                                                               new_color_temp, new_color)
+                set_mode_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
+
+            return set_mode_success
+
+        def p_turn_on_with_call(self, node_id, nodedevicetype, new_brightness,
+                                new_color_temp, new_color):
+            """Get a single Hive API call to turn a light on with the given settings."""
+            light_attributes = {}
+
             if new_brightness is not None:
-                Pyhiveapi.Light.set_brightness(self, node_id, new_brightness)
-            if new_color_temp is not None:
-                Pyhiveapi.Light.set_color_temp(self, node_id, nodedevicetype,
-                                               new_color_temp)
+                light_attributes["brightness"] = new_brightness
+            # A colour takes precedence over a colour temperature, as it did when each was sent in turn.
             if new_color is not None:
-                Pyhiveapi.Light.set_color(self, node_id, new_color)
+                light_attributes["color"] = new_color
+            elif new_color_temp is not None:
+                light_attributes["color_temp"] = new_color_temp
+            light_attributes["state"] = True
+
+            return Pyhiveapi.Light.p_set_state_call(self, node_id, nodedevicetype, **light_attributes)
+
+        def p_set_state_call(self, node_id, nodedevicetype=None, **attributes):
+            """Get a single Hive API call to set several light attributes."""
+            Pyhiveapi.p_check_state_attributes(self, attributes, ("state", "brightness", "color_temp", "color"))
+            if "color_temp" in attributes and "color" in attributes:
+                raise ValueError("set_state() cannot set both color_temp and color")
+            api_calls = []
+
+            if nodedevicetype is None:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "light")
+                if a_node is not None:
+                    nodedevicetype = a_node.type
+
+            for attribute_name, attribute_value in attributes.items():
+                if attribute_name == "brightness":
+                    api_calls.append(Pyhiveapi.Light.p_set_brightness_call(self, node_id, attribute_value))
+                elif attribute_name == "color_temp":
+                    api_calls.append(Pyhiveapi.Light.p_set_color_temp_call(self, node_id, nodedevicetype, attribute_value))
+                elif attribute_name == "color":
+                    api_calls.append(Pyhiveapi.Light.p_set_color_call(self, node_id, attribute_value))
+                elif attribute_name != "state":
+                    api_calls.append(None)
+
+            if "state" in attributes:
+                if attributes["state"]:
+                    api_calls.append(Pyhiveapi.Light.p_turn_on_call(self, node_id))
+                else:
+                    api_calls.append(Pyhiveapi.Light.p_turn_off_call(self, node_id))
 
-            node_index = -1
+            return Pyhiveapi.p_merge_calls(self, api_calls)
 
-            set_mode_success = False
-            api_resp_d = {}
-            api_resp = ""
-
-            if HSC.session_id is not None:
-                if len(HSC.products.light) > 0:
-                    for cni in range(0, len(HSC.products.light)):
-                        if "id" in HSC.products.light[cni]:
-                            if HSC.products.light[cni]["id"] == node_id:
-                                node_index = cni
-                                break
-                    if node_index != -1:
-                        json_string_content = '{"status": "ON"}'
-                        hive_api_url = (HIVE_API.urls.nodes
-                                        + '/' + HSC.products.light[node_index][
-                                            "type"]
-                                        + '/' + HSC.products.light[node_index][
-                                            "id"])
-                        api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST",
-                                                        hive_api_url,
-                                                        json_string_content,
-                                                        False)
-
-                        api_resp = api_resp_d['original']
-
-                    if str(api_resp) == "<Response [200]>":
-                        Pyhiveapi.hive_api_get_nodes(self, node_id)
-                        set_mode_success = True
+        def set_state(self, node_id, **attributes):
+            """Set light state, brightness and colour in one update."""
+            Pyhiveapi.check_hive_api_logon(self)
 
-            return set_mode_success
+            set_state_success = False
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Light.p_set_state_call(self, node_id, **attributes)
+                set_state_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
+
+            return set_state_success
+
+        def p_set_brightness_call(self, node_id, new_brightness):
+            """Get the Hive API call to set light brightness."""
+            json_string_content = \
+                ('{"status": "ON", "brightness": '
+                 + str(new_brightness)
+                 + '}')
+            return Pyhiveapi.Light.p_light_call(self, node_id, json_string_content)
 
         def set_brightness(self, node_id, new_brightness):
             """Set light to turn on."""
             Pyhiveapi.check_hive_api_logon(self)
 
-            node_index = -1
-
             set_mode_success = False
-            api_resp_d = {}
-            api_resp = ""
-
-            if HSC.session_id is not None:
-                if len(HSC.products.light) > 0:
-                    for cni in range(0, len(HSC.products.light)):
-                        if "id" in HSC.products.light[cni]:
-                            if HSC.products.light[cni]["id"] == node_id:
-                                node_index = cni
-                                break
-                    if node_index != -1:
-                        json_string_content = \
-                            ('{"status": "ON", "brightness": '
-                            + str(new_brightness)
-                            + '}')
-                        hive_api_url = (HIVE_API.urls.nodes
-                                        + '/' + HSC.products.light[node_index][
-                                            "type"]
-                                        + '/' + HSC.products.light[node_index][
-                                            "id"])
-                        api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST",
-                                                        hive_api_url,
-                                                        json_string_content,
-                                                        False)
-
-                        api_resp = api_resp_d['original']
-
-                    if str(api_resp) == "<Response [200]>":
-                        Pyhiveapi.hive_api_get_nodes(self, node_id)
-                        set_mode_success = True
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Light.p_set_brightness_call(self, node_id, new_brightness)
+                set_mode_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
             return set_mode_success
 
+        def p_set_color_temp_call(self, node_id, nodedevicetype, new_color_temp):
+            """Get the Hive API call to set light colour temperature."""
+            if nodedevicetype == "tuneablelight":
+                json_string_content = '{"colourTemperature": ' + str(new_color_temp) + '}'
+            else:
+                json_string_content = '{"colourMode": "WHITE", "colourTemperature": ' + str(new_color_temp) + '}'
+            return Pyhiveapi.Light.p_light_call(self, node_id, json_string_content)
+
         def set_color_temp(self, node_id, nodedevicetype, new_color_temp):
             """Set light to turn on."""
             Pyhiveapi.check_hive_api_logon(self)
 
-            node_index = -1
-
             set_mode_success = False
-            api_resp_d = {}
-            api_resp = ""
-
-            if HSC.session_id is not None:
-                if len(HSC.products.light) > 0:
-                    for cni in range(0, len(HSC.products.light)):
-                        if "id" in HSC.products.light[cni]:
-                            if HSC.products.light[cni]["id"] == node_id:
-                                node_index = cni
-                                break
-                    if node_index != -1:
-                        if nodedevicetype == "tuneablelight":
-                            json_string_content = '{"colourTemperature": ' + str(new_color_temp) + '}'
-                        else:
-                            json_string_content = '{"colourMode": "WHITE", "colourTemperature": ' + str(new_color_temp) + '}'
-                        hive_api_url = (HIVE_API.urls.nodes
-                                        + '/' + HSC.products.light[node_index][
-                                            "type"]
-                                        + '/' + HSC.products.light[node_index][
-                                            "id"])
-                        api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST",
-                                                        hive_api_url,
-                                                        json_string_content,
-                                                        False)
-
-                        api_resp = api_resp_d['original']
-
-                    if str(api_resp) == "<Response [200]>":
-                        Pyhiveapi.hive_api_get_nodes(self, node_id)
-                        set_mode_success = True
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Light.p_set_color_temp_call(self, node_id, nodedevicetype, new_color_temp)
+                set_mode_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
             return set_mode_success
 
+        def p_set_color_call(self, node_id, new_color):
+            """Get the Hive API call to set light colour."""
+            new_hue = new_color[0]
+            new_saturation = new_color[1]
+            new_value = new_color[2]
+            json_string_content = '{"colourMode": "COLOUR", "hue": ' + str(
+                new_hue) + ', "saturation": ' + str(
+                new_saturation) + ', "value": ' + str(
+                new_value) + '}'
+            return Pyhiveapi.Light.p_light_call(self, node_id, json_string_content)
+
         def set_color(self, node_id, new_color):
             """Set light to turn on."""
             Pyhiveapi.check_hive_api_logon(self)
 
-            node_index = -1
-
             set_mode_success = False
-            api_resp_d = {}
-            api_resp = ""
-            new_hue = None
-            new_saturation = None
-            new_value = None
-
-            if HSC.session_id is not None:
-                if len(HSC.products.light) > 0:
-                    for cni in range(0, len(HSC.products.light)):
-                        if "id" in HSC.products.light[cni]:
-                            if HSC.products.light[cni]["id"] == node_id:
-                                node_index = cni
-                                break
-                    if node_index != -1:
-                        new_hue = new_color[0]
-                        new_saturation = new_color[1]
-                        new_value = new_color[2]
-                        json_string_content = '{"colourMode": "COLOUR", "hue": ' + str(
-                            new_hue) + ', "saturation": ' + str(
-                            new_saturation) + ', "value": ' + str(
-                            new_value) + '}'
-                        hive_api_url = (HIVE_API.urls.nodes
-                                        + '/' + HSC.products.light[node_index][
-                                            "type"]
-                                        + '/' + HSC.products.light[node_index][
-                                            "id"])
-                        api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST",
-                                                        hive_api_url,
-                                                        json_string_content,
-                                                        False)
-
-                        api_resp = api_resp_d['original']
-
-                    if str(api_resp) == "<Response [200]>":
-                        Pyhiveapi.hive_api_get_nodes(self, node_id)
-                        set_mode_success = True
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Light.p_set_color_call(self, node_id, new_color)
+                set_mode_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
             return set_mode_success
 
-    class Sensor():
+    class Sensor(HiveDomain):
         """Hive Sensors."""
         def hub_online_status(self, node_id):
             """Get the online status of the Hive hub."""
             return_status = "Offline"
 
-            for a_hub in HSC.devices.hub:
-                if "id" in a_hub:
-                    if a_hub["id"] == node_id:
-                        if "props" in a_hub and "online" in a_hub["props"]:
-                            if a_hub["props"]["online"]:
-                                return "Online"
-                            else:
-                                return "Offline"
+            a_hub = Pyhiveapi.p_get_device(self, node_id, "hub")
+            if a_hub is not None and a_hub.online is not None:
+                if a_hub.online:
+                    return "Online"
+                else:
+                    return "Offline"
 
             return return_status
 
 
         def battery_level(self, node_id):
             """Get device battery level."""
-            node_index = -1
+            a_node = None
 
             battery_level_return = 0
             battery_level_tmp = 0
             battery_level_found = False
-            all_devices = HSC.devices.thermostat + HSC.devices.sensors
 
             current_node_attribute = "BatteryLevel_" + node_id
 
-            if len(HSC.devices.thermostat) > 0 or len(HSC.devices.sensors) > 0:
-                for current_node_index in range(0, len(all_devices)):
-                    if "id" in all_devices[current_node_index]:
-                        if all_devices[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
+            if len(self.hsc.devices.thermostat) > 0 or len(self.hsc.devices.sensors) > 0:
+                a_node = Pyhiveapi.p_get_device(self, node_id, "thermostat", "sensors")
 
-                if node_index != -1:
-                    if ("props" in all_devices[node_index] and "battery" in all_devices[node_index]["props"]):
-                        battery_level_tmp = (all_devices[node_index]["props"]["battery"])
-                        battery_level_found = True
+                if a_node is not None and a_node.battery is not None:
+                    battery_level_tmp = a_node.battery
+                    battery_level_found = True
 
             if battery_level_found:
-                NODE_ATTRIBS[current_node_attribute] = battery_level_tmp
+                self.node_attribs[current_node_attribute] = battery_level_tmp
                 battery_level_return = battery_level_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    battery_level_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    battery_level_return = self.node_attribs.get(current_node_attribute)
                 else:
                     battery_level_return = 0
 
@@ -2143,7 +3491,7 @@ class Pyhiveapi:
 
         def get_state(self, node_id, node_device_type):
             """Get sensor state."""
-            node_index = -1
+            a_node = None
 
             sensor_state_tmp = False
             sensor_state_return = False
@@ -2151,29 +3499,25 @@ class Pyhiveapi:
 
             current_node_attribute = "Sensor_State_" + node_id
 
-            if len(HSC.products.sensors) > 0:
-                for current_node_index in range(0, len(HSC.products.sensors)):
-                    if "id" in HSC.products.sensors[current_node_index]:
-                        if HSC.products.sensors[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
+            if len(self.hsc.products.sensors) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "sensors")
 
-                if node_index != -1:
+                if a_node is not None:
                     if node_device_type == "contactsensor":
-                        state = (HSC.products.sensors[node_index]["props"]["status"])
+                        state = a_node.status
                         if state == 'OPEN':
                             sensor_state_tmp = True
                     elif node_device_type == "motionsensor":
-                        sensor_state_tmp = (HSC.products.sensors[node_index]["props"]["motion"]["status"])
+                        sensor_state_tmp = a_node.motion_status
                 if sensor_state_tmp != None:
                     sensor_found = True
 
             if sensor_found:
-                NODE_ATTRIBS[current_node_attribute] = sensor_state_tmp
+                self.node_attribs[current_node_attribute] = sensor_state_tmp
                 sensor_state_return = sensor_state_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    sensor_state_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    sensor_state_return = self.node_attribs.get(current_node_attribute)
                 else:
                     sensor_state_return = False
 
@@ -2182,45 +3526,37 @@ class Pyhiveapi:
         def get_mode(self, node_id):
             """Get sensor mode."""
 
-            node_index = -1
+            a_node = None
 
             hive_device_mode_tmp = ""
             hive_device_mode_return = ""
             hive_device_mode_found = False
-            all_devices = HSC.products.light + HSC.products.plug
 
             current_node_attribute = "Device_Mode_" + node_id
 
-            if len(HSC.products.light) > 0 or len(HSC.products.plug) > 0:
-                for current_node_index in range(0, len(all_devices)):
-                    if "id" in all_devices[current_node_index]:
-                        if all_devices[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
+            if len(self.hsc.products.light) > 0 or len(self.hsc.products.plug) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "light", "plug")
 
-                if node_index != -1:
-                    if ("state" in all_devices[node_index] and
-                            "mode" in all_devices[node_index]["state"]):
-                        hive_device_mode_tmp = (all_devices[node_index]
-                                                ["state"]["mode"])
-                        hive_device_mode_found = True
+                if a_node is not None and a_node.mode is not None:
+                    hive_device_mode_tmp = a_node.mode
+                    hive_device_mode_found = True
 
             if hive_device_mode_found:
-                NODE_ATTRIBS[current_node_attribute] = hive_device_mode_tmp
+                self.node_attribs[current_node_attribute] = hive_device_mode_tmp
                 hive_device_mode_return = hive_device_mode_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    hive_device_mode_return = NODE_ATTRIBS.get(current_node_attribute)
+                if current_node_attribute in self.node_attribs:
+                    hive_device_mode_return = self.node_attribs.get(current_node_attribute)
                 else:
                     hive_device_mode_return = "UNKNOWN"
 
             return hive_device_mode_return
 
-    class Switch():
+    class Switch(HiveDomain):
         """Hive Switches."""
         def get_state(self, node_id):
             """Get smart plug current state."""
-            node_index = -1
+            a_node = None
 
             smartplug_state_tmp = "UNKNOWN"
             smartplug_state_return = "UNKNOWN"
@@ -2228,27 +3564,19 @@ class Pyhiveapi:
 
             current_node_attribute = "Smartplug_State_" + node_id
 
-            if len(HSC.products.plug) > 0:
-                for current_node_index in range(0, len(HSC.products.plug)):
-                    if "id" in HSC.products.plug[current_node_index]:
-                        if HSC.products.plug[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("state" in HSC.products.plug[
-                        node_index] and "status" in
-                        HSC.products.plug[node_index]["state"]):
-                        smartplug_state_tmp = (HSC.products.plug[node_index]
-                                               ["state"]["status"])
-                        smartplug_state_found = True
+            if len(self.hsc.products.plug) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "plug")
+
+                if a_node is not None and a_node.status is not None:
+                    smartplug_state_tmp = a_node.status
+                    smartplug_state_found = True
 
             if smartplug_state_found:
-                NODE_ATTRIBS[current_node_attribute] = smartplug_state_tmp
+                self.node_attribs[current_node_attribute] = smartplug_state_tmp
                 smartplug_state_return = smartplug_state_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    smartplug_state_return = NODE_ATTRIBS.get(
+                if current_node_attribute in self.node_attribs:
+                    smartplug_state_return = self.node_attribs.get(
                         current_node_attribute)
                 else:
                     smartplug_state_return = "UNKNOWN"
@@ -2262,7 +3590,7 @@ class Pyhiveapi:
 
         def get_power_usage(self, node_id):
             """Get smart plug current power usage."""
-            node_index = -1
+            a_node = None
 
             current_power_tmp = 0
             current_power_return = 0
@@ -2270,112 +3598,105 @@ class Pyhiveapi:
 
             current_node_attribute = "Smartplug_Current_Power_" + node_id
 
-            if len(HSC.products.plug) > 0:
-                for current_node_index in range(0, len(HSC.products.plug)):
-                    if "id" in HSC.products.plug[current_node_index]:
-                        if HSC.products.plug[current_node_index]["id"] == node_id:
-                            node_index = current_node_index
-                            break
-
-                if node_index != -1:
-                    if ("props" in HSC.products.plug[node_index]
-                        and "powerConsumption"
-                        in HSC.products.plug[node_index]["props"]):
-                        current_power_tmp = (HSC.products.plug[node_index]
-                                             ["props"]["powerConsumption"])
-                        current_power_found = True
+            if len(self.hsc.products.plug) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "plug")
+
+                if a_node is not None and a_node.power_consumption is not None:
+                    current_power_tmp = a_node.power_consumption
+                    current_power_found = True
 
             if current_power_found:
-                NODE_ATTRIBS[current_node_attribute] = current_power_tmp
+                self.node_attribs[current_node_attribute] = current_power_tmp
                 current_power_return = current_power_tmp
             else:
-                if current_node_attribute in NODE_ATTRIBS:
-                    current_power_return = NODE_ATTRIBS.get(
+                if current_node_attribute in self.node_attribs:
+                    current_power_return = self.node_attribs.get(
                         current_node_attribute)
                 else:
                     current_power_return = 0
 
             return current_power_return
 
+        def p_plug_call(self, node_id, json_string_content):
+            """Get the Hive API call to send the given content to a smart plug."""
+            a_node = None
+            api_call = None
+
+            if len(self.hsc.products.plug) > 0:
+                a_node = Pyhiveapi.p_get_product(self, node_id, "plug")
+                if a_node is not None:
+                    hive_api_url = (self.hive_api.urls.nodes
+                                    + '/'
+                                    + a_node.type
+                                    + '/'
+                                    + a_node.id)
+                    api_call = (hive_api_url, json_string_content)
+
+            return api_call
+
+        def p_turn_on_call(self, node_id):
+            """Get the Hive API call to turn a smart plug on."""
+            return Pyhiveapi.Switch.p_plug_call(self, node_id, '{"status": "ON"}')
+
         def turn_on(self, node_id):
             """Set smart plug to turn on."""
             Pyhiveapi.check_hive_api_logon(self)
 
-            node_index = -1
-
             set_mode_success = False
-            api_resp_d = {}
-            api_resp = ""
-
-            if HSC.session_id is not None:
-                if len(HSC.products.plug) > 0:
-                    for current_node_index in range(0, len(HSC.products.plug)):
-                        if "id" in HSC.products.plug[current_node_index]:
-                            if HSC.products.plug[current_node_index][
-                                "id"] == node_id:
-                                node_index = current_node_index
-                                break
-                    if node_index != -1:
-                        json_string_content = '{"status": "ON"}'
-                        hive_api_url = (HIVE_API.urls.nodes
-                                        + '/'
-                                        + HSC.products.plug[node_index]["type"]
-                                        + '/'
-                                        + HSC.products.plug[node_index]["id"])
-                        api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST",
-                                                        hive_api_url,
-                                                        json_string_content,
-                                                        False)
-
-                        api_resp = api_resp_d['original']
-
-                        if str(api_resp) == "<Response [200]>":
-                            Pyhiveapi.hive_api_get_nodes(self, node_id)
-                            set_mode_success = True
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Switch.p_turn_on_call(self, node_id)
+                set_mode_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
             return set_mode_success
 
+        def p_turn_off_call(self, node_id):
+            """Get the Hive API call to turn a smart plug off."""
+            return Pyhiveapi.Switch.p_plug_call(self, node_id, '{"status": "OFF"}')
+
         def turn_off(self, node_id, ):
             """Set smart plug to turn off."""
             Pyhiveapi.check_hive_api_logon(self)
 
-            node_index = -1
-
             set_mode_success = False
-            api_resp_d = {}
-            api_resp = ""
-
-            if HSC.session_id is not None:
-                if len(HSC.products.plug) > 0:
-                    for current_node_index in range(0, len(HSC.products.plug)):
-                        if "id" in HSC.products.plug[current_node_index]:
-                            if HSC.products.plug[current_node_index][
-                                "id"] == node_id:
-                                node_index = current_node_index
-                                break
-                    if node_index != -1:
-                        json_string_content = '{"status": "OFF"}'
-                        hive_api_url = (HIVE_API.urls.nodes
-                                        + '/'
-                                        + HSC.products.plug[node_index]["type"]
-                                        + '/'
-                                        + HSC.products.plug[node_index]["id"])
-                        api_resp_d = Pyhiveapi.hive_api_json_call(self, "POST",
-                                                        hive_api_url,
-                                                        json_string_content,
-                                                        False)
-
-                        api_resp = api_resp_d['original']
-
-                        if str(api_resp) == "<Response [200]>":
-                            Pyhiveapi.hive_api_get_nodes(self, node_id)
-                            set_mode_success = True
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Switch.p_turn_off_call(self, node_id)
+                set_mode_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
 
             return set_mode_success
 
+        def p_set_state_call(self, node_id, **attributes):
+            """Get a single Hive API call to set several smart plug attributes."""
+            Pyhiveapi.p_check_state_attributes(self, attributes, ("state",))
+            api_calls = []
+
+            for attribute_name, attribute_value in attributes.items():
+                if attribute_name == "state":
+                    if attribute_value:
+                        api_calls.append(Pyhiveapi.Switch.p_turn_on_call(self, node_id))
+                    else:
+                        api_calls.append(Pyhiveapi.Switch.p_turn_off_call(self, node_id))
+                else:
+                    api_calls.append(None)
+
+            return Pyhiveapi.p_merge_calls(self, api_calls)
+
+        def set_state(self, node_id, **attributes):
+            """Set smart plug attributes in one update."""
+            Pyhiveapi.check_hive_api_logon(self)
+
+            set_state_success = False
+
+            if self.hsc.session_id is not None:
+                api_call = Pyhiveapi.Switch.p_set_state_call(self, node_id, **attributes)
+                set_state_success = Pyhiveapi.p_hive_api_write(self, node_id, api_call)
+
+            return set_state_success
+
 
-    class Weather():
+    class Weather(HiveDomain):
         """Hive Weather."""
         def temperature(self):
             """Get Hive Weather temperature."""
-            return HSC.weather.temperature.value
+            return self.hsc.weather.temperature.value
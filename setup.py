@@ -19,15 +19,16 @@ setup(
         'Intended Audience :: Developers',
 #        'Topic :: Software Development :: API',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
         'Programming Language :: Python :: 3.6',
     ],
-    python_requires='>=3.4.*',
+    python_requires='>=3.6',
     keywords='Hive API Library',
     packages=find_packages(exclude=['contrib', 'docs', 'tests']),
 #    packages=["pyhiveapi"],
 #    install_requires=[],
+    extras_require={
+        'async': ['aiohttp'],
+    },
 
     entry_points={
         'console_scripts': [
@@ -3,7 +3,7 @@ from pyhiveapi import Pyhiveapi
 import json
 
 HiveAPI = Pyhiveapi()
-HiveDevice = Pyhiveapi.Light()
+HiveDevice = HiveAPI.light
 
 print('Using File')
 devices = (input("Enter path for the devices file : ") or None)
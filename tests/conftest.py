@@ -0,0 +1,180 @@
+"""Shared fixtures for the pyhiveapi tests."""
+import copy
+import hashlib
+import json
+import threading
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from pyhiveapi import Pyhiveapi
+from pyhiveapi.pyhiveapi import HiveAPIRateLimit, HiveAPIRetry, HiveAPITransport
+
+HIVE_TEST_LOGIN_URL = "https://login.hive.test/login"
+HIVE_TEST_BASE_URL = "https://api.hive.test"
+
+
+def hive_test_schedule():
+    """Get a weekly schedule with the slots of each day out of order."""
+    day_slots = [{"start": 390, "value": {"target": 20.0}},
+                 {"start": 1320, "value": {"target": 15.0}},
+                 {"start": 480, "value": {"target": 18.0}}]
+    return {day_name: copy.deepcopy(day_slots)
+            for day_name in ("monday", "tuesday", "wednesday", "thursday",
+                             "friday", "saturday", "sunday")}
+
+
+def hive_test_devices():
+    """Get the devices of the fake Hive account."""
+    return [{"id": "hub1", "type": "hub", "state": {"name": "Hub"}, "props": {"online": True}},
+            {"id": "th1", "type": "thermostatui", "state": {"name": "Thermostat"}, "props": {"battery": 90}}]
+
+
+def hive_test_products():
+    """Get the products of the fake Hive account."""
+    return [{"id": "heat1", "type": "heating",
+             "state": {"name": "Heating", "mode": "SCHEDULE", "target": 20.5, "boost": None,
+                       "schedule": hive_test_schedule()},
+             "props": {"temperature": 19.0, "scheduleOverride": False,
+                       "previous": {"mode": "MANUAL", "target": 18}}},
+            {"id": "hw1", "type": "hotwater",
+             "state": {"name": "Hot Water", "mode": "SCHEDULE", "status": "ON", "boost": None,
+                       "schedule": hive_test_schedule()},
+             "props": {"previous": {"mode": "SCHEDULE"}}},
+            {"id": "li1", "type": "colourtuneablelight",
+             "state": {"name": "Lamp", "status": "ON", "brightness": 50, "colourMode": "WHITE",
+                       "colourTemperature": 4000, "hue": 120, "saturation": 50, "value": 100,
+                       "mode": "MANUAL"},
+             "props": {"colourTemperature": {"min": 2700, "max": 6533}}},
+            {"id": "pl1", "type": "activeplug",
+             "state": {"name": "Plug", "status": "OFF", "mode": "MANUAL"},
+             "props": {"powerConsumption": 12}}]
+
+
+class FakeHiveSession:
+    """A stand-in for requests.Session answering like the Hive API."""
+
+    def __init__(self):
+        """Set up the fake account and an empty request log."""
+        self.devices = hive_test_devices()
+        self.products = hive_test_products()
+        self.requests = []
+        self.queued = {}
+        self.etags = False
+        self.hold_gets = None
+        self.lock = threading.Lock()
+
+    def queue(self, request_type, path, *results):
+        """Answer the next requests for a path with (status, body[, headers]), a callable or an exception."""
+        self.queued.setdefault((request_type, path), []).extend(results)
+
+    def product(self, node_id):
+        """Get a product of the fake account by node id."""
+        return next(a_product for a_product in self.products if a_product["id"] == node_id)
+
+    def count(self, request_type, path):
+        """Count the requests sent for a path."""
+        return sum(1 for logged in self.requests if logged[:2] == (request_type, path))
+
+    def request(self, request_type, request_url, data=None, headers=None, timeout=None):
+        """Answer a request."""
+        path = request_url
+        if request_url.startswith(HIVE_TEST_BASE_URL):
+            path = request_url[len(HIVE_TEST_BASE_URL):]
+
+        with self.lock:
+            self.requests.append((request_type, path, dict(headers or {}), data))
+            queued = self.queued.get((request_type, path))
+            result = queued.pop(0) if queued else None
+
+        if request_type == "GET" and self.hold_gets is not None:
+            self.hold_gets.wait(5)
+
+        if callable(result):
+            result = result()
+        if isinstance(result, BaseException):
+            raise result
+        if result is None:
+            result = self.p_answer(request_type, path, data)
+
+        return self.p_response(request_url, headers or {}, *result)
+
+    def p_answer(self, request_type, path, data):
+        """Answer a request the way the Hive API would."""
+        if request_type == "POST" and path == HIVE_TEST_LOGIN_URL:
+            return 200, {"token": "token1",
+                         "user": {"locale": "en", "countryCode": "GB", "timezone": "Europe/London",
+                                  "postcode": "AB1 2CD", "temperatureUnit": "C"},
+                         "platform": {"endpoint": HIVE_TEST_BASE_URL, "name": "Hive"}}
+        if request_type == "GET" and path == "/devices":
+            return 200, self.devices
+        if request_type == "GET" and path == "/products":
+            return 200, self.products
+
+        if path.startswith("/nodes/"):
+            node_id = path.rsplit("/", 1)[-1]
+            for a_product in self.products:
+                if a_product["id"] == node_id:
+                    if request_type == "POST":
+                        a_product["state"].update(json.loads(data))
+                    return 200, a_product
+
+        return 404, {}
+
+    def p_response(self, request_url, headers, status_code, body, response_headers=None):
+        """Build a requests.Response, answering 304 if the ETag still matches."""
+        response = requests.Response()
+        response.url = request_url
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response.headers.update(response_headers or {})
+        response._content = json.dumps(body).encode()
+
+        if self.etags and status_code == 200:
+            etag = '"' + hashlib.sha1(response._content).hexdigest() + '"'
+            response.headers["ETag"] = etag
+            if headers.get("If-None-Match") == etag:
+                response.status_code = 304
+                response._content = b""
+
+        return response
+
+
+class FakeHiveTransport(HiveAPITransport):
+    """A Hive API transport sending its requests to a fake session."""
+
+    def __init__(self, session, retry=None, rate_limit=None):
+        """Send requests to session, without backoff or rate limiting by default."""
+        if retry is None:
+            retry = HiveAPIRetry(retries=0, backoff_seconds=0)
+        if rate_limit is None:
+            rate_limit = HiveAPIRateLimit(read_rate=None, write_rate=None)
+        HiveAPITransport.__init__(self, retry=retry, rate_limit=rate_limit)
+        self.session = session
+
+    def get_session(self):
+        """Get the fake session."""
+        return self.session
+
+
+def hive_test_account(session, **hive_options):
+    """Get a Pyhiveapi logged in to the fake session."""
+    hive = Pyhiveapi(transport=FakeHiveTransport(session), **hive_options)
+    hive.hive_api.urls.global_login = HIVE_TEST_LOGIN_URL
+    hive.initialise_api("user", "password", 1)
+    return hive
+
+
+@pytest.fixture
+def hive_session():
+    """Get a fake Hive API session."""
+    return FakeHiveSession()
+
+
+@pytest.fixture
+def hive(hive_session):
+    """Get a Pyhiveapi logged in to the fake session, with its nodes loaded."""
+    hive = hive_test_account(hive_session)
+    yield hive
+    hive.close()
@@ -0,0 +1,37 @@
+"""Tests for adaptive polling around schedule changes."""
+from datetime import datetime
+
+import pytest
+
+from pyhiveapi import Pyhiveapi
+from pyhiveapi import pyhiveapi as hive_module
+
+
+def freeze_time(monkeypatch, frozen_time):
+    """Make the Hive module see a fixed current time."""
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen_time
+
+    monkeypatch.setattr(hive_module, "datetime", FrozenDatetime)
+
+
+@pytest.mark.parametrize("heating_mode, hotwater_mode, schedule_change", [
+    ("SCHEDULE", "SCHEDULE", datetime(2026, 10, 14, 22, 0)),
+    ("MANUAL", "SCHEDULE", datetime(2026, 10, 14, 22, 0)),
+    ("MANUAL", "OFF", None),
+    # A boost follows the schedule only if it was on before the boost.
+    ("BOOST", "OFF", None),
+])
+def test_next_schedule_change_only_for_nodes_on_their_schedule(hive, hive_session, monkeypatch,
+                                                                heating_mode, hotwater_mode, schedule_change):
+    hive_session.product("heat1")["state"]["mode"] = heating_mode
+    hive_session.product("hw1")["state"]["mode"] = hotwater_mode
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    # Wednesday 10:00, in the slot that runs until 22:00.
+    freeze_time(monkeypatch, datetime(2026, 10, 14, 10, 0))
+    hive.hsc.last_update = datetime(2026, 10, 14, 10, 0)
+
+    assert Pyhiveapi.p_next_schedule_change(hive) == schedule_change
@@ -0,0 +1,197 @@
+"""Tests for the asyncio client."""
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from pyhiveapi.aiohiveapi import AsyncPyhiveapi, HiveAsyncTransport
+from pyhiveapi.pyhiveapi import HiveAPIRateLimit, HiveAPIRetry, HiveAPIUnavailable
+
+from conftest import HIVE_TEST_BASE_URL, HIVE_TEST_LOGIN_URL
+
+DEVICES_URL = HIVE_TEST_BASE_URL + "/devices"
+
+
+class FakeAsyncHiveResponse:
+    """A stand-in for an aiohttp response, answered by the fake session."""
+
+    def __init__(self, async_session, request_type, request_url, data, headers):
+        """Hold the request until it is sent."""
+        self.async_session = async_session
+        self.request_args = (request_type, request_url, data, headers)
+        self.status = None
+        self.headers = None
+        self.body = None
+
+    async def __aenter__(self):
+        """Send the request to the fake session."""
+        if self.request_args[0] == "GET" and self.async_session.hold_gets is not None:
+            await self.async_session.hold_gets.wait()
+        response = self.async_session.session.request(*self.request_args)
+        self.status = response.status_code
+        self.headers = response.headers
+        self.body = response.content
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Release the response."""
+        return False
+
+    async def read(self):
+        """Get the response body."""
+        return self.body
+
+
+class FakeAsyncHiveSession:
+    """A stand-in for aiohttp.ClientSession sending to the fake session."""
+
+    def __init__(self, session):
+        """Send requests to session."""
+        self.session = session
+        self.hold_gets = None
+        self.closed = False
+
+    def request(self, request_type, request_url, data=None, headers=None, timeout=None):
+        """Start a request."""
+        return FakeAsyncHiveResponse(self, request_type, request_url, data, headers)
+
+    async def close(self):
+        """Close the session."""
+        self.closed = True
+
+
+class FakeAsyncHiveTransport(HiveAsyncTransport):
+    """A Hive API async transport sending its requests to a fake session."""
+
+    def __init__(self, session, retry=None, rate_limit=None):
+        """Send requests to session, without backoff or rate limiting by default."""
+        if retry is None:
+            retry = HiveAPIRetry(retries=0, backoff_seconds=0)
+        if rate_limit is None:
+            rate_limit = HiveAPIRateLimit(read_rate=None, write_rate=None)
+        HiveAsyncTransport.__init__(self, retry=retry, rate_limit=rate_limit)
+        self.session = FakeAsyncHiveSession(session)
+
+    def get_session(self):
+        """Get the fake session."""
+        return self.session
+
+
+async def async_test_account(session, **hive_options):
+    """Get an AsyncPyhiveapi logged in to the fake session."""
+    hive = AsyncPyhiveapi(**hive_options)
+    hive.transport = FakeAsyncHiveTransport(session)
+    hive.hive_api.urls.global_login = HIVE_TEST_LOGIN_URL
+    await hive.initialise_api("user", "password", 1)
+    return hive
+
+
+def test_initialise_and_read_nodes(hive_session):
+    async def run():
+        hive = await async_test_account(hive_session)
+        try:
+            assert hive.hsc.session_id == "token1"
+            assert hive.switch.get_power_usage("pl1") == 12
+            assert set(hive.get_changes().added) == {"hub1", "th1", "heat1", "hw1", "li1", "pl1"}
+        finally:
+            await hive.close()
+
+    asyncio.run(run())
+
+
+def test_transport_retries_server_errors(hive_session):
+    transport = FakeAsyncHiveTransport(hive_session, retry=HiveAPIRetry(retries=2, backoff_seconds=0))
+    hive_session.queue("GET", "/devices", (503, {}), (502, {}))
+
+    response, body = asyncio.run(transport.request("GET", DEVICES_URL, "", {}, 10))
+
+    assert response.status == 200
+    assert hive_session.count("GET", "/devices") == 3
+
+
+def test_transport_raises_after_connection_errors(hive_session):
+    transport = FakeAsyncHiveTransport(hive_session, retry=HiveAPIRetry(retries=1, backoff_seconds=0,
+                                                                        circuit_failures=2))
+    hive_session.queue("GET", "/devices",
+                       aiohttp.ClientConnectionError("refused"), aiohttp.ClientConnectionError("refused"))
+
+    with pytest.raises(aiohttp.ClientConnectionError):
+        asyncio.run(transport.request("GET", DEVICES_URL, "", {}, 10))
+    assert hive_session.count("GET", "/devices") == 2
+
+    # Both failures count towards the circuit, which now fails fast.
+    with pytest.raises(HiveAPIUnavailable):
+        asyncio.run(transport.request("GET", DEVICES_URL, "", {}, 10))
+    assert hive_session.count("GET", "/devices") == 2
+
+
+def test_transport_waits_for_the_rate_limit(hive_session):
+    transport = FakeAsyncHiveTransport(hive_session,
+                                       rate_limit=HiveAPIRateLimit(read_rate=10, read_burst=1))
+
+    async def run():
+        for _ in range(3):
+            await transport.request("GET", DEVICES_URL, "", {}, 10)
+
+    started = time.monotonic()
+    asyncio.run(run())
+
+    assert time.monotonic() - started >= 0.15
+    assert hive_session.count("GET", "/devices") == 3
+
+
+def test_concurrent_refreshes_share_one_fetch(hive_session):
+    async def run():
+        hive = await async_test_account(hive_session)
+        try:
+            devices_gets = hive_session.count("GET", "/devices")
+            hive.transport.session.hold_gets = asyncio.Event()
+
+            refreshes = [asyncio.ensure_future(hive.hive_api_get_nodes("NoID")) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            # A cancelled caller does not cancel the fetch the others are waiting for.
+            refreshes[0].cancel()
+            hive.transport.session.hold_gets.set()
+            results = await asyncio.gather(*refreshes[1:])
+
+            assert results == [True] * 4
+            assert refreshes[0].cancelled()
+            assert hive_session.count("GET", "/devices") == devices_gets + 1
+            assert hive.nodes_flights == {}
+        finally:
+            await hive.close()
+
+    asyncio.run(run())
+
+
+def test_writes_within_the_window_share_one_refresh(hive_session):
+    async def run():
+        hive = await async_test_account(hive_session, write_debounce_seconds=0.1)
+        try:
+            devices_gets = hive_session.count("GET", "/devices")
+
+            results = await asyncio.gather(hive.switch.turn_on("pl1"),
+                                           hive.light.set_state("li1", brightness=20))
+
+            assert results == [True, True]
+            assert hive_session.count("GET", "/devices") == devices_gets + 1
+            assert hive_session.count("GET", "/nodes/activeplug/pl1") == 0
+            assert hive.switch.get_state("pl1") is True
+        finally:
+            await hive.close()
+
+    asyncio.run(run())
+
+
+def test_single_debounced_write_refreshes_its_node(hive_session):
+    async def run():
+        hive = await async_test_account(hive_session, write_debounce_seconds=0.1)
+        try:
+            assert await hive.switch.turn_on("pl1")
+
+            assert hive_session.count("GET", "/nodes/activeplug/pl1") == 1
+        finally:
+            await hive.close()
+
+    asyncio.run(run())
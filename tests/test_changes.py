@@ -0,0 +1,53 @@
+"""Tests for change detection between updates."""
+from pyhiveapi import Pyhiveapi
+
+
+def test_first_update_adds_every_node(hive):
+    changes = hive.get_changes()
+
+    assert set(changes.added) == {"hub1", "th1", "heat1", "hw1", "li1", "pl1"}
+    assert changes.removed == []
+    assert changes.changed == {}
+
+
+def test_update_reports_changed_attributes(hive, hive_session):
+    generation = hive.get_changes().generation
+    hive_session.product("li1")["state"]["brightness"] = 10
+    hive_session.product("pl1")["props"]["powerConsumption"] = 99
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    changes = hive.get_changes()
+    assert changes.generation == generation + 1
+    assert changes.changed == {"li1": {"brightness": (50, 10)},
+                               "pl1": {"power_consumption": (12, 99)}}
+    assert changes.added == [] and changes.removed == []
+
+
+def test_update_reports_added_and_removed_nodes(hive, hive_session):
+    second_plug = dict(hive_session.product("pl1"), id="pl2")
+    hive_session.products.append(second_plug)
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    assert hive.get_changes().added == ["pl2"]
+
+    hive_session.products.remove(second_plug)
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    assert hive.get_changes().removed == ["pl2"]
+
+
+def test_update_without_changes_is_empty(hive):
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert not hive.get_changes()
+
+
+def test_update_reports_the_last_node_of_a_category_removed(hive, hive_session):
+    hive_session.products.remove(hive_session.product("pl1"))
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert hive.get_changes().removed == ["pl1"]
+    assert hive.hsc.products.plug == ()
+    assert "pl1" not in hive.get_snapshot()
@@ -0,0 +1,123 @@
+"""Tests for conditional GETs and skipping unchanged node data."""
+from pyhiveapi import Pyhiveapi
+
+from conftest import hive_test_account
+
+
+def test_etag_sent_and_not_modified_reuses_the_nodes(hive, hive_session):
+    hive_session.etags = True
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    state = hive.hsc.state
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    devices_headers = [logged[2] for logged in hive_session.requests if logged[:2] == ("GET", "/devices")]
+    assert "If-None-Match" in devices_headers[-1]
+    assert hive.hsc.state is state
+    assert not hive.get_changes()
+    assert hive.hsc.unchanged_refreshes >= 1
+
+
+def test_changed_data_after_not_modified_is_stored(hive, hive_session):
+    hive_session.etags = True
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    hive_session.product("li1")["state"]["brightness"] = 10
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert hive.get_changes().changed == {"li1": {"brightness": (50, 10)}}
+    assert hive.hsc.unchanged_refreshes == 0
+
+
+def test_unchanged_body_skips_the_parse(hive, hive_session):
+    state = hive.hsc.state
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert hive.hsc.state is state
+    assert not hive.get_changes()
+
+
+def test_one_list_changed_reuses_the_other(hive, hive_session):
+    state = hive.hsc.state
+    products_gets = hive_session.count("GET", "/products")
+    hive_session.devices[1]["props"]["battery"] = 40
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert hive.hsc.state is not state
+    assert hive.get_changes().changed == {"th1": {"battery": (90, 40)}}
+    # The unchanged products are taken from the parsed state rather than parsed again.
+    assert hive.hsc.products.light[0] is state.products.light[0]
+    assert hive_session.count("GET", "/products") == products_gets + 1
+
+
+def test_validators_keep_only_the_body_hash(hive):
+    for api_validators in hive.hsc.validators.values():
+        assert not hasattr(api_validators, "parsed")
+        assert api_validators.body_hash is not None
+
+
+def test_unchanged_list_not_stored_is_fetched_again(hive, hive_session):
+    hive_session.etags = True
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    hive_session.devices[1]["props"]["battery"] = 40
+    # The changed devices are parsed, but not stored as the products fail.
+    hive_session.queue("GET", "/products", (500, {}))
+    assert not Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    devices_gets = hive_session.count("GET", "/devices")
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert hive.get_changes().changed == {"th1": {"battery": (90, 40)}}
+    devices_headers = [logged[2] for logged in hive_session.requests if logged[:2] == ("GET", "/devices")]
+    assert len(devices_headers) == devices_gets + 2
+    assert "If-None-Match" in devices_headers[-2]
+    assert "If-None-Match" not in devices_headers[-1]
+
+
+def test_unchanged_node_fetched_again_with_its_body(hive, hive_session):
+    hive_session.etags = True
+    assert Pyhiveapi.hive_api_get_node(hive, "pl1")
+
+    assert Pyhiveapi.hive_api_get_node(hive, "pl1")
+
+    assert hive_session.count("GET", "/nodes/activeplug/pl1") == 3
+    assert hive.switch.get_power_usage("pl1") == 12
+
+
+def test_validators_refreshed_when_the_body_is_unchanged(hive, hive_session):
+    devices_url = hive.hive_api.urls.base + hive.hive_api.urls.devices
+    hive_session.queue("GET", "/devices", (200, hive_session.devices, {"ETag": '"v2"'}))
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert hive.hsc.validators[devices_url].etag == '"v2"'
+
+
+def test_not_modified_without_validators_is_a_failure(hive, hive_session):
+    last_update = hive.hsc.last_update
+    hive.hsc.validators = {}
+    hive_session.queue("GET", "/products", (304, ""))
+
+    assert not Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert hive.hsc.last_update == last_update
+
+
+def test_unchanged_body_parsed_again_after_a_local_patch(hive_session):
+    hive = hive_test_account(hive_session, optimistic_writes=True)
+    # The write is accepted but the device never changes.
+    hive_session.queue("POST", "/nodes/activeplug/pl1", (200, hive_session.product("pl1")))
+
+    try:
+        assert hive.switch.turn_on("pl1")
+        assert hive.switch.get_state("pl1") is True
+
+        assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+        assert hive.switch.get_state("pl1") is False
+        assert hive.hsc.state is hive.hsc.parsed_state
+    finally:
+        hive.close()
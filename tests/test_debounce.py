@@ -0,0 +1,66 @@
+"""Tests for batching the refreshes confirming writes."""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from pyhiveapi import Pyhiveapi
+
+from conftest import hive_test_account
+
+
+@pytest.fixture
+def debounced_hive(hive_session):
+    """Get a Pyhiveapi confirming writes after a short debounce window."""
+    hive = hive_test_account(hive_session, write_debounce_seconds=0.2)
+    yield hive
+    hive.close()
+
+
+def test_single_debounced_write_refreshes_its_node(debounced_hive, hive_session):
+    write_started = time.monotonic()
+
+    assert debounced_hive.switch.turn_on("pl1")
+
+    assert time.monotonic() - write_started >= 0.2
+    assert hive_session.count("GET", "/nodes/activeplug/pl1") == 1
+    assert debounced_hive.switch.get_state("pl1") is True
+
+
+def test_writes_within_the_window_share_one_refresh(debounced_hive, hive_session):
+    devices_gets = hive_session.count("GET", "/devices")
+    results = []
+
+    def write_plug():
+        results.append(debounced_hive.switch.turn_on("pl1"))
+
+    plug_thread = threading.Thread(target=write_plug)
+    plug_thread.start()
+    time.sleep(0.05)
+    results.append(debounced_hive.light.set_state("li1", brightness=20))
+    plug_thread.join(5)
+
+    assert results == [True, True]
+    assert hive_session.count("POST", "/nodes/activeplug/pl1") == 1
+    assert hive_session.count("POST", "/nodes/colourtuneablelight/li1") == 1
+    assert hive_session.count("GET", "/devices") == devices_gets + 1
+    assert hive_session.count("GET", "/nodes/activeplug/pl1") == 0
+    assert debounced_hive.switch.get_state("pl1") is True
+    assert debounced_hive.light.get_brightness("li1") == pytest.approx(51)
+
+
+def test_window_is_capped(debounced_hive):
+    debounced_hive.hsc.write_debounce_seconds = 1
+    confirm_flight, confirm_leader = Pyhiveapi.p_debounce_write(debounced_hive, "pl1", object)
+    assert confirm_leader
+
+    # Writes that keep coming cannot hold the refresh back for more than ten windows.
+    debounced_hive.hsc.confirm_started = datetime.now() - timedelta(seconds=30)
+    assert Pyhiveapi.p_debounce_write(debounced_hive, "li1", object) == (confirm_flight, False)
+
+    assert debounced_hive.hsc.confirm_due == debounced_hive.hsc.confirm_started + timedelta(seconds=10)
+    wait_seconds, confirm_nodes = Pyhiveapi.p_debounce_due(debounced_hive)
+    assert wait_seconds == 0
+    assert confirm_nodes == {"pl1", "li1"}
+    assert debounced_hive.hsc.confirm_flight is None
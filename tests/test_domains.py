@@ -0,0 +1,26 @@
+"""Tests for the device domain objects of each account."""
+import pytest
+
+from pyhiveapi import Pyhiveapi
+
+from conftest import hive_test_account
+
+
+def test_domains_belong_to_their_account(hive, hive_session):
+    other_session = type(hive_session)()
+    other_session.product("pl1")["props"]["powerConsumption"] = 55
+    other_hive = hive_test_account(other_session)
+
+    try:
+        assert isinstance(hive.light, Pyhiveapi.Light)
+        assert hive.light.hive is hive
+        assert hive.switch.get_power_usage("pl1") == 12
+        assert other_hive.switch.get_power_usage("pl1") == 55
+        assert Pyhiveapi.Switch(other_hive).get_power_usage("pl1") == 55
+    finally:
+        other_hive.close()
+
+
+def test_domain_needs_an_account():
+    with pytest.raises(TypeError):
+        Pyhiveapi.Light()
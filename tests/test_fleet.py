@@ -0,0 +1,77 @@
+"""Tests for polling many accounts with a Hive fleet."""
+import time
+from datetime import datetime
+
+import pytest
+
+from pyhiveapi.hivefleet import HiveFleet
+from pyhiveapi.pyhiveapi import HiveAPIRetry
+
+from conftest import HIVE_TEST_LOGIN_URL, hive_test_account
+
+
+@pytest.fixture
+def fleet(hive_session, monkeypatch):
+    """Get a Hive fleet sending its requests to the fake session."""
+    fleet = HiveFleet(max_concurrency=1, fetch_workers=2,
+                      retry=HiveAPIRetry(retries=0, backoff_seconds=0))
+    monkeypatch.setattr(fleet.transport, "get_session", lambda: hive_session)
+    yield fleet
+    fleet.close()
+
+
+def add_test_account(fleet, key, **hive_options):
+    """Add an account logging in to the fake session."""
+    hive = fleet.add_account(key, "user", "password", 1, **hive_options)
+    hive.hive_api.urls.global_login = HIVE_TEST_LOGIN_URL
+    return fleet.accounts[key]
+
+
+def test_account_initialised_after_logging_in(fleet):
+    account = add_test_account(fleet, "home")
+
+    assert fleet.p_refresh_account(account)
+
+    assert account.initialised
+    assert account.health()["last_error"] is None
+    assert account.hive.switch.get_power_usage("pl1") == 12
+
+
+def test_account_not_initialised_when_the_log_in_fails(fleet, hive_session):
+    account = add_test_account(fleet, "home")
+    hive_session.queue("POST", HIVE_TEST_LOGIN_URL, (401, {"error": "bad password"}))
+
+    assert not fleet.p_refresh_account(account)
+
+    assert not account.initialised
+    assert account.consecutive_failures == 1
+
+
+def test_warm_start_not_initialised_when_the_log_in_fails(fleet, hive_session, tmp_path):
+    snapshot_file = str(tmp_path / "nodes")
+    hive_test_account(hive_session, node_snapshot_file=snapshot_file).close()
+    account = add_test_account(fleet, "home", node_snapshot_file=snapshot_file)
+    # A slow log in, still going on its own thread when initialise_api returns.
+    hive_session.queue("POST", HIVE_TEST_LOGIN_URL,
+                       lambda: time.sleep(0.2) or (401, {"error": "bad password"}))
+
+    assert not fleet.p_refresh_account(account)
+
+    assert not account.initialised
+    assert account.hive.hsc.warm_start is not None
+
+    # The failed log in backs off; let the next one go ahead straight away.
+    assert account.hive.hsc.logon_retry_after > datetime.now()
+    account.hive.hsc.logon_retry_after = datetime.now()
+    assert fleet.p_refresh_account(account)
+    assert account.initialised
+
+
+def test_account_not_initialised_when_getting_the_nodes_fails(fleet, hive_session):
+    account = add_test_account(fleet, "home")
+    hive_session.queue("GET", "/devices", (500, {}))
+
+    assert not fleet.p_refresh_account(account)
+
+    assert not account.initialised
+    assert account.consecutive_failures == 1
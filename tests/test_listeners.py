@@ -0,0 +1,63 @@
+"""Tests for node change listeners."""
+import threading
+
+from pyhiveapi import Pyhiveapi
+
+
+def test_listeners_filtered_by_node_and_attribute(hive, hive_session):
+    all_calls = []
+    brightness_calls = []
+    plug_calls = []
+    hive.subscribe(lambda node_id, changed: all_calls.append((node_id, changed)))
+    hive.subscribe(lambda node_id, changed: brightness_calls.append((node_id, changed)),
+                   attribute="brightness")
+    plug_listener = hive.subscribe(lambda node_id, changed: plug_calls.append((node_id, changed)),
+                                   node_id="pl1")
+    hive_session.product("li1")["state"]["brightness"] = 10
+    hive_session.product("li1")["state"]["hue"] = 200
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert all_calls == [("li1", {"brightness": (50, 10), "hue": (120, 200)})]
+    assert brightness_calls == [("li1", {"brightness": (50, 10)})]
+    assert plug_calls == []
+
+    hive.unsubscribe(plug_listener)
+    hive_session.product("pl1")["props"]["powerConsumption"] = 99
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    assert plug_calls == []
+
+
+def test_listener_error_does_not_fail_the_update(hive, hive_session):
+    later_calls = []
+
+    def failing_listener(node_id, changed):
+        raise RuntimeError("listener failed")
+
+    hive.subscribe(failing_listener)
+    hive.subscribe(lambda node_id, changed: later_calls.append(node_id))
+    hive_session.product("li1")["state"]["brightness"] = 10
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    assert later_calls == ["li1"]
+
+    assert hive.switch.turn_on("pl1")
+    assert later_calls == ["li1", "pl1"]
+
+
+def test_executor_listener_runs_off_the_fetch_pool(hive, hive_session):
+    listener_threads = []
+    listener_done = threading.Event()
+
+    def executor_listener(node_id, changed):
+        listener_threads.append(threading.current_thread())
+        listener_done.set()
+
+    hive.subscribe(executor_listener, use_executor=True)
+    hive_session.product("li1")["state"]["brightness"] = 10
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    assert listener_done.wait(5)
+    assert listener_threads[0] is not threading.current_thread()
+    assert hive.hive_api.callback_executor is not None
+    assert hive.hive_api.callback_executor is not hive.hive_api.executor
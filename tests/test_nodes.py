@@ -0,0 +1,52 @@
+"""Tests for single node refreshes."""
+import pytest
+
+from pyhiveapi import Pyhiveapi
+
+
+def test_write_confirmed_with_a_node_refresh(hive, hive_session):
+    devices_gets = hive_session.count("GET", "/devices")
+
+    assert hive.switch.turn_on("pl1")
+
+    assert hive_session.count("GET", "/nodes/activeplug/pl1") == 1
+    assert hive_session.count("GET", "/devices") == devices_gets
+    assert hive.switch.get_state("pl1") is True
+
+
+def test_node_refresh_uses_the_node_url(hive, hive_session):
+    devices_gets = hive_session.count("GET", "/devices")
+    hive_session.product("pl1")["props"]["powerConsumption"] = 99
+
+    assert Pyhiveapi.hive_api_get_node(hive, "pl1")
+
+    assert hive_session.count("GET", "/nodes/activeplug/pl1") == 1
+    assert hive_session.count("GET", "/devices") == devices_gets
+    assert hive.switch.get_power_usage("pl1") == 99
+
+
+@pytest.mark.parametrize("status_code", [400, 404])
+def test_node_not_found_falls_back_for_that_call_only(hive, hive_session, status_code):
+    devices_gets = hive_session.count("GET", "/devices")
+    hive_session.queue("GET", "/nodes/activeplug/pl1", (status_code, {}))
+
+    assert Pyhiveapi.hive_api_get_node(hive, "pl1")
+    assert hive_session.count("GET", "/devices") == devices_gets + 1
+    assert hive.hsc.node_refresh_supported
+
+    assert Pyhiveapi.hive_api_get_node(hive, "pl1")
+    assert hive_session.count("GET", "/nodes/activeplug/pl1") == 2
+    assert hive_session.count("GET", "/devices") == devices_gets + 1
+
+
+@pytest.mark.parametrize("status_code", [405, 501])
+def test_node_refresh_unsupported(hive, hive_session, status_code):
+    devices_gets = hive_session.count("GET", "/devices")
+    hive_session.queue("GET", "/nodes/activeplug/pl1", (status_code, {}))
+
+    assert Pyhiveapi.hive_api_get_node(hive, "pl1")
+    assert not hive.hsc.node_refresh_supported
+
+    assert Pyhiveapi.hive_api_get_node(hive, "pl1")
+    assert hive_session.count("GET", "/nodes/activeplug/pl1") == 1
+    assert hive_session.count("GET", "/devices") == devices_gets + 2
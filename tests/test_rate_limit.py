@@ -0,0 +1,119 @@
+"""Tests for the client side rate limits."""
+import pytest
+
+from pyhiveapi import pyhiveapi as hive_module
+from pyhiveapi.hivefleet import (HIVE_FLEET_READ_RATE_DEFAULT, HIVE_FLEET_WRITE_RATE_DEFAULT,
+                                 HiveFleet)
+from pyhiveapi.pyhiveapi import HiveAPIRateLimit, HiveTokenBucket
+
+from conftest import FakeHiveTransport, HIVE_TEST_BASE_URL, hive_test_account
+
+
+class FakeClock:
+    """A monotonic clock moved on by hand."""
+
+    def __init__(self):
+        """Start the clock."""
+        self.now = 1000.0
+
+    def __call__(self):
+        """Get the current time."""
+        return self.now
+
+
+class FixedRateLimit:
+    """A rate limit always asking for the same wait."""
+
+    def __init__(self, delay_seconds):
+        """Set the wait."""
+        self.delay_seconds = delay_seconds
+        self.requests = []
+
+    def delay(self, request_type):
+        """Get the wait for a request."""
+        self.requests.append(request_type)
+        return self.delay_seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Get a clock standing in for time.monotonic."""
+    fake_clock = FakeClock()
+    monkeypatch.setattr(hive_module.time, "monotonic", fake_clock)
+    return fake_clock
+
+
+def test_bucket_allows_a_burst_then_paces(clock):
+    bucket = HiveTokenBucket(rate=2, burst=3)
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    clock.now += 10
+    assert bucket.reserve() == 0.0
+
+
+def test_bucket_refill_is_capped_at_the_burst(clock):
+    bucket = HiveTokenBucket(rate=1, burst=2)
+
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, pytest.approx(1.0)]
+
+
+def test_reads_and_writes_have_separate_budgets(clock):
+    rate_limit = HiveAPIRateLimit(read_rate=1, read_burst=1, write_rate=1, write_burst=1)
+
+    assert rate_limit.delay("GET") == 0.0
+    assert rate_limit.delay("POST") == 0.0
+    assert rate_limit.delay("GET") == pytest.approx(1.0)
+    assert rate_limit.delay("PUT") == pytest.approx(1.0)
+
+
+def test_unlimited_budget():
+    rate_limit = HiveAPIRateLimit(read_rate=None, write_rate=None)
+
+    assert all(rate_limit.delay("GET") == 0.0 for _ in range(100))
+    assert rate_limit.delay("POST") == 0.0
+
+
+def test_transport_waits_for_the_longer_budget(hive_session, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(hive_module.time, "sleep", sleeps.append)
+    caller_limit = FixedRateLimit(2.0)
+    transport = FakeHiveTransport(hive_session, rate_limit=FixedRateLimit(0.5))
+
+    response = transport.request("GET", HIVE_TEST_BASE_URL + "/devices", "", {}, 10, caller_limit)
+
+    assert response.status_code == 200
+    assert sleeps == [2.0]
+    assert transport.rate_limit.requests == ["GET"] and caller_limit.requests == ["GET"]
+
+
+def test_account_budget_used_for_its_requests(hive_session, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(hive_module.time, "sleep", sleeps.append)
+    hive = hive_test_account(hive_session, rate_limit=FixedRateLimit(0.25))
+
+    try:
+        assert hive.switch.turn_on("pl1")
+    finally:
+        hive.close()
+
+    assert "POST" in hive.hive_api.rate_limit.requests
+    assert sleeps and all(sleep_seconds == 0.25 for sleep_seconds in sleeps)
+
+
+def test_fleet_shares_a_limit_and_budgets_each_account():
+    fleet = HiveFleet(max_concurrency=1, fetch_workers=1)
+
+    try:
+        hive = fleet.add_account("home", "user", "password")
+
+        assert fleet.transport.rate_limit.reads.rate == HIVE_FLEET_READ_RATE_DEFAULT
+        assert fleet.transport.rate_limit.writes.rate == HIVE_FLEET_WRITE_RATE_DEFAULT
+        assert hive.hive_api.transport is fleet.transport
+        assert hive.hive_api.rate_limit.reads is None
+        assert hive.hive_api.rate_limit.writes is not None
+    finally:
+        fleet.close()
@@ -0,0 +1,40 @@
+"""Tests for the background refresher."""
+import threading
+
+from pyhiveapi import Pyhiveapi
+from pyhiveapi import pyhiveapi as hive_module
+
+
+def test_refresh_delay_falls_back_on_error(hive, monkeypatch):
+    def failing_delay(self):
+        raise ValueError("no refresh time")
+
+    monkeypatch.setattr(Pyhiveapi, "p_refresh_delay", failing_delay)
+
+    assert Pyhiveapi.p_next_refresh_delay(hive) == hive_module.HIVE_REFRESH_FALLBACK_SECONDS
+
+
+def test_refresher_survives_a_refresh_delay_error(hive, monkeypatch):
+    delays = []
+    refreshed = threading.Event()
+
+    def flaky_delay(self):
+        delays.append(self)
+        if len(delays) == 1:
+            raise ValueError("no refresh time")
+        return 0.01
+
+    def refresh(self, node_id, include_weather=False):
+        refreshed.set()
+        return True
+
+    monkeypatch.setattr(hive_module, "HIVE_REFRESH_FALLBACK_SECONDS", 0.01)
+    monkeypatch.setattr(Pyhiveapi, "p_refresh_delay", flaky_delay)
+    monkeypatch.setattr(Pyhiveapi, "hive_api_get_nodes", refresh)
+
+    hive.start_refresher()
+    try:
+        assert refreshed.wait(5)
+        assert hive.hsc.refresher.is_running()
+    finally:
+        hive.stop_refresher()
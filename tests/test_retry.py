@@ -0,0 +1,129 @@
+"""Tests for retries, backoff and the circuit breaker."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from pyhiveapi import Pyhiveapi
+from pyhiveapi.pyhiveapi import HiveAPIRetry, HiveAPIUnavailable
+
+from conftest import FakeHiveTransport, HIVE_TEST_BASE_URL
+
+DEVICES_URL = HIVE_TEST_BASE_URL + "/devices"
+HIVE_TEST_HOST = "api.hive.test"
+
+
+def retry_transport(hive_session, retries=2, circuit_failures=5):
+    """Get a fake transport retrying without waiting."""
+    return FakeHiveTransport(hive_session, retry=HiveAPIRetry(retries=retries,
+                                                              backoff_seconds=0,
+                                                              circuit_failures=circuit_failures))
+
+
+def test_server_error_retried(hive_session):
+    transport = retry_transport(hive_session)
+    hive_session.queue("GET", "/devices", (503, {}), (502, {}))
+
+    response = transport.request("GET", DEVICES_URL, "", {}, 10)
+
+    assert response.status_code == 200
+    assert hive_session.count("GET", "/devices") == 3
+
+
+def test_retries_exhausted_return_the_last_response(hive_session):
+    transport = retry_transport(hive_session)
+    hive_session.queue("GET", "/devices", (503, {}), (503, {}), (500, {}))
+
+    response = transport.request("GET", DEVICES_URL, "", {}, 10)
+
+    assert response.status_code == 500
+    assert hive_session.count("GET", "/devices") == 3
+
+
+def test_client_error_not_retried(hive_session):
+    transport = retry_transport(hive_session)
+    hive_session.queue("GET", "/devices", (404, {}))
+
+    response = transport.request("GET", DEVICES_URL, "", {}, 10)
+
+    assert response.status_code == 404
+    assert hive_session.count("GET", "/devices") == 1
+
+
+def test_connection_error_retried_then_raised(hive_session):
+    transport = retry_transport(hive_session, retries=1)
+    hive_session.queue("GET", "/devices", ConnectionError("refused"), ConnectionError("refused"))
+
+    with pytest.raises(ConnectionError):
+        transport.request("GET", DEVICES_URL, "", {}, 10)
+    assert hive_session.count("GET", "/devices") == 2
+
+
+def test_retry_after_header():
+    retry = HiveAPIRetry(backoff_max_seconds=30)
+
+    assert retry.retry_after_seconds(None) is None
+    assert retry.retry_after_seconds("5") == 5.0
+    assert retry.retry_after_seconds("not a date") is None
+    assert retry.retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    assert retry.retry_delay(0, 429, 5.0) == 5.0
+    # Waiting longer than the backoff allows gives up instead.
+    assert retry.retry_delay(0, 429, 120.0) is None
+    assert retry.retry_delay(2, 429, 5.0) is None
+    assert retry.retry_delay(0, 400, None) is None
+
+
+def test_backoff_grows_and_is_capped():
+    retry = HiveAPIRetry(retries=10, backoff_seconds=1, backoff_max_seconds=4)
+
+    for attempt in range(10):
+        assert 0 <= retry.retry_delay(attempt, 503, None) <= min(4, 2 ** attempt)
+
+
+def test_circuit_opens_after_repeated_failures(hive_session):
+    transport = retry_transport(hive_session, retries=0, circuit_failures=3)
+    hive_session.queue("GET", "/devices", (503, {}), (503, {}), (503, {}))
+
+    for _ in range(3):
+        assert transport.request("GET", DEVICES_URL, "", {}, 10).status_code == 503
+
+    with pytest.raises(HiveAPIUnavailable):
+        transport.request("GET", DEVICES_URL, "", {}, 10)
+    assert hive_session.count("GET", "/devices") == 3
+
+    # Once the circuit may close, a single request tries the host again.
+    transport.retry.circuits[HIVE_TEST_HOST].open_until = datetime.now() - timedelta(seconds=1)
+    assert transport.request("GET", DEVICES_URL, "", {}, 10).status_code == 200
+    assert HIVE_TEST_HOST not in transport.retry.circuits
+
+
+def test_circuit_holds_back_requests_after_retry_after(hive_session):
+    transport = retry_transport(hive_session, retries=0)
+    hive_session.queue("GET", "/devices", (429, {}, {"Retry-After": "60"}))
+
+    assert transport.request("GET", DEVICES_URL, "", {}, 10).status_code == 429
+
+    with pytest.raises(HiveAPIUnavailable):
+        transport.request("GET", DEVICES_URL, "", {}, 10)
+
+
+def test_outage_fails_the_refresh_and_keeps_the_nodes(hive, hive_session):
+    last_update = hive.hsc.last_update
+    state = hive.hsc.state
+    brightness = hive.light.get_brightness("li1")
+    hive_session.queue("GET", "/products", ConnectionError("refused"))
+
+    assert not Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert hive.hsc.last_update == last_update
+    assert hive.hsc.state is state
+    assert hive.light.get_brightness("li1") == brightness
+
+
+def test_error_status_fails_the_refresh(hive, hive_session):
+    last_update = hive.hsc.last_update
+    hive_session.queue("GET", "/devices", (503, {"error": "unavailable"}))
+
+    assert not Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert hive.hsc.last_update == last_update
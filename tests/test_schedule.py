@@ -0,0 +1,95 @@
+"""Tests for the compiled weekly schedule index."""
+from datetime import datetime
+
+import pytest
+
+from pyhiveapi import Pyhiveapi
+from pyhiveapi import pyhiveapi as hive_module
+from pyhiveapi.pyhiveapi import HiveSchedule
+
+from conftest import hive_test_schedule
+
+
+def freeze_time(monkeypatch, frozen_time):
+    """Make the Hive module see a fixed current time."""
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen_time
+
+    monkeypatch.setattr(hive_module, "datetime", FrozenDatetime)
+
+
+def test_schedule_slots_sorted_by_minute_of_week():
+    schedule = HiveSchedule(hive_test_schedule())
+
+    assert schedule.starts[:3] == [390, 480, 1320]
+    assert schedule.starts[3] == 1440 + 390
+    assert len(schedule.slots) == 21
+    assert schedule.slots[1]["value"]["target"] == 18.0
+
+
+def test_now_next_later_within_a_day(hive, monkeypatch):
+    # Wednesday 10:00, in the slot that starts at 08:00.
+    freeze_time(monkeypatch, datetime(2026, 10, 14, 10, 0))
+
+    snan = Pyhiveapi.p_get_schedule_now_next_later(hive, hive_test_schedule())
+
+    assert snan["now"]["Start_DateTime"] == datetime(2026, 10, 14, 8, 0)
+    assert snan["now"]["End_DateTime"] == datetime(2026, 10, 14, 22, 0)
+    assert snan["now"]["value"]["target"] == 18.0
+    assert snan["next"]["Start_DateTime"] == datetime(2026, 10, 14, 22, 0)
+    assert snan["later"]["Start_DateTime"] == datetime(2026, 10, 15, 6, 30)
+    assert snan["later"]["End_DateTime"] == datetime(2026, 10, 15, 8, 0)
+
+
+def test_now_next_later_wraps_around_the_week(hive, monkeypatch):
+    # Monday 05:00 is still in Sunday's last slot.
+    freeze_time(monkeypatch, datetime(2026, 10, 12, 5, 0))
+
+    snan = Pyhiveapi.p_get_schedule_now_next_later(hive, hive_test_schedule())
+
+    assert snan["now"]["Start_DateTime"] == datetime(2026, 10, 11, 22, 0)
+    assert snan["now"]["value"]["target"] == 15.0
+    assert snan["next"]["Start_DateTime"] == datetime(2026, 10, 12, 6, 30)
+
+    # Sunday 23:00 runs on into the next week.
+    freeze_time(monkeypatch, datetime(2026, 10, 18, 23, 0))
+
+    snan = Pyhiveapi.p_get_schedule_now_next_later(hive, hive_test_schedule())
+
+    assert snan["now"]["Start_DateTime"] == datetime(2026, 10, 18, 22, 0)
+    assert snan["next"]["Start_DateTime"] == datetime(2026, 10, 19, 6, 30)
+    assert snan["later"]["Start_DateTime"] == datetime(2026, 10, 19, 8, 0)
+
+
+def test_empty_schedule(hive):
+    assert Pyhiveapi.p_get_schedule_now_next_later(hive, {}) == {}
+    assert Pyhiveapi.p_get_schedule_now_next_later(hive, None) == {}
+
+
+def test_compiled_schedule_reused_until_it_changes(hive):
+    a_node = Pyhiveapi.p_get_product(hive, "heat1", "heating")
+
+    compiled_schedule = Pyhiveapi.p_node_schedule(hive, a_node)
+    assert Pyhiveapi.p_node_schedule(hive, a_node) is compiled_schedule
+
+    hive.hsc.products.heating[0].schedule = hive_test_schedule()
+    assert Pyhiveapi.p_node_schedule(hive, a_node) is compiled_schedule
+
+    changed_schedule = hive_test_schedule()
+    changed_schedule["monday"][0]["start"] = 420
+    hive.hsc.products.heating[0].schedule = changed_schedule
+    recompiled_schedule = Pyhiveapi.p_node_schedule(hive, a_node)
+    assert recompiled_schedule is not compiled_schedule
+    assert recompiled_schedule.starts[0] == 420
+
+
+@pytest.mark.parametrize("mode, has_schedule", [("SCHEDULE", True), ("MANUAL", False)])
+def test_heating_schedule_now_next_later(hive, hive_session, mode, has_schedule):
+    hive_session.product("heat1")["state"]["mode"] = mode
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    snan = hive.heating.get_schedule_now_next_later("heat1")
+
+    assert (snan is not None and "now" in snan) == has_schedule
@@ -0,0 +1,44 @@
+"""Tests for set_state and merged light updates."""
+import json
+
+import pytest
+
+
+def posted(hive_session, path):
+    """Get the JSON posted to a path."""
+    return [json.loads(logged[3]) for logged in hive_session.requests if logged[:2] == ("POST", path)]
+
+
+def test_set_state_sends_one_update(hive, hive_session):
+    assert hive.heating.set_state("heat1", mode="MANUAL", target_temperature=21)
+    assert hive.light.set_state("li1", state=True, brightness=40, color_temp=2700)
+
+    assert posted(hive_session, "/nodes/heating/heat1") == [{"mode": "MANUAL", "target": 21}]
+    assert posted(hive_session, "/nodes/colourtuneablelight/li1") == [
+        {"status": "ON", "brightness": 40, "colourMode": "WHITE", "colourTemperature": 2700}]
+
+
+@pytest.mark.parametrize("domain, node_id", [("heating", "heat1"), ("hotwater", "hw1"),
+                                             ("light", "li1"), ("switch", "pl1")])
+def test_set_state_rejects_unknown_attributes(hive, hive_session, domain, node_id):
+    with pytest.raises(TypeError):
+        getattr(hive, domain).set_state(node_id, brightnes=40)
+
+    assert not any(logged[0] == "POST" and logged[1].startswith("/nodes/")
+                   for logged in hive_session.requests)
+
+
+def test_set_state_rejects_colour_temperature_with_colour(hive, hive_session):
+    with pytest.raises(ValueError):
+        hive.light.set_state("li1", color_temp=2700, color=(120, 50, 100))
+
+    assert posted(hive_session, "/nodes/colourtuneablelight/li1") == []
+
+
+def test_turn_on_prefers_colour_to_colour_temperature(hive, hive_session):
+    assert hive.light.turn_on("li1", "colourtuneablelight", 30, 3000, (120, 50, 100))
+
+    light_update = posted(hive_session, "/nodes/colourtuneablelight/li1")[0]
+    assert light_update["colourMode"] == "COLOUR"
+    assert "colourTemperature" not in light_update
+    assert light_update["status"] == "ON" and light_update["brightness"] == 30
@@ -0,0 +1,93 @@
+"""Tests for sharing a node refresh already in progress."""
+import threading
+import time
+
+import pytest
+
+from pyhiveapi import Pyhiveapi
+
+
+def wait_for(condition, timeout=5):
+    """Wait until condition() is true."""
+    wait_until = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < wait_until
+        time.sleep(0.01)
+
+
+def test_concurrent_refreshes_share_one_fetch(hive, hive_session):
+    hive_session.hold_gets = threading.Event()
+    devices_gets = hive_session.count("GET", "/devices")
+    results = []
+
+    def refresh():
+        results.append(Pyhiveapi.hive_api_get_nodes(hive, "NoID"))
+
+    threads = [threading.Thread(target=refresh) for _ in range(5)]
+    threads[0].start()
+    wait_for(lambda: hive_session.count("GET", "/devices") > devices_gets)
+    for a_thread in threads[1:]:
+        a_thread.start()
+    time.sleep(0.1)
+    hive_session.hold_gets.set()
+    for a_thread in threads:
+        a_thread.join(5)
+
+    assert results == [True] * 5
+    assert hive_session.count("GET", "/devices") == devices_gets + 1
+    assert hive.hsc.nodes_flights == {}
+
+
+def test_refresh_after_a_shared_fetch_fetches_again(hive, hive_session):
+    devices_gets = hive_session.count("GET", "/devices")
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    assert hive_session.count("GET", "/devices") == devices_gets + 2
+
+
+def test_followers_share_a_failed_fetch(hive, hive_session):
+    hive_session.hold_gets = threading.Event()
+    hive_session.queue("GET", "/products", (503, {}))
+    products_gets = hive_session.count("GET", "/products")
+    results = []
+
+    def refresh():
+        results.append(Pyhiveapi.hive_api_get_nodes(hive, "NoID"))
+
+    threads = [threading.Thread(target=refresh) for _ in range(3)]
+    threads[0].start()
+    wait_for(lambda: hive_session.count("GET", "/products") > products_gets)
+    for a_thread in threads[1:]:
+        a_thread.start()
+    time.sleep(0.1)
+    hive_session.hold_gets.set()
+    for a_thread in threads:
+        a_thread.join(5)
+
+    assert results == [False] * 3
+    assert hive_session.count("GET", "/products") == products_gets + 1
+
+
+def test_fetch_error_raised_to_the_caller_and_cleared(hive, monkeypatch):
+    def failing_fetch(self, node_id, include_weather):
+        raise RuntimeError("fetch failed")
+
+    monkeypatch.setattr(Pyhiveapi, "p_fetch_nodes", failing_fetch)
+
+    with pytest.raises(RuntimeError):
+        Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    assert hive.hsc.nodes_flights == {}
+
+
+def test_listener_refreshing_during_the_fetch_does_not_deadlock(hive, hive_session):
+    listener_results = []
+    hive.subscribe(lambda node_id, changed:
+                   listener_results.append(Pyhiveapi.hive_api_get_nodes(hive, "NoID")))
+    hive_session.product("li1")["state"]["brightness"] = 10
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+
+    # The refresh in progress is the one being reported, so the listener is not made to wait for it.
+    assert listener_results == [False]
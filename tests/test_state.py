@@ -0,0 +1,61 @@
+"""Tests for publishing the node state between threads."""
+import threading
+
+from pyhiveapi import Pyhiveapi
+
+
+def test_listeners_called_without_the_state_lock(hive, hive_session):
+    lock_results = []
+
+    def locking_listener(node_id, changed):
+        # Another thread must be able to read the state while a listener runs.
+        def take_lock():
+            lock_results.append(hive.hsc.state_lock.acquire(timeout=1))
+            if lock_results[-1]:
+                hive.hsc.state_lock.release()
+
+        lock_thread = threading.Thread(target=take_lock)
+        lock_thread.start()
+        lock_thread.join()
+
+    hive.subscribe(locking_listener)
+    hive_session.product("li1")["state"]["brightness"] = 10
+
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    assert lock_results == [True]
+
+
+def refresh_after_first_lookup(hive, monkeypatch):
+    """Make the first product lookup refresh the nodes before returning the node it found."""
+    p_get_product = Pyhiveapi.p_get_product
+
+    def refreshing_get_product(self, node_id, *product_categories):
+        a_node = p_get_product(self, node_id, *product_categories)
+        monkeypatch.setattr(Pyhiveapi, "p_get_product", p_get_product)
+        assert Pyhiveapi.hive_api_get_nodes(self, "NoID")
+        return a_node
+
+    monkeypatch.setattr(Pyhiveapi, "p_get_product", refreshing_get_product)
+
+
+def test_heating_state_read_from_one_node(hive, hive_session, monkeypatch):
+    hive_session.product("heat1")["state"]["mode"] = "MANUAL"
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    hive_session.product("heat1")["state"]["target"] = 15
+
+    refresh_after_first_lookup(hive, monkeypatch)
+
+    # 19.0 is below the 20.5 target of the node first read.
+    assert hive.heating.get_state("heat1") == "ON"
+    assert hive.heating.get_state("heat1") == "OFF"
+
+
+def test_hotwater_state_read_from_one_node(hive, hive_session, monkeypatch):
+    hive_session.product("hw1")["state"]["mode"] = "MANUAL"
+    assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    hive_session.product("hw1")["state"]["status"] = "OFF"
+
+    refresh_after_first_lookup(hive, monkeypatch)
+
+    assert hive.hotwater.get_state("hw1") == "ON"
+    assert hive.hotwater.get_state("hw1") == "OFF"
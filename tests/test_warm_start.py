@@ -0,0 +1,71 @@
+"""Tests for warm-starting from a saved node snapshot."""
+import time
+
+from pyhiveapi import Pyhiveapi
+
+from conftest import HIVE_TEST_LOGIN_URL, hive_test_account
+
+
+def save_test_snapshot(session, tmp_path):
+    """Save a node snapshot of the fake account to a file."""
+    snapshot_file = str(tmp_path / "nodes")
+    hive_test_account(session, node_snapshot_file=snapshot_file).close()
+    return snapshot_file
+
+
+def slow_log_in(session):
+    """Make the next log in still be going on its own thread when initialise_api returns."""
+    session.queue("POST", HIVE_TEST_LOGIN_URL,
+                  lambda: time.sleep(0.2) or session.p_answer("POST", HIVE_TEST_LOGIN_URL, None))
+
+
+def test_warm_start_returns_the_saved_nodes(hive_session, tmp_path):
+    snapshot_file = save_test_snapshot(hive_session, tmp_path)
+    slow_log_in(hive_session)
+
+    hive = hive_test_account(hive_session, node_snapshot_file=snapshot_file)
+    try:
+        assert hive.hsc.warm_start.is_alive()
+        assert hive.switch.get_power_usage("pl1") == 12
+
+        hive.hsc.warm_start.join()
+        assert hive.hsc.initialise_successful
+    finally:
+        hive.close()
+
+
+def test_close_stops_the_warm_start(hive_session, tmp_path):
+    snapshot_file = save_test_snapshot(hive_session, tmp_path)
+    devices_gets = hive_session.count("GET", "/devices")
+    slow_log_in(hive_session)
+
+    hive = hive_test_account(hive_session, node_snapshot_file=snapshot_file)
+    hive.close()
+
+    assert not hive.hsc.warm_start.is_alive()
+    assert not hive.hsc.initialise_successful
+    assert hive.hive_api.executor is None
+    assert hive_session.count("GET", "/devices") == devices_gets
+
+
+def test_no_executor_after_close(hive):
+    hive.close()
+
+    assert not Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+    assert hive.hive_api.executor is None
+
+
+def test_warm_start_logs_in_once(hive_session, tmp_path):
+    snapshot_file = save_test_snapshot(hive_session, tmp_path)
+    log_ins = hive_session.count("POST", HIVE_TEST_LOGIN_URL)
+    slow_log_in(hive_session)
+
+    hive = hive_test_account(hive_session, node_snapshot_file=snapshot_file)
+    try:
+        # A refresh while the warm start is logging in waits for that log in.
+        assert Pyhiveapi.hive_api_get_nodes(hive, "NoID")
+        hive.hsc.warm_start.join()
+
+        assert hive_session.count("POST", HIVE_TEST_LOGIN_URL) == log_ins + 1
+    finally:
+        hive.close()